@@ -0,0 +1,57 @@
+"""Microbenchmark of PdfTableTransaction.from_book_entry.
+
+Compares the dd.mm.yyyy fast path against the dateutil based parsing on a
+mix of booking rows and the other fragments pypdf emits for a statement.
+
+    python -m benchmarks.bench_from_book_entry
+"""
+import timeit
+
+from cembrabillreader.repository.pdfbillrepository import (
+    PdfTableTransaction,
+    _from_fuzzy_book_entry,
+)
+
+ROWS = [
+    "04.06.2023 05.06.2023 Grand Hotel Les Trois Rois Basel CHE 470.00",
+    "22.09.2023 24.09.2023 Merchant B Location B CHE 101.55",
+    "01.10.2023 02.10.2023 Coop-1234 Zuerich CHE 12.35",
+]
+NOISE = [
+    "",
+    " ",
+    "\n",
+    "Page 1 of 4",
+    "Cembra Money Bank AG",
+    "Transaction date",
+    "Description",
+    "Amount in CHF",
+    "Your monthly statement",
+    "1",
+]
+# roughly one booking row every four fragments, like on a statement page
+FRAGMENTS = (ROWS + NOISE) * 100
+
+
+def fragments_per_second(parse, number: int = 5) -> float:
+    seconds = min(
+        timeit.repeat(lambda: [parse(f) for f in FRAGMENTS], number=1, repeat=number)
+    )
+    return len(FRAGMENTS) / seconds
+
+
+def main():
+    results = {
+        "dateutil": fragments_per_second(_from_fuzzy_book_entry),
+        "fast path": fragments_per_second(PdfTableTransaction.from_book_entry),
+        "fast path with dateutil fallback": fragments_per_second(
+            lambda f: PdfTableTransaction.from_book_entry(f, dateutil_fallback=True)
+        ),
+    }
+    for name, rate in results.items():
+        print(f"{name:>34}: {rate:12,.0f} fragments/sec")
+    print(f"{'speedup':>34}: {results['fast path'] / results['dateutil']:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
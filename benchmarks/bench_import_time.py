@@ -0,0 +1,85 @@
+"""Startup benchmark of the Cembra Bill Reader CLI.
+
+Runs every scenario in a fresh interpreter and reports its best wall time,
+then the packages taking the longest to import for ``--version``, as
+measured by ``python -X importtime``:
+
+    version    python -m cembrabillreader --version
+    cli        importing the CLI module
+    help       the help of a command, rendered with rich
+    quiet      the same with --quiet, which does not import rich
+    wired      importing the CLI and building every dependency
+
+    python -m benchmarks.bench_import_time --repeat 10 --top 15
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    "version": ["-m", "cembrabillreader", "--version"],
+    "cli": ["-c", "import cembrabillreader.presentation.cli"],
+    "help": ["-m", "cembrabillreader", "calculate-total-by-card", "--help"],
+    "quiet": ["-m", "cembrabillreader", "calculate-total-by-card", "-q", "--help"],
+    "wired": [
+        "-c",
+        "from cembrabillreader.dependencies import container; "
+        "container.calculate_total_by_card_batch; container.console_view",
+    ],
+}
+
+
+def best_of(repeat: int, arguments: list[str]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def slowest_packages(arguments: list[str], top: int) -> list[tuple[int, str]]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    self_us_by_package: dict[str, int] = {}
+    # import time: self [us] | cumulative | imported package
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        package = module.strip().split(".")[0]
+        self_us_by_package[package] = self_us_by_package.get(package, 0) + int(self_us)
+    return sorted(
+        ((us, package) for package, us in self_us_by_package.items()), reverse=True
+    )[:top]
+
+
+def run(repeat: int, top: int):
+    baseline = best_of(repeat, ["-c", "pass"])
+    print(f"{'interpreter':>12}: {baseline * 1000:8.1f} ms")
+    for scenario, arguments in SCENARIOS.items():
+        seconds = best_of(repeat, arguments)
+        print(
+            f"{scenario:>12}: {seconds * 1000:8.1f} ms "
+            f"(+{(seconds - baseline) * 1000:.1f} ms)"
+        )
+    print(f"slowest packages to import for {' '.join(SCENARIOS['version'])}:")
+    for self_us, package in slowest_packages(SCENARIOS["version"], top):
+        print(f"{self_us / 1000:10.1f} ms  {package}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    run(repeat=args.repeat, top=args.top)
+
+
+if __name__ == "__main__":
+    main()
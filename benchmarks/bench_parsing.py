@@ -0,0 +1,138 @@
+"""Throughput benchmark of the bill parsing pipeline on synthetic statements.
+
+Reports pages/sec and rows/sec of PdfCembraBillRepository, its peak memory,
+and the time spent in each stage of the pipeline, as measured by the
+ParsingProfile of a profiled load_cembra_bill:
+
+    page selection  BookingPageSelector over every page
+    extraction      pypdf text extraction of the selected pages, visitor included
+    matching        holder matching of the fragments
+    parsing         parsing of the booking rows
+    totaling        CalculateTotalByCard over the loaded bill
+
+Profiled loads extract the pages sequentially, whatever --page-workers.
+
+    python -m benchmarks.bench_parsing --pages 50 --rows-per-page 40 --holders 4
+    python -m benchmarks.bench_parsing --layout --split-columns
+    python -m benchmarks.bench_parsing --pages 200 --page-workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_statement
+from cembrabillreader.domain.entities import ParsingProfile
+from cembrabillreader.domain.usecases import CalculateTotalByCard
+from cembrabillreader.repository.pdfbillrepository import PdfCembraBillRepository
+
+
+def best_of(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def fastest_profile(
+    repeat: int, repository: PdfCembraBillRepository, bill_path: str, holders
+) -> ParsingProfile:
+    profiles = [
+        repository.load_cembra_bill(bill_path, holders, profile=True).profile
+        for _ in range(repeat)
+    ]
+    return min(profiles, key=lambda profile: profile.total_seconds)
+
+
+def run(
+    pages: int,
+    rows_per_page: int,
+    holders: int,
+    noise_pages: int,
+    repeat: int,
+    layout: bool = False,
+    split_columns: bool = False,
+    page_workers: int = 1,
+):
+    statement = generate_statement(
+        pages=pages,
+        rows_per_page=rows_per_page,
+        holders=holders,
+        noise_pages=noise_pages,
+        split_columns=split_columns,
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bill_path = os.path.join(tmp_dir, "statement.pdf")
+        with open(bill_path, "wb") as file:
+            file.write(statement.pdf)
+
+        repository = PdfCembraBillRepository(layout=layout, page_workers=page_workers)
+        usecase = CalculateTotalByCard(repository)
+        cembra_bill = repository.load_cembra_bill(bill_path, statement.holders)
+        totals = {
+            card.holder: card.calculate_total_cents()
+            for card in [cembra_bill.principal_card] + cembra_bill.additional_cards
+        }
+        assert totals == statement.totals_cents, "parsed totals do not match"
+
+        profile = fastest_profile(repeat, repository, bill_path, statement.holders)
+        stages = {
+            "page selection": profile.page_selection_seconds,
+            "extraction": profile.extraction_seconds,
+            "matching": profile.holder_matching_seconds,
+            "parsing": profile.row_parsing_seconds,
+            "totaling": best_of(
+                repeat,
+                lambda: usecase.calculate_total_for_card(cembra_bill.principal_card),
+            ),
+        }
+        total = best_of(
+            repeat, lambda: repository.load_cembra_bill(bill_path, statement.holders)
+        )
+
+        tracemalloc.start()
+        repository.load_cembra_bill(bill_path, statement.holders)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(
+        f"statement: {statement.pages} pages, {statement.rows} rows, "
+        f"{len(statement.holders)} holders, {profile.fragments_seen} fragments, "
+        f"{len(statement.pdf) / 1024:.0f} KiB"
+    )
+    print(f"{'load_cembra_bill':>18}: {total * 1000:10.2f} ms")
+    print(f"{'pages/sec':>18}: {statement.pages / total:10,.1f}")
+    print(f"{'rows/sec':>18}: {statement.rows / total:10,.0f}")
+    print(f"{'peak memory':>18}: {peak_memory / 1024 / 1024:10.2f} MiB")
+    for stage, seconds in stages.items():
+        print(f"{stage:>18}: {seconds * 1000:10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--rows-per-page", type=int, default=40)
+    parser.add_argument("--holders", type=int, default=2)
+    parser.add_argument("--noise-pages", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--layout", action="store_true")
+    parser.add_argument("--split-columns", action="store_true")
+    parser.add_argument("--page-workers", type=int, default=1)
+    args = parser.parse_args()
+    run(
+        pages=args.pages,
+        rows_per_page=args.rows_per_page,
+        holders=args.holders,
+        noise_pages=args.noise_pages,
+        repeat=args.repeat,
+        layout=args.layout,
+        split_columns=args.split_columns,
+        page_workers=args.page_workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
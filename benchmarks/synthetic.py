@@ -0,0 +1,188 @@
+"""Generator of synthetic Cembra-style statements.
+
+The statements are minimal PDFs written by hand: every text line is shown
+with its own ``Tj`` operator in a standard Helvetica font, so pypdf hands
+each booking row to the visitor as one fragment, like on the real bills.
+
+    python -m benchmarks.synthetic statement.pdf --pages 20 --holders 3
+"""
+import argparse
+import random
+from typing import NamedTuple
+
+MERCHANTS = [
+    "Coop-1234 Zuerich CHE",
+    "Migros MM Basel CHE",
+    "SBB CFF FFS Bern CHE",
+    "Grand Hotel Les Trois Rois Basel CHE",
+    "Amazon Marketplace LUX",
+    "Galaxus Wohlen CHE",
+    "Restaurant Kronenhalle Zuerich CHE",
+]
+NOISE_LINES = [
+    "Cembra Money Bank AG",
+    "Bändliweg 20, 8048 Zürich",
+    "Your monthly statement",
+    "Please find the general terms and conditions on our website.",
+    "Interest rates are subject to change at any time.",
+]
+TOTAL_LINE = "Total amount due"
+_LINES_PER_PAGE = 60
+_COLUMNS_X = (40, 150, 480)
+
+
+class SyntheticStatement(NamedTuple):
+    pdf: bytes
+    holders: list[str]
+    rows: int
+    pages: int
+    totals_cents: dict[str, int]
+
+
+def generate_statement(
+    pages: int = 4,
+    rows_per_page: int = 40,
+    holders: int = 2,
+    noise_pages: int = 1,
+    seed: int = 0,
+    split_columns: bool = False,
+) -> SyntheticStatement:
+    """Generates a statement with ``pages`` pages of bookings.
+
+    The bookings are split between the holders in consecutive sections,
+    each one opened by a line with the name of the holder; ``noise_pages``
+    pages without bookings are added before and after the booking table.
+    With ``split_columns`` the dates, description and amount of a booking are
+    shown in separate text objects, so pypdf hands them as separate fragments.
+    """
+    rng = random.Random(seed)
+    holder_names = [f"Holder{i:02d} Muster" for i in range(holders)]
+    rows = pages * rows_per_page
+    rows_per_holder = -(-rows // holders)
+
+    lines: list[str | tuple[str, ...]] = []
+    totals_cents = {holder: 0 for holder in holder_names}
+    for row in range(rows):
+        holder = holder_names[row // rows_per_holder]
+        if row % rows_per_holder == 0:
+            lines.append(f"{holder} Card number 5123 XXXX XXXX {1000 + row:04d}")
+        amount_cents = rng.randint(-5000, 150000)
+        totals_cents[holder] += amount_cents
+        day = 1 + row % 28
+        columns = (
+            f"{day:02d}.06.2023 {min(day + 1, 28):02d}.06.2023",
+            rng.choice(MERCHANTS),
+            _format_cents(amount_cents),
+        )
+        lines.append(columns if split_columns else " ".join(columns))
+    lines.append(f"{TOTAL_LINE} {_format_cents(sum(totals_cents.values()))}")
+
+    noise_page = [rng.choice(NOISE_LINES) for _ in range(_LINES_PER_PAGE // 2)]
+    booking_pages = [
+        lines[i : i + rows_per_page + 2]
+        for i in range(0, len(lines), rows_per_page + 2)
+    ]
+    all_pages = [noise_page] * noise_pages + booking_pages + [noise_page] * noise_pages
+    return SyntheticStatement(
+        pdf=write_pdf(all_pages),
+        holders=holder_names,
+        rows=rows,
+        pages=len(all_pages),
+        totals_cents=totals_cents,
+    )
+
+
+def write_pdf(pages: list[list[str | tuple[str, ...]]]) -> bytes:
+    """Writes a PDF showing every line of every page as one text fragment.
+
+    A line given as a tuple is shown as one text object per column instead,
+    the last column first.
+    """
+    objects: list[bytes] = [
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>",
+        b"",  # the page tree, written once the pages are known
+    ]
+    font_id, pages_id = 1, 2
+    page_ids = []
+    for lines in pages:
+        operations = [b"BT", b"/F1 9 Tf"]
+        for i, line in enumerate(lines):
+            y = 800 - 12 * i
+            if isinstance(line, str):
+                operations.append(b"1 0 0 1 %d %d Tm" % (_COLUMNS_X[0], y))
+                operations.append(b"(" + _escape(line) + b") Tj")
+                continue
+            # the reading order must not depend on the content stream order
+            for x, text in reversed(list(zip(_COLUMNS_X, line))):
+                operations += [b"ET", b"BT", b"/F1 9 Tf"]
+                operations.append(b"1 0 0 1 %d %d Tm" % (x, y))
+                operations.append(b"(" + _escape(text) + b") Tj")
+        operations.append(b"ET")
+        content = b"\n".join(operations)
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, font_id, len(objects))
+        )
+        page_ids.append(len(objects))
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids),
+        len(page_ids),
+    )
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        len(objects),
+        xref,
+    )
+    return bytes(pdf)
+
+
+def _escape(text: str) -> bytes:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return escaped.encode("cp1252")
+
+
+def _format_cents(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--rows-per-page", type=int, default=40)
+    parser.add_argument("--holders", type=int, default=2)
+    parser.add_argument("--noise-pages", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--split-columns", action="store_true")
+    args = parser.parse_args()
+    statement = generate_statement(
+        pages=args.pages,
+        rows_per_page=args.rows_per_page,
+        holders=args.holders,
+        noise_pages=args.noise_pages,
+        seed=args.seed,
+        split_columns=args.split_columns,
+    )
+    with open(args.output, "wb") as file:
+        file.write(statement.pdf)
+    print(f"holders: {','.join(statement.holders)}")
+
+
+if __name__ == "__main__":
+    main()
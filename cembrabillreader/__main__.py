@@ -1,12 +1,63 @@
 """Cembra Bill Reader entry point script."""
 # cembrabillreader/__main__.py
-import logging
+import sys
+
 from cembrabillreader import __app_name__
-from cembrabillreader.presentation import cli
 
-log_level = logging.INFO  # logging.DEBUG
+# the options of the cli taking a value, see cembrabillreader.presentation.cli
+_GLOBAL_OPTIONS_WITH_VALUE = {"--log-level", "--trace-fragments"}
+# the commands having a --quiet mode
+_QUIET_COMMAND_OPTIONS_WITH_VALUE = {
+    "calculate-total-by-card": {
+        "--bill-path",
+        "-bp",
+        "--holders",
+        "-hds",
+        "--format",
+        "-f",
+    },
+    "calculate-total-by-card-batch": {
+        "--bills",
+        "-b",
+        "--holders",
+        "-hds",
+        "--workers",
+        "-w",
+        "--format",
+        "-f",
+    },
+}
+
+
+def _is_quiet(args: list[str]) -> bool:
+    """Tells whether the arguments run a command with --quiet."""
+    args = iter(args)
+    for arg in args:
+        if arg in _GLOBAL_OPTIONS_WITH_VALUE:
+            next(args, None)
+        elif not arg.startswith("-"):
+            break
+    else:
+        return False
+    options_with_value = _QUIET_COMMAND_OPTIONS_WITH_VALUE.get(arg)
+    if options_with_value is None:
+        return False
+    for arg in args:
+        if arg == "--":
+            return False
+        if arg in options_with_value:
+            next(args, None)
+        elif arg in ("--quiet", "-q"):
+            return True
+    return False
+
+
+# with --quiet nothing is rendered with rich, and typer falls back to plain
+# click when rich cannot be imported, which halves the startup time
+if _is_quiet(sys.argv[1:]):
+    sys.modules.setdefault("rich", None)
 
-logging.basicConfig(level=log_level)
+from cembrabillreader.presentation import cli  # noqa: E402
 
 
 def main():
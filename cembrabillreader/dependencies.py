@@ -1,9 +1,190 @@
-from cembrabillreader.presentation.consoleview import ConsoleView
-from cembrabillreader.domain.repository import CembraBillRepository
-from cembrabillreader.domain.usecases import CalculateTotalByCard
-from cembrabillreader.repository.pdfbillrepository import PdfCembraBillRepository
+"""This module wires the Cembra Bill Reader dependencies.
 
+Every dependency is imported and built the first time it is used, so a
+command only pays for what it needs: ``--version`` loads neither pypdf nor
+pydantic, and ``invalidate-cache`` never builds the PDF parser.
+"""
+# cembrabillreader/dependencies.py
+import os
+from functools import cached_property
+from typing import TYPE_CHECKING
 
-cembra_bill_repository: CembraBillRepository = PdfCembraBillRepository()
-calculate_total_by_card = CalculateTotalByCard(bill_repository=cembra_bill_repository)
-console_view = ConsoleView()
+from cembrabillreader import __app_name__
+
+if TYPE_CHECKING:
+    from cembrabillreader.domain.checkpoint import IngestionCheckpoint
+    from cembrabillreader.domain.repository import CembraBillRepository
+    from cembrabillreader.domain.usecases import (
+        AggregateTransactions,
+        CalculateTotalByCard,
+        CalculateTotalByCardBatch,
+        ConsolidateTransactions,
+        ExportTransactions,
+        IngestBills,
+        SyncBillIndex,
+    )
+    from cembrabillreader.domain.transactionwriter import TransactionWriter
+    from cembrabillreader.presentation.consoleview import ConsoleView
+    from cembrabillreader.presentation.recordview import RecordView
+    from cembrabillreader.repository.cachingbillrepository import (
+        CachingCembraBillRepository,
+    )
+    from cembrabillreader.repository.pdfbillrepository import (
+        PdfCembraBillRepository,
+    )
+    from cembrabillreader.repository.sqlitebillindex import SqliteBillIndex
+
+
+class Container:
+    @cached_property
+    def cache_dir(self) -> str:
+        return os.environ.get(
+            "CEMBRABILLREADER_CACHE_DIR",
+            os.path.join(os.path.expanduser("~"), ".cache", __app_name__),
+        )
+
+    @cached_property
+    def index_path(self) -> str:
+        return os.environ.get(
+            "CEMBRABILLREADER_INDEX",
+            os.path.join(
+                os.path.expanduser("~"), ".local", "share", __app_name__, "index.db"
+            ),
+        )
+
+    @cached_property
+    def pdf_bill_repository(self) -> "PdfCembraBillRepository":
+        from cembrabillreader.repository.pdfbillrepository import (
+            PdfCembraBillRepository,
+        )
+
+        return PdfCembraBillRepository(
+            layout=os.environ.get("CEMBRABILLREADER_LAYOUT", "") == "1",
+            page_workers=int(os.environ.get("CEMBRABILLREADER_PAGE_WORKERS", "1")),
+        )
+
+    @cached_property
+    def limited_bill_repository(self) -> "CembraBillRepository":
+        # per bill limits, in seconds and megabytes
+        timeout = os.environ.get("CEMBRABILLREADER_TIMEOUT")
+        memory_limit_mb = os.environ.get("CEMBRABILLREADER_MEMORY_LIMIT_MB")
+        if timeout is None and memory_limit_mb is None:
+            return self.pdf_bill_repository
+        from cembrabillreader.repository.limitedbillrepository import (
+            LimitedCembraBillRepository,
+        )
+
+        return LimitedCembraBillRepository(
+            repository=self.pdf_bill_repository,
+            timeout_seconds=None if timeout is None else float(timeout),
+            memory_limit_bytes=(
+                None if memory_limit_mb is None else int(memory_limit_mb) * 1024 * 1024
+            ),
+        )
+
+    @cached_property
+    def cembra_bill_cache(self) -> "CachingCembraBillRepository":
+        from cembrabillreader.repository.cachingbillrepository import (
+            CachingCembraBillRepository,
+        )
+
+        return CachingCembraBillRepository(
+            repository=self.limited_bill_repository, cache_dir=self.cache_dir
+        )
+
+    @cached_property
+    def cembra_bill_repository(self) -> "CembraBillRepository":
+        return self.cembra_bill_cache
+
+    @cached_property
+    def calculate_total_by_card(self) -> "CalculateTotalByCard":
+        from cembrabillreader.domain.usecases import CalculateTotalByCard
+
+        return CalculateTotalByCard(bill_repository=self.cembra_bill_repository)
+
+    @cached_property
+    def calculate_total_by_card_batch(self) -> "CalculateTotalByCardBatch":
+        from cembrabillreader.domain.usecases import CalculateTotalByCardBatch
+
+        return CalculateTotalByCardBatch(
+            calculate_total_by_card=self.calculate_total_by_card
+        )
+
+    @cached_property
+    def ingest_bills(self) -> "IngestBills":
+        from cembrabillreader.domain.usecases import IngestBills
+
+        return IngestBills(calculate_total_by_card=self.calculate_total_by_card)
+
+    def ingestion_checkpoint(self, path: str) -> "IngestionCheckpoint":
+        from cembrabillreader.repository.jsonlcheckpoint import (
+            JsonlIngestionCheckpoint,
+        )
+
+        return JsonlIngestionCheckpoint(path)
+
+    @cached_property
+    def export_transactions(self) -> "ExportTransactions":
+        from cembrabillreader.domain.usecases import ExportTransactions
+
+        return ExportTransactions(bill_repository=self.cembra_bill_repository)
+
+    @cached_property
+    def aggregate_transactions(self) -> "AggregateTransactions":
+        from cembrabillreader.domain.usecases import AggregateTransactions
+
+        return AggregateTransactions(bill_repository=self.cembra_bill_repository)
+
+    @cached_property
+    def consolidate_transactions(self) -> "ConsolidateTransactions":
+        from cembrabillreader.domain.usecases import ConsolidateTransactions
+
+        return ConsolidateTransactions(bill_repository=self.cembra_bill_repository)
+
+    @cached_property
+    def bill_index(self) -> "SqliteBillIndex":
+        from cembrabillreader.repository.sqlitebillindex import SqliteBillIndex
+
+        return SqliteBillIndex(self.index_path)
+
+    @cached_property
+    def sync_bill_index(self) -> "SyncBillIndex":
+        from cembrabillreader.domain.usecases import SyncBillIndex
+
+        return SyncBillIndex(
+            bill_repository=self.cembra_bill_repository, bill_index=self.bill_index
+        )
+
+    def transaction_writer(self, path: str, format: str) -> "TransactionWriter":
+        if format == "csv":
+            from cembrabillreader.repository.csvtransactionwriter import (
+                CsvTransactionWriter,
+            )
+
+            return CsvTransactionWriter(path)
+        from cembrabillreader.repository.arrowtransactionwriter import (
+            ArrowTransactionWriter,
+        )
+
+        return ArrowTransactionWriter(path, format=format)
+
+    def record_view(self, format: str) -> "RecordView":
+        from cembrabillreader.presentation.recordview import RecordView
+
+        return RecordView(format)
+
+    @cached_property
+    def console_view(self) -> "ConsoleView":
+        from cembrabillreader.presentation.consoleview import ConsoleView
+
+        return ConsoleView()
+
+
+container = Container()
+
+
+def __getattr__(name: str):
+    # keeps `from cembrabillreader.dependencies import console_view` working
+    if isinstance(getattr(Container, name, None), cached_property):
+        return getattr(container, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
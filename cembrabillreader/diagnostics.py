@@ -0,0 +1,57 @@
+"""This module provides the logging configuration of Cembra Bill Reader.
+
+The parsing only logs one summary line per bill; the text fragments visited
+while parsing are traced to the ``cembrabillreader.trace`` logger, which is
+disabled unless enabled with ``configure_logging(trace_every=...)``. While
+it is disabled, the parser does not call into logging for the fragments at
+all.
+"""
+# cembrabillreader/diagnostics.py
+import logging
+import threading
+
+FRAGMENT_TRACE_LOGGER_NAME = "cembrabillreader.trace"
+
+fragment_trace_logger = logging.getLogger(FRAGMENT_TRACE_LOGGER_NAME)
+# the trace is never enabled by a DEBUG level set on a parent logger
+fragment_trace_logger.setLevel(logging.INFO)
+
+
+class SamplingFilter(logging.Filter):
+    """Lets one of every ``every`` records through."""
+
+    __every: int
+    __seen: int
+    __lock: threading.Lock
+
+    def __init__(self, every: int) -> None:
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        super().__init__()
+        self.__every = every
+        self.__seen = 0
+        self.__lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self.__lock:
+            sampled = self.__seen % self.__every == 0
+            self.__seen += 1
+        return sampled
+
+
+def configure_logging(level: int | str = logging.INFO, trace_every: int = 0) -> None:
+    """
+    level: level of the root logger.
+    trace_every: trace one of every ``trace_every`` text fragments visited
+        while parsing the bills, 0 disables the trace.
+    """
+    logging.basicConfig(level=level)
+    for log_filter in list(fragment_trace_logger.filters):
+        if isinstance(log_filter, SamplingFilter):
+            fragment_trace_logger.removeFilter(log_filter)
+    if trace_every > 0:
+        fragment_trace_logger.setLevel(logging.DEBUG)
+        if trace_every > 1:
+            fragment_trace_logger.addFilter(SamplingFilter(trace_every))
+    else:
+        fragment_trace_logger.setLevel(logging.INFO)
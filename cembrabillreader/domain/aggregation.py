@@ -0,0 +1,153 @@
+import datetime
+import functools
+from array import array
+from typing import Callable, Hashable, Sequence
+
+from cembrabillreader.domain.transactionstore import TransactionStore
+
+MONTH = "month"
+REGISTRATION_DATE = "registration_date"
+MERCHANT = "merchant"
+CATEGORY = "category"
+GROUPINGS = (MONTH, REGISTRATION_DATE, MERCHANT, CATEGORY)
+
+UNCATEGORIZED = "uncategorized"
+
+
+def normalize_merchant(description: str) -> str:
+    """The merchant of a booking, its description with the blanks collapsed."""
+    return " ".join(description.split())
+
+
+class CategoryMapping:
+    """Maps the merchants to categories by case insensitive substrings.
+
+    The categories are tried in the given order, a merchant matching none of
+    them is UNCATEGORIZED, e.g. {"groceries": ["migros", "coop"]}.
+    """
+
+    __patterns: list[tuple[str, str]]
+
+    def __init__(self, patterns_by_category: dict[str, list[str]]) -> None:
+        self.__patterns = [
+            (pattern.lower(), category)
+            for category, patterns in patterns_by_category.items()
+            for pattern in patterns
+        ]
+
+    def category(self, description: str) -> str:
+        merchant = normalize_merchant(description).lower()
+        for pattern, category in self.__patterns:
+            if pattern in merchant:
+                return category
+        return UNCATEGORIZED
+
+
+def factorize(
+    column: Sequence[Hashable], key: Callable[[Hashable], Hashable]
+) -> tuple[list[Hashable], array]:
+    """The distinct keys of a column and the key code of every value.
+
+    The key function only runs once per distinct value of the column, which
+    repeat a lot: the bookings of a month share a few dozen dates and a
+    household a few hundred merchants.
+    """
+    codes_by_value: dict[Hashable, int] = {}
+    codes_by_key: dict[Hashable, int] = {}
+    keys: list[Hashable] = []
+    for value in dict.fromkeys(column):
+        group_key = key(value)
+        code = codes_by_key.get(group_key)
+        if code is None:
+            code = codes_by_key[group_key] = len(keys)
+            keys.append(group_key)
+        codes_by_value[value] = code
+    return keys, array("q", map(codes_by_value.__getitem__, column))
+
+
+@functools.cache
+def _pyarrow():
+    # optional, imported on first use only to keep the cli startup fast
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def group_sums(
+    codes: array, amounts_cents: array, groups: int
+) -> tuple[list[int], list[int]]:
+    """The total and the count of the amounts of every key code.
+
+    Both columns are arrays of int64. With the optional pyarrow they are
+    grouped without a Python loop, pyarrow reading their buffers in place.
+    """
+    pa = _pyarrow()
+    if pa is None or len(codes) == 0:
+        return _group_sums_in_python(codes, amounts_cents, groups)
+    columns = pa.table(
+        {
+            "code": pa.Array.from_buffers(
+                pa.int64(), len(codes), [None, pa.py_buffer(codes)]
+            ),
+            "amount": pa.Array.from_buffers(
+                pa.int64(), len(amounts_cents), [None, pa.py_buffer(amounts_cents)]
+            ),
+        }
+    )
+    grouped = columns.group_by("code").aggregate(
+        [("amount", "sum"), ("amount", "count")]
+    )
+    totals_cents = [0] * groups
+    counts = [0] * groups
+    for code, total_cents, count in zip(
+        grouped["code"].to_pylist(),
+        grouped["amount_sum"].to_pylist(),
+        grouped["amount_count"].to_pylist(),
+    ):
+        totals_cents[code] = total_cents
+        counts[code] = count
+    return totals_cents, counts
+
+
+def _group_sums_in_python(
+    codes: array, amounts_cents: array, groups: int
+) -> tuple[list[int], list[int]]:
+    totals_cents = [0] * groups
+    counts = [0] * groups
+    for code, amount_cents in zip(codes, amounts_cents):
+        totals_cents[code] += amount_cents
+        counts[code] += 1
+    return totals_cents, counts
+
+
+def _month(ordinal: int) -> str:
+    return datetime.date.fromordinal(ordinal).strftime("%Y-%m")
+
+
+def _date(ordinal: int) -> str:
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
+def group_columns(
+    store: TransactionStore,
+    grouping: str,
+    categories: CategoryMapping | None = None,
+) -> tuple[list[str], list[int], list[int]]:
+    """The keys of the store's transactions for the grouping, their totals
+    and transaction counts, computed over the columns of the store."""
+    if grouping == MONTH:
+        keys, codes = factorize(store.transaction_dates, _month)
+    elif grouping == REGISTRATION_DATE:
+        keys, codes = factorize(store.registration_dates, _date)
+    elif grouping == MERCHANT:
+        keys, codes = factorize(store.descriptions, normalize_merchant)
+    elif grouping == CATEGORY:
+        keys, codes = factorize(
+            store.descriptions, (categories or CategoryMapping({})).category
+        )
+    else:
+        raise ValueError(f"unknown grouping {grouping}, expected one of {GROUPINGS}")
+    totals_cents, counts = group_sums(codes, store.amounts_cents, len(keys))
+    return keys, totals_cents, counts
@@ -0,0 +1,88 @@
+import hashlib
+import io
+import mmap
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# a path to the PDF, its content, or a seekable binary file-like object with
+# nothing but the PDF; mmap objects are both buffers and file-like objects
+BillSource = Union[str, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+
+def describe_bill(bill: BillSource) -> str:
+    """A short description of the bill source for logs and errors."""
+    if isinstance(bill, str):
+        return bill
+    if isinstance(bill, (bytes, bytearray, memoryview, mmap.mmap)):
+        return f"<{type(bill).__name__} of {len(bill)} bytes>"
+    return getattr(bill, "name", None) or f"<{type(bill).__name__}>"
+
+
+class _BufferReader(io.RawIOBase):
+    """Reads a buffer in place, where BytesIO would copy it."""
+
+    def __init__(self, buffer: bytearray | memoryview) -> None:
+        super().__init__()
+        self.__buffer = memoryview(buffer).cast("B")
+        self.__position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        chunk = self.__buffer[self.__position : self.__position + len(b)]
+        b[: len(chunk)] = chunk
+        self.__position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.__position
+        elif whence == io.SEEK_END:
+            offset += len(self.__buffer)
+        self.__position = max(offset, 0)
+        return self.__position
+
+    def tell(self) -> int:
+        return self.__position
+
+
+@contextmanager
+def open_bill(bill: BillSource) -> Iterator[BinaryIO]:
+    """Opens the bill source as a seekable binary stream.
+
+    Only paths are opened and closed here, the streams of the caller are left
+    open; bytes are read in place and not copied.
+    """
+    if isinstance(bill, str):
+        with open(bill, "rb") as file:
+            yield file
+    elif isinstance(bill, mmap.mmap):
+        bill.seek(0)
+        yield bill
+    elif isinstance(bill, bytes):
+        # BytesIO shares the buffer of bytes until it is written to
+        yield io.BytesIO(bill)
+    elif isinstance(bill, (bytearray, memoryview)):
+        yield _BufferReader(bill)
+    else:
+        yield bill
+
+
+def content_hash(bill: BillSource) -> str:
+    """The sha256 of the bill content, as hex."""
+    digest = hashlib.sha256()
+    if isinstance(bill, (bytes, bytearray, memoryview, mmap.mmap)):
+        digest.update(bill)
+        return digest.hexdigest()
+    with open_bill(bill) as file:
+        start = file.tell()
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+        file.seek(start)
+    return digest.hexdigest()
@@ -0,0 +1,42 @@
+import datetime
+from abc import ABC, abstractmethod
+
+from cembrabillreader.domain.entities import IndexedBill, TotalByHolderResult
+from cembrabillreader.domain.transactionstore import HolderTransaction
+
+
+class BillIndex(ABC):
+    """Keeps the transactions of the bills already parsed."""
+
+    @abstractmethod
+    def indexed_bill(self, path_to_bill: str) -> IndexedBill | None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def indexed_paths(self) -> list[str]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def index_bill(
+        self, bill: IndexedBill, transactions: list[HolderTransaction]
+    ) -> None:
+        """Replaces the indexed bill at the same path and its transactions."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def update_bill(self, bill: IndexedBill) -> None:
+        """Updates the indexed bill at the same path, keeping its transactions."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def remove_bill(self, path_to_bill: str) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def total_by_holder(
+        self,
+        start_date: datetime.date | None = None,
+        end_date: datetime.date | None = None,
+    ) -> TotalByHolderResult:
+        """Totals the transactions made between both dates, included."""
+        raise NotImplementedError()
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+
+from cembrabillreader.domain.entities import BillTotalByCardResult
+
+
+class IngestionCheckpoint(ABC):
+    """Records the result of every ingested bill as soon as it is known."""
+
+    @abstractmethod
+    def results(self) -> dict[str, BillTotalByCardResult]:
+        """The last recorded result of every bill, by absolute bill path."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def record(self, result: BillTotalByCardResult) -> None:
+        """Durably records the result, it survives an interruption right after."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError()
+
+    def __enter__(self) -> "IngestionCheckpoint":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,113 @@
+from array import array
+from typing import Iterator
+
+from cembrabillreader.domain.transactionstore import (
+    BillTransaction,
+    HolderTransaction,
+    TransactionRecord,
+    TransactionStore,
+)
+
+
+class _HolderTimeline:
+    __slots__ = ("is_principal_holder", "store", "bill_indexes")
+
+    is_principal_holder: bool
+    store: TransactionStore
+    bill_indexes: array
+
+    def __init__(self, is_principal_holder: bool) -> None:
+        self.is_principal_holder = is_principal_holder
+        self.store = TransactionStore()
+        self.bill_indexes = array("l")
+
+
+class ConsolidatedTimeline:
+    """The transactions of many bills, without the ones several bills share.
+
+    Statement periods overlap and pending bookings show up again on the next
+    bill, so a transaction whose holder, dates, amount and description were
+    already seen on another bill is dropped. The same transaction can
+    legitimately appear twice on one bill, e.g. two identical tickets; a key
+    is kept as many times as the bill listing it the most lists it.
+    Each transaction is looked up once in a hash index, the cost is linear
+    in the number of transactions.
+    """
+
+    __bill_paths: list[str]
+    __timelines: dict[str, _HolderTimeline]
+    __kept_counts: dict[tuple, int]
+    __duplicates: int
+
+    def __init__(self) -> None:
+        self.__bill_paths = []
+        self.__timelines = {}
+        self.__kept_counts = {}
+        self.__duplicates = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.__duplicates
+
+    def __len__(self) -> int:
+        return sum(len(timeline.store) for timeline in self.__timelines.values())
+
+    def add_bill(self, bill_path: str, transactions: list[HolderTransaction]) -> int:
+        """Adds the transactions of a bill, returns how many were duplicates."""
+        bill_index = len(self.__bill_paths)
+        self.__bill_paths.append(bill_path)
+        counts_in_bill: dict[tuple, int] = {}
+        duplicates = 0
+        for holder, is_principal_holder, record in transactions:
+            key = (
+                holder,
+                record.transaction_date,
+                record.registration_date,
+                record.amount_cents,
+                record.description,
+            )
+            occurrence = counts_in_bill.get(key, 0) + 1
+            counts_in_bill[key] = occurrence
+            if occurrence <= self.__kept_counts.get(key, 0):
+                duplicates += 1
+                continue
+            self.__kept_counts[key] = occurrence
+            timeline = self.__timelines.get(holder)
+            if timeline is None:
+                timeline = self.__timelines[holder] = _HolderTimeline(
+                    is_principal_holder
+                )
+            timeline.store.append(record)
+            timeline.bill_indexes.append(bill_index)
+        self.__duplicates += duplicates
+        return duplicates
+
+    def totals_cents(self) -> dict[str, int]:
+        return {
+            holder: timeline.store.total_cents()
+            for holder, timeline in self.__timelines.items()
+        }
+
+    def __iter__(self) -> Iterator[BillTransaction]:
+        """The transactions holder by holder, by transaction then registration
+        date, each with the first bill it was seen on."""
+        for holder, timeline in self.__timelines.items():
+            store = timeline.store
+            transaction_dates = store.transaction_dates
+            registration_dates = store.registration_dates
+            order = sorted(
+                range(len(store)),
+                key=lambda i: (transaction_dates[i], registration_dates[i]),
+            )
+            for i in order:
+                yield BillTransaction(
+                    self.__bill_paths[timeline.bill_indexes[i]],
+                    holder,
+                    timeline.is_principal_holder,
+                    TransactionRecord(
+                        transaction_dates[i],
+                        registration_dates[i],
+                        store.descriptions[i],
+                        store.amounts_cents[i],
+                    ),
+                )
@@ -1,7 +1,28 @@
 from datetime import datetime
 import logging
-from typing import Optional
-from pydantic import BaseModel
+from typing import Any, Iterator, Optional
+from pydantic import BaseModel, PrivateAttr, computed_field, model_validator
+
+from cembrabillreader.domain.money import from_cents, to_cents
+from cembrabillreader.domain.transactionstore import TransactionRecord, TransactionStore
+
+
+def _amount_field_to_cents(data: Any, field: str) -> Any:
+    # money is stored in cents, the amount in francs is accepted as input
+    if isinstance(data, dict) and field in data:
+        data = dict(data)
+        amount = data.pop(field)
+        data.setdefault(f"{field}_cents", to_cents(amount))
+    return data
+
+
+def _additional_card_to_list(data: Any) -> Any:
+    # a single additional card was accepted before bills held any number of them
+    if isinstance(data, dict) and "additional_card" in data:
+        data = dict(data)
+        card = data.pop("additional_card")
+        data.setdefault("additional_cards", [] if card is None else [card])
+    return data
 
 
 # domain entities
@@ -9,33 +30,223 @@ class Transaction(BaseModel):
     transaction_date: datetime
     registration_date: datetime
     description: str
-    amount: float
+    amount_cents: int
+
+    @model_validator(mode="before")
+    @classmethod
+    def _amount_to_cents(cls, data: Any) -> Any:
+        return _amount_field_to_cents(data, "amount")
+
+    @computed_field
+    @property
+    def amount(self) -> float:
+        return from_cents(self.amount_cents)
+
+    @staticmethod
+    def from_record(record: TransactionRecord) -> "Transaction":
+        # records are valid by construction, skip the validation
+        return Transaction.model_construct(
+            transaction_date=datetime.fromordinal(record.transaction_date),
+            registration_date=datetime.fromordinal(record.registration_date),
+            description=record.description,
+            amount_cents=record.amount_cents,
+        )
+
+    def to_record(self) -> TransactionRecord:
+        return TransactionRecord(
+            transaction_date=self.transaction_date.toordinal(),
+            registration_date=self.registration_date.toordinal(),
+            description=self.description,
+            amount_cents=self.amount_cents,
+        )
 
 
 class Card(BaseModel):
+    """A card and its transactions, kept in a TransactionStore.
+
+    The store is the only copy of the transactions: they are accepted as
+    input and serialized, but read back as a tuple built from the store.
+    """
+
     holder: str
     is_principal_holder: bool
-    transactions: list[Transaction]
+    _store: TransactionStore = PrivateAttr(default_factory=TransactionStore)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _transactions_to_store(cls, data: Any, handler) -> "Card":
+        transactions = []
+        if isinstance(data, dict) and "transactions" in data:
+            data = dict(data)
+            transactions = data.pop("transactions")
+        card = handler(data)
+        for t in transactions:
+            card.add_transaction(Transaction.model_validate(t))
+        return card
+
+    @computed_field
+    @property
+    def transactions(self) -> tuple[Transaction, ...]:
+        return tuple(map(Transaction.from_record, self._store))
+
+    @staticmethod
+    def from_store(
+        holder: str, is_principal_holder: bool, store: TransactionStore
+    ) -> "Card":
+        card = Card(holder=holder, is_principal_holder=is_principal_holder)
+        card._store = store
+        return card
+
+    @property
+    def store(self) -> TransactionStore:
+        return self._store
+
+    def records(self) -> Iterator[TransactionRecord]:
+        return iter(self._store)
 
     def add_transaction(self, t: Transaction):
-        self.transactions.append(t)
+        self._store.append(t.to_record())
+
+    def calculate_total_cents(self) -> int:
+        return self._store.total_cents()
 
     def calculate_total(self) -> float:
-        total = sum([t.amount for t in self.transactions])
-        return round(total, 2)
+        return from_cents(self.calculate_total_cents())
+
+
+class PageProfile(BaseModel):
+    page_number: int
+    extracted: bool
+    seconds: float
+    fragments: int
+    rows: int
+
+
+class ParsingProfile(BaseModel):
+    pages: list[PageProfile]
+    fragments_seen: int
+    # discarded before any matching or parsing
+    fragments_rejected: int = 0
+    holder_matches: int
+    rows_accepted: int
+    # the visitor time is part of the extraction time, matching and
+    # row parsing are part of the visitor time
+    page_selection_seconds: float
+    extraction_seconds: float
+    visitor_seconds: float
+    holder_matching_seconds: float
+    row_parsing_seconds: float
+    total_seconds: float
 
 
 class CembraBill(BaseModel):
     principal_card: Card
-    additional_card: Optional[Card]
+    additional_cards: list[Card] = []
+    profile: Optional[ParsingProfile] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _additional_card_to_list(cls, data: Any) -> Any:
+        return _additional_card_to_list(data)
+
+    @property
+    def additional_card(self) -> Optional[Card]:
+        return self.additional_cards[0] if len(self.additional_cards) > 0 else None
 
 
 # usecases entities
 class CardTotal(BaseModel):
     card_holder: str
-    total: float
+    total_cents: int
+
+    @model_validator(mode="before")
+    @classmethod
+    def _total_to_cents(cls, data: Any) -> Any:
+        return _amount_field_to_cents(data, "total")
+
+    @computed_field
+    @property
+    def total(self) -> float:
+        return from_cents(self.total_cents)
 
 
 class CalculateTotalByCardResult(BaseModel):
     principal_card: CardTotal
-    additional_card: Optional[CardTotal]
+    additional_cards: list[CardTotal] = []
+    profile: Optional[ParsingProfile] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _additional_card_to_list(cls, data: Any) -> Any:
+        return _additional_card_to_list(data)
+
+    @property
+    def additional_card(self) -> Optional[CardTotal]:
+        return self.additional_cards[0] if len(self.additional_cards) > 0 else None
+
+    @property
+    def total_cents(self) -> int:
+        return self.principal_card.total_cents + sum(
+            c.total_cents for c in self.additional_cards
+        )
+
+
+class BillTotalByCardResult(BaseModel):
+    bill_path: str
+    result: Optional[CalculateTotalByCardResult]
+    error: Optional[str]
+    error_type: Optional[str] = None
+
+
+class TotalByHolderResult(BaseModel):
+    totals: list[CardTotal]
+    bills_processed: int
+    bills_failed: int
+
+
+class ExportTransactionsResult(BaseModel):
+    transactions_exported: int
+    bills_processed: int
+    bills_failed: int
+
+
+class IndexedBill(BaseModel):
+    path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+    holders: list[str]
+    parser_version: str
+
+
+class SyncBillIndexResult(BaseModel):
+    bills_indexed: int
+    bills_unchanged: int
+    bills_removed: int
+    bills_failed: int
+
+
+class GroupTotal(BaseModel):
+    key: str
+    total_cents: int
+    transactions: int
+
+    @computed_field
+    @property
+    def total(self) -> float:
+        return from_cents(self.total_cents)
+
+
+class AggregateTransactionsResult(BaseModel):
+    grouping: str
+    totals: list[GroupTotal]
+    bills_processed: int
+    bills_failed: int
+
+
+class ConsolidateTransactionsResult(BaseModel):
+    totals: list[CardTotal]
+    transactions_consolidated: int
+    duplicates_removed: int
+    bills_processed: int
+    bills_failed: int
@@ -0,0 +1,14 @@
+class BillParsingError(ValueError):
+    """A bill could not be parsed or its totals calculated."""
+
+
+class BillTimeoutError(BillParsingError):
+    """A bill took longer to parse than allowed."""
+
+
+class WorkerCrashedError(BillParsingError):
+    """The process parsing a bill died before returning a result."""
+
+
+class BillMemoryLimitError(BillParsingError):
+    """A bill needed more memory to parse than allowed."""
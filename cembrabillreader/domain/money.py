@@ -0,0 +1,43 @@
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+# amounts as printed on the bills, e.g. 470.00 or -12.30
+_CENTS_AMOUNT = re.compile(r"-?\d+\.\d\d")
+# the cents are stored as signed 64 bit integers, see TransactionStore
+_MAX_CENTS = 2**63 - 1
+
+
+def to_cents(amount: str | int | float | Decimal) -> int:
+    """Converts an amount in francs to cents, rounding half away from zero.
+
+    Floats are converted through their shortest representation, so 0.1 is
+    10 cents and not 10.000000000000000555 cents rounded.
+    Raises ValueError when amount is not a finite number or its cents do not
+    fit in a signed 64 bit integer.
+    """
+    if isinstance(amount, bool):
+        raise ValueError(f"invalid amount: {amount}")
+    if isinstance(amount, int):
+        cents = amount * 100
+    elif isinstance(amount, str) and _CENTS_AMOUNT.fullmatch(amount) is not None:
+        cents = int(amount.replace(".", "", 1))
+    else:
+        try:
+            cents = int(
+                Decimal(str(amount)).scaleb(2).quantize(Decimal(1), ROUND_HALF_UP)
+            )
+        except (ArithmeticError, ValueError):
+            raise ValueError(f"invalid amount: {amount}")
+    if not -_MAX_CENTS - 1 <= cents <= _MAX_CENTS:
+        raise ValueError(f"amount out of range: {amount}")
+    return cents
+
+
+def from_cents(cents: int) -> float:
+    return cents / 100
+
+
+def format_cents(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    francs, cents = divmod(abs(cents), 100)
+    return f"{sign}{francs}.{cents:02d}"
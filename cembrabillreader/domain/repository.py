@@ -1,11 +1,38 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
+from cembrabillreader.domain.billfile import BillSource
 from cembrabillreader.domain.entities import CembraBill
+from cembrabillreader.domain.transactionstore import HolderTransaction
 
 
 class CembraBillRepository(ABC):
+    # bump whenever a change in parsing alters the loaded CembraBill
+    parser_version: str = "1"
+
     @abstractmethod
     def load_cembra_bill(
-        self, path_to_bill: str, expected_holders: list[str]
+        self,
+        path_to_bill: BillSource,
+        expected_holders: list[str],
+        profile: bool = False,
     ) -> CembraBill:
+        """Loads a bill, with profile the bill carries its ParsingProfile.
+
+        path_to_bill: the path to the PDF or its content, see BillSource.
+        """
         raise NotImplementedError()
+
+    def iter_transactions(
+        self, path_to_bill: BillSource, expected_holders: list[str]
+    ) -> Iterator[HolderTransaction]:
+        """Yields the transactions of a bill card by card.
+
+        Repositories able to parse a bill incrementally override this to
+        yield transactions while the bill is being read; this default loads
+        the whole bill first.
+        """
+        cembra_bill = self.load_cembra_bill(path_to_bill, expected_holders)
+        for card in [cembra_bill.principal_card] + cembra_bill.additional_cards:
+            for record in card.records():
+                yield HolderTransaction(card.holder, card.is_principal_holder, record)
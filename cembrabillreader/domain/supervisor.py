@@ -0,0 +1,90 @@
+import multiprocessing
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from cembrabillreader.domain.errors import BillTimeoutError, WorkerCrashedError
+
+
+def _run_task(connection: Connection, function: Callable, arguments: tuple) -> None:
+    try:
+        outcome = (True, function(*arguments))
+    except BaseException as e:
+        outcome = (False, e)
+    try:
+        connection.send(outcome)
+    except Exception as e:
+        # e.g. an exception that cannot be pickled
+        connection.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+    connection.close()
+
+
+def run_supervised(
+    function: Callable,
+    tasks: Iterable[tuple[Hashable, tuple]],
+    max_workers: int,
+    timeout: float | None = None,
+) -> Iterator[tuple[Hashable, Any, BaseException | None]]:
+    """Runs ``function(*arguments)`` of every task in a process of its own.
+
+    Yields ``(key, result, error)`` as the tasks complete. A task raising,
+    crashing its process or running longer than ``timeout`` seconds only
+    fails that task: its process is killed and the error is a
+    BillTimeoutError or WorkerCrashedError. Closing the iterator kills the
+    running processes.
+    """
+    pending = iter(tasks)
+    running: dict[Connection, tuple[Hashable, Any, float | None]] = {}
+    try:
+        while True:
+            while len(running) < max_workers:
+                task = next(pending, None)
+                if task is None:
+                    break
+                key, arguments = task
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                # not a daemon, so the task can run supervised tasks itself
+                process = multiprocessing.Process(
+                    target=_run_task, args=(sender, function, arguments)
+                )
+                process.start()
+                sender.close()
+                deadline = None if timeout is None else time.monotonic() + timeout
+                running[receiver] = (key, process, deadline)
+            if len(running) == 0:
+                return
+
+            deadlines = [d for _, _, d in running.values() if d is not None]
+            wait_seconds = (
+                None
+                if len(deadlines) == 0
+                else max(0.0, min(deadlines) - time.monotonic())
+            )
+            for receiver in wait(list(running), timeout=wait_seconds):
+                key, process, _ = running.pop(receiver)
+                try:
+                    succeeded, value = receiver.recv()
+                except EOFError:
+                    process.join()
+                    succeeded, value = False, WorkerCrashedError(
+                        f"worker exited with code {process.exitcode}"
+                    )
+                receiver.close()
+                process.join()
+                yield (key, value, None) if succeeded else (key, None, value)
+
+            now = time.monotonic()
+            for receiver, (key, process, deadline) in list(running.items()):
+                if deadline is not None and deadline <= now:
+                    del running[receiver]
+                    process.kill()
+                    process.join()
+                    receiver.close()
+                    yield key, None, BillTimeoutError(
+                        f"took longer than {timeout} seconds"
+                    )
+    finally:
+        for receiver, (_, process, _) in running.items():
+            process.kill()
+            process.join()
+            receiver.close()
@@ -0,0 +1,100 @@
+from array import array
+from typing import Iterator, NamedTuple
+
+
+class TransactionRecord:
+    """A parsed transaction, dates are ordinals and the amount is in cents."""
+
+    __slots__ = (
+        "transaction_date",
+        "registration_date",
+        "description",
+        "amount_cents",
+    )
+
+    transaction_date: int
+    registration_date: int
+    description: str
+    amount_cents: int
+
+    def __init__(
+        self,
+        transaction_date: int,
+        registration_date: int,
+        description: str,
+        amount_cents: int,
+    ) -> None:
+        self.transaction_date = transaction_date
+        self.registration_date = registration_date
+        self.description = description
+        self.amount_cents = amount_cents
+
+
+class HolderTransaction(NamedTuple):
+    """A transaction streamed out of a bill along with the card it belongs to."""
+
+    holder: str
+    is_principal_holder: bool
+    transaction: TransactionRecord
+
+
+class BillTransaction(NamedTuple):
+    """A transaction exported along with its card and the bill it comes from."""
+
+    bill_path: str
+    holder: str
+    is_principal_holder: bool
+    transaction: TransactionRecord
+
+
+class TransactionStore:
+    """Column oriented storage of the transactions of a card."""
+
+    __slots__ = (
+        "transaction_dates",
+        "registration_dates",
+        "descriptions",
+        "amounts_cents",
+    )
+
+    transaction_dates: array
+    registration_dates: array
+    descriptions: list[str]
+    amounts_cents: array
+
+    def __init__(self) -> None:
+        self.transaction_dates = array("l")
+        self.registration_dates = array("l")
+        self.descriptions = []
+        self.amounts_cents = array("q")
+
+    def append(self, record: TransactionRecord) -> None:
+        self.transaction_dates.append(record.transaction_date)
+        self.registration_dates.append(record.registration_date)
+        self.descriptions.append(record.description)
+        self.amounts_cents.append(record.amount_cents)
+
+    def total_cents(self) -> int:
+        return sum(self.amounts_cents)
+
+    def __len__(self) -> int:
+        return len(self.amounts_cents)
+
+    def __iter__(self) -> Iterator[TransactionRecord]:
+        return map(
+            TransactionRecord,
+            self.transaction_dates,
+            self.registration_dates,
+            self.descriptions,
+            self.amounts_cents,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TransactionStore):
+            return NotImplemented
+        return (
+            self.transaction_dates == other.transaction_dates
+            and self.registration_dates == other.registration_dates
+            and self.descriptions == other.descriptions
+            and self.amounts_cents == other.amounts_cents
+        )
@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+
+from cembrabillreader.domain.transactionstore import BillTransaction
+
+# columns of the exported transactions, in order
+EXPORT_COLUMNS = (
+    "bill",
+    "holder",
+    "is_principal_holder",
+    "transaction_date",
+    "registration_date",
+    "description",
+    "amount",
+)
+
+
+class TransactionWriter(ABC):
+    """Writes exported transactions to a file, one chunk at a time."""
+
+    @abstractmethod
+    def write(self, transactions: list[BillTransaction]) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def close(self) -> None:
+        """Completes the file, nothing can be written afterwards."""
+        raise NotImplementedError()
+
+    def __enter__(self) -> "TransactionWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
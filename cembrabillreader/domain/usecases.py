@@ -1,11 +1,39 @@
+import datetime
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator
+
+from cembrabillreader.domain.aggregation import (
+    GROUPINGS,
+    CategoryMapping,
+    group_columns,
+)
 from cembrabillreader.domain.entities import (
+    AggregateTransactionsResult,
+    BillTotalByCardResult,
     CalculateTotalByCardResult,
     Card,
     CardTotal,
     CembraBill,
+    ConsolidateTransactionsResult,
+    ExportTransactionsResult,
+    GroupTotal,
+    IndexedBill,
+    SyncBillIndexResult,
+    TotalByHolderResult,
 )
+from cembrabillreader.domain.billfile import BillSource, content_hash, describe_bill
+from cembrabillreader.domain.billindex import BillIndex
+from cembrabillreader.domain.checkpoint import IngestionCheckpoint
+from cembrabillreader.domain.consolidation import ConsolidatedTimeline
+from cembrabillreader.domain.errors import BillParsingError
 from cembrabillreader.domain.repository import CembraBillRepository
+from cembrabillreader.domain.supervisor import run_supervised
+from cembrabillreader.domain.transactionstore import BillTransaction
+from cembrabillreader.domain.transactionwriter import TransactionWriter
+
+DEFAULT_EXPORT_CHUNK_SIZE = 10_000
 
 
 class CalculateTotalByCard:
@@ -15,31 +43,537 @@ class CalculateTotalByCard:
         self.__bill_repository = bill_repository
 
     def calculate_bill_total_by_card(
-        self, bill_path: str, expected_holders: list[str]
+        self, bill_path: BillSource, expected_holders: list[str], profile: bool = False
     ) -> CalculateTotalByCardResult:
         try:
-            print(expected_holders)
             if len(expected_holders) < 1:
                 raise ValueError("At least one card holder name must be provided")
-            if len(expected_holders) > 2:
-                raise ValueError("Maximum two card holder names can be provided")
 
             cembra_bill: CembraBill = self.__bill_repository.load_cembra_bill(
-                bill_path, expected_holders
+                bill_path, expected_holders, profile=profile
             )
             return CalculateTotalByCardResult(
                 principal_card=self.calculate_total_for_card(
                     cembra_bill.principal_card
                 ),
-                additional_card=self.calculate_total_for_card(
-                    cembra_bill.additional_card
+                additional_cards=[
+                    self.calculate_total_for_card(card)
+                    for card in cembra_bill.additional_cards
+                ],
+                profile=cembra_bill.profile,
+            )
+        except BillParsingError as e:
+            # already typed, e.g. a bill over its time or memory limit
+            logging.critical(e)
+            raise
+        except Exception as e:
+            logging.critical(e)
+            raise BillParsingError(
+                f"cannot calculate total of {describe_bill(bill_path)}: {e}"
+            ) from e
+
+    def calculate_bill_total_by_card_streaming(
+        self, bill_path: BillSource, expected_holders: list[str]
+    ) -> CalculateTotalByCardResult:
+        """Same as calculate_bill_total_by_card, keeping only running totals.
+
+        The transactions are summed while the repository streams them, so the
+        memory used does not grow with the size of the bill.
+        """
+        try:
+            if len(expected_holders) < 1:
+                raise ValueError("At least one card holder name must be provided")
+
+            principal_holder = None
+            totals_cents_by_holder: dict[str, int] = {}
+            for (
+                holder,
+                is_principal_holder,
+                transaction,
+            ) in self.__bill_repository.iter_transactions(bill_path, expected_holders):
+                if is_principal_holder and principal_holder is None:
+                    principal_holder = holder
+                totals_cents_by_holder[holder] = (
+                    totals_cents_by_holder.get(holder, 0) + transaction.amount_cents
+                )
+            if principal_holder is None:
+                raise ValueError("No transaction of the principal card found")
+
+            return CalculateTotalByCardResult(
+                principal_card=CardTotal(
+                    card_holder=principal_holder,
+                    total_cents=totals_cents_by_holder.pop(principal_holder),
                 ),
+                additional_cards=[
+                    CardTotal(card_holder=holder, total_cents=total_cents)
+                    for holder, total_cents in totals_cents_by_holder.items()
+                ],
             )
+        except BillParsingError as e:
+            # already typed, e.g. a bill over its time or memory limit
+            logging.critical(e)
+            raise
         except Exception as e:
             logging.critical(e)
-            raise ValueError("cannot calculate total")
+            raise BillParsingError(
+                f"cannot calculate total of {describe_bill(bill_path)}: {e}"
+            ) from e
 
     def calculate_total_for_card(self, card: Card) -> CardTotal | None:
         if card is None:
             return None
-        return CardTotal(card_holder=card.holder, total=card.calculate_total())
+        return CardTotal(
+            card_holder=card.holder, total_cents=card.calculate_total_cents()
+        )
+
+
+class CalculateTotalByCardBatch:
+    __calculate_total_by_card: CalculateTotalByCard
+    __max_workers: int | None
+
+    def __init__(
+        self,
+        calculate_total_by_card: CalculateTotalByCard,
+        max_workers: int | None = None,
+    ) -> None:
+        self.__calculate_total_by_card = calculate_total_by_card
+        self.__max_workers = max_workers
+
+    def calculate_bills_total_by_card(
+        self,
+        bill_paths: list[str],
+        expected_holders: list[str],
+        max_workers: int | None = None,
+    ) -> Iterator[BillTotalByCardResult]:
+        """Yields the total by card of every bill as soon as it is calculated.
+
+        Bills are parsed in a pool of worker processes, so results are not
+        yielded in the order of ``bill_paths``. A bill that cannot be parsed
+        yields a result carrying the error instead of aborting the batch.
+        """
+        workers = max_workers if max_workers is not None else self.__max_workers
+        if workers == 1:
+            for bill_path in bill_paths:
+                yield self.__calculate_bill(bill_path, expected_holders)
+            return
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                executor.submit(
+                    self.__calculate_total_by_card.calculate_bill_total_by_card,
+                    bill_path,
+                    expected_holders,
+                ): bill_path
+                for bill_path in bill_paths
+            }
+            for future in as_completed(futures):
+                bill_path = futures[future]
+                try:
+                    yield BillTotalByCardResult(
+                        bill_path=bill_path, result=future.result(), error=None
+                    )
+                except Exception as e:
+                    logging.error("cannot calculate total for %s: %s", bill_path, e)
+                    yield BillTotalByCardResult(
+                        bill_path=bill_path,
+                        result=None,
+                        error=str(e),
+                        error_type=type(e).__name__,
+                    )
+        finally:
+            # the bills not parsed yet are dropped when the results are no
+            # longer consumed
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def __calculate_bill(
+        self, bill_path: str, expected_holders: list[str]
+    ) -> BillTotalByCardResult:
+        try:
+            result = self.__calculate_total_by_card.calculate_bill_total_by_card(
+                bill_path, expected_holders
+            )
+            return BillTotalByCardResult(bill_path=bill_path, result=result, error=None)
+        except Exception as e:
+            logging.error("cannot calculate total for %s: %s", bill_path, e)
+            return BillTotalByCardResult(
+                bill_path=bill_path,
+                result=None,
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+
+    @staticmethod
+    def aggregate_total_by_holder(
+        bill_results: Iterable[BillTotalByCardResult],
+    ) -> TotalByHolderResult:
+        totals_by_holder: dict[str, int] = {}
+        bills_processed = 0
+        bills_failed = 0
+        for bill_result in bill_results:
+            if bill_result.result is None:
+                bills_failed += 1
+                continue
+            bills_processed += 1
+            for card_total in [
+                bill_result.result.principal_card
+            ] + bill_result.result.additional_cards:
+                totals_by_holder[card_total.card_holder] = (
+                    totals_by_holder.get(card_total.card_holder, 0)
+                    + card_total.total_cents
+                )
+        return TotalByHolderResult(
+            totals=[
+                CardTotal(card_holder=holder, total_cents=total_cents)
+                for holder, total_cents in totals_by_holder.items()
+            ],
+            bills_processed=bills_processed,
+            bills_failed=bills_failed,
+        )
+
+
+class IngestBills:
+    __calculate_total_by_card: CalculateTotalByCard
+    __max_workers: int | None
+    __timeout: float | None
+
+    def __init__(
+        self,
+        calculate_total_by_card: CalculateTotalByCard,
+        max_workers: int | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        self.__calculate_total_by_card = calculate_total_by_card
+        self.__max_workers = max_workers
+        self.__timeout = timeout
+
+    def ingest_bills(
+        self,
+        bill_paths: Iterable[str],
+        expected_holders: list[str],
+        checkpoint: IngestionCheckpoint,
+        retry_failed: bool = False,
+        max_workers: int | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[BillTotalByCardResult]:
+        """Calculates the total by card of the bills not in the checkpoint yet.
+
+        Every bill is parsed in a process of its own, see run_supervised: a
+        bill failing, crashing its process or running longer than
+        ``timeout`` seconds is recorded as failed and the others go on. The
+        result of every bill is recorded in the checkpoint before it is
+        yielded, so an interrupted run resumes where it stopped. The bills
+        that failed are only parsed again with ``retry_failed``.
+        """
+        if len(expected_holders) < 1:
+            raise ValueError("At least one card holder name must be provided")
+
+        recorded = checkpoint.results()
+        bill_paths_by_key = {}
+        for bill_path in bill_paths:
+            # a resumed run may spell the paths differently
+            bill_paths_by_key.setdefault(os.path.abspath(bill_path), bill_path)
+        bill_paths = [
+            bill_path
+            for key, bill_path in bill_paths_by_key.items()
+            if key not in recorded or (retry_failed and recorded[key].result is None)
+        ]
+        workers = max_workers or self.__max_workers or os.cpu_count() or 1
+        for bill_path, result, error in run_supervised(
+            self.__calculate_total_by_card.calculate_bill_total_by_card,
+            ((bill_path, (bill_path, expected_holders)) for bill_path in bill_paths),
+            max_workers=workers,
+            timeout=timeout if timeout is not None else self.__timeout,
+        ):
+            if error is None:
+                bill_result = BillTotalByCardResult(
+                    bill_path=bill_path, result=result, error=None
+                )
+            else:
+                logging.error("cannot ingest %s: %s", bill_path, error)
+                bill_result = BillTotalByCardResult(
+                    bill_path=bill_path,
+                    result=None,
+                    error=str(error),
+                    error_type=type(error).__name__,
+                )
+            checkpoint.record(bill_result)
+            yield bill_result
+
+
+class ExportTransactions:
+    __bill_repository: CembraBillRepository
+    __chunk_size: int
+
+    def __init__(
+        self,
+        bill_repository: CembraBillRepository,
+        chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE,
+    ) -> None:
+        self.__bill_repository = bill_repository
+        self.__chunk_size = chunk_size
+
+    def export_transactions(
+        self,
+        bill_paths: Iterable[str],
+        expected_holders: list[str],
+        writer: TransactionWriter,
+    ) -> ExportTransactionsResult:
+        """Writes the transactions of every bill in chunks of ``chunk_size``.
+
+        The transactions of a bill are only handed to the writer once the
+        whole bill is parsed, so a bill that cannot be parsed is skipped
+        without leaving part of its transactions in the export.
+        """
+        if len(expected_holders) < 1:
+            raise ValueError("At least one card holder name must be provided")
+
+        chunk: list[BillTransaction] = []
+        transactions_exported = 0
+        bills_processed = 0
+        bills_failed = 0
+        for bill_path in bill_paths:
+            try:
+                bill_transactions = [
+                    BillTransaction(bill_path, holder, is_principal_holder, record)
+                    for (
+                        holder,
+                        is_principal_holder,
+                        record,
+                    ) in self.__bill_repository.iter_transactions(
+                        bill_path, expected_holders
+                    )
+                ]
+            except Exception as e:
+                logging.error("cannot export transactions of %s: %s", bill_path, e)
+                bills_failed += 1
+                continue
+            bills_processed += 1
+            chunk.extend(bill_transactions)
+            while len(chunk) >= self.__chunk_size:
+                writer.write(chunk[: self.__chunk_size])
+                transactions_exported += self.__chunk_size
+                del chunk[: self.__chunk_size]
+        if len(chunk) > 0:
+            writer.write(chunk)
+            transactions_exported += len(chunk)
+        return ExportTransactionsResult(
+            transactions_exported=transactions_exported,
+            bills_processed=bills_processed,
+            bills_failed=bills_failed,
+        )
+
+
+class AggregateTransactions:
+    __bill_repository: CembraBillRepository
+
+    def __init__(self, bill_repository: CembraBillRepository) -> None:
+        self.__bill_repository = bill_repository
+
+    def aggregate_transactions(
+        self,
+        bill_paths: Iterable[str],
+        expected_holders: list[str],
+        grouping: str,
+        categories: CategoryMapping | None = None,
+    ) -> AggregateTransactionsResult:
+        """Totals the transactions of every bill by month, registration date,
+        merchant or category, see cembrabillreader.domain.aggregation.
+
+        The columns of the transaction store of every card are grouped as
+        they are loaded, a bill that cannot be parsed is skipped.
+        """
+        if len(expected_holders) < 1:
+            raise ValueError("At least one card holder name must be provided")
+        if grouping not in GROUPINGS:
+            raise ValueError(f"The grouping must be one of {', '.join(GROUPINGS)}")
+
+        totals_by_key: dict[str, list[int]] = {}
+        bills_processed = 0
+        bills_failed = 0
+        for bill_path in bill_paths:
+            try:
+                cembra_bill = self.__bill_repository.load_cembra_bill(
+                    bill_path, expected_holders
+                )
+            except Exception as e:
+                logging.error("cannot aggregate transactions of %s: %s", bill_path, e)
+                bills_failed += 1
+                continue
+            bills_processed += 1
+            for card in [cembra_bill.principal_card] + cembra_bill.additional_cards:
+                for key, total_cents, count in zip(
+                    *group_columns(card.store, grouping, categories)
+                ):
+                    group = totals_by_key.setdefault(key, [0, 0])
+                    group[0] += total_cents
+                    group[1] += count
+        return AggregateTransactionsResult(
+            grouping=grouping,
+            totals=[
+                GroupTotal(key=key, total_cents=total_cents, transactions=count)
+                for key, (total_cents, count) in sorted(totals_by_key.items())
+            ],
+            bills_processed=bills_processed,
+            bills_failed=bills_failed,
+        )
+
+
+class ConsolidateTransactions:
+    __bill_repository: CembraBillRepository
+    __chunk_size: int
+
+    def __init__(
+        self,
+        bill_repository: CembraBillRepository,
+        chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE,
+    ) -> None:
+        self.__bill_repository = bill_repository
+        self.__chunk_size = chunk_size
+
+    def consolidate_transactions(
+        self,
+        bill_paths: Iterable[str],
+        expected_holders: list[str],
+        writer: TransactionWriter | None = None,
+    ) -> ConsolidateTransactionsResult:
+        """Totals the transactions of many bills by holder, counting the ones
+        several statements list only once, see ConsolidatedTimeline.
+
+        The consolidated timeline of every holder is written to the writer in
+        chunks of ``chunk_size`` when one is given. A bill that cannot be
+        parsed is skipped.
+        """
+        if len(expected_holders) < 1:
+            raise ValueError("At least one card holder name must be provided")
+
+        timeline = ConsolidatedTimeline()
+        bills_processed = 0
+        bills_failed = 0
+        for bill_path in bill_paths:
+            try:
+                transactions = list(
+                    self.__bill_repository.iter_transactions(
+                        bill_path, expected_holders
+                    )
+                )
+            except Exception as e:
+                logging.error("cannot consolidate transactions of %s: %s", bill_path, e)
+                bills_failed += 1
+                continue
+            bills_processed += 1
+            timeline.add_bill(bill_path, transactions)
+
+        if writer is not None:
+            chunk: list[BillTransaction] = []
+            for transaction in timeline:
+                chunk.append(transaction)
+                if len(chunk) == self.__chunk_size:
+                    writer.write(chunk)
+                    chunk = []
+            if len(chunk) > 0:
+                writer.write(chunk)
+        return ConsolidateTransactionsResult(
+            totals=[
+                CardTotal(card_holder=holder, total_cents=total_cents)
+                for holder, total_cents in timeline.totals_cents().items()
+            ],
+            transactions_consolidated=len(timeline),
+            duplicates_removed=timeline.duplicates,
+            bills_processed=bills_processed,
+            bills_failed=bills_failed,
+        )
+
+
+class SyncBillIndex:
+    __bill_repository: CembraBillRepository
+    __bill_index: BillIndex
+
+    def __init__(
+        self, bill_repository: CembraBillRepository, bill_index: BillIndex
+    ) -> None:
+        self.__bill_repository = bill_repository
+        self.__bill_index = bill_index
+
+    def sync(
+        self, bill_paths: Iterable[str], expected_holders: list[str]
+    ) -> SyncBillIndexResult:
+        """Indexes the new and modified bills, forgets the deleted ones.
+
+        A bill is unchanged while its modification time and size are; when
+        they change, it is only parsed again if its content hash changed too.
+        Changing the holders or the parser version indexes every bill again.
+        """
+        if len(expected_holders) < 1:
+            raise ValueError("At least one card holder name must be provided")
+
+        parser_version = self.__bill_repository.parser_version
+        bills_indexed = 0
+        bills_unchanged = 0
+        bills_failed = 0
+        for bill_path in bill_paths:
+            bill_path = os.path.abspath(bill_path)
+            try:
+                stat = os.stat(bill_path)
+                indexed_bill = self.__bill_index.indexed_bill(bill_path)
+                if indexed_bill is not None and (
+                    indexed_bill.holders != expected_holders
+                    or indexed_bill.parser_version != parser_version
+                ):
+                    indexed_bill = None
+                if (
+                    indexed_bill is not None
+                    and indexed_bill.mtime_ns == stat.st_mtime_ns
+                    and indexed_bill.size == stat.st_size
+                ):
+                    bills_unchanged += 1
+                    continue
+
+                bill = IndexedBill(
+                    path=bill_path,
+                    mtime_ns=stat.st_mtime_ns,
+                    size=stat.st_size,
+                    content_hash=content_hash(bill_path),
+                    holders=expected_holders,
+                    parser_version=parser_version,
+                )
+                if (
+                    indexed_bill is not None
+                    and indexed_bill.content_hash == bill.content_hash
+                ):
+                    self.__bill_index.update_bill(bill)
+                    bills_unchanged += 1
+                    continue
+
+                transactions = list(
+                    self.__bill_repository.iter_transactions(
+                        bill_path, expected_holders
+                    )
+                )
+                self.__bill_index.index_bill(bill, transactions)
+                bills_indexed += 1
+            except Exception as e:
+                logging.error("cannot index %s: %s", bill_path, e)
+                bills_failed += 1
+
+        bills_removed = 0
+        for indexed_path in self.__bill_index.indexed_paths():
+            if not os.path.exists(indexed_path):
+                self.__bill_index.remove_bill(indexed_path)
+                bills_removed += 1
+
+        return SyncBillIndexResult(
+            bills_indexed=bills_indexed,
+            bills_unchanged=bills_unchanged,
+            bills_removed=bills_removed,
+            bills_failed=bills_failed,
+        )
+
+    def total_by_holder(
+        self,
+        start_date: datetime.date | None = None,
+        end_date: datetime.date | None = None,
+    ) -> TotalByHolderResult:
+        if start_date is not None and end_date is not None and start_date > end_date:
+            raise ValueError("The start date must not be after the end date")
+        return self.__bill_index.total_by_holder(start_date, end_date)
@@ -1,17 +1,86 @@
-"""This module provides the Cembra Bill Reader CLI."""
+"""This module provides the Cembra Bill Reader CLI.
 
+The dependencies of a command are only imported once it runs, see
+cembrabillreader.dependencies.
+"""
+
+import glob
+import json
+import os
+import sys
+from datetime import datetime
 from typing import Optional
 
 import typer
 
 from cembrabillreader import __app_name__, __version__
-from cembrabillreader.dependencies import (
-    calculate_total_by_card as calculate_total_by_card_usecase,
-    console_view,
-)
+from cembrabillreader.dependencies import container
+from cembrabillreader.diagnostics import configure_logging
 
 app = typer.Typer()
 
+_OUTPUT_FORMATS = ("table", "jsonl", "csv")
+
+_EXPORT_FORMATS_BY_EXTENSION = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+}
+
+
+def _prompt(text: str) -> str | None:
+    # a pipeline has nobody to answer, a missing option is an error there
+    return text if sys.stdin is not None and sys.stdin.isatty() else None
+
+
+def _parse_holders(holders: str) -> list[str]:
+    return [h.strip() for h in holders.split(",")]
+
+
+def _resolve_bill_paths(bills: str) -> list[str]:
+    if os.path.isdir(bills):
+        bills = os.path.join(bills, "*.pdf")
+    return sorted(p for p in glob.glob(bills, recursive=True) if os.path.isfile(p))
+
+
+def _export_format(output: str, format: Optional[str]) -> str:
+    format = format or _EXPORT_FORMATS_BY_EXTENSION.get(
+        os.path.splitext(output)[1].lower()
+    )
+    if format not in _EXPORT_FORMATS_BY_EXTENSION.values():
+        typer.secho(
+            "Choose the export format with --format csv, parquet or arrow",
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+    return format
+
+
+def _transaction_writer(output: str, format: str):
+    try:
+        return container.transaction_writer(output, format)
+    except ImportError as e:
+        typer.secho(str(e), fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+
+def _output_format(format: str, quiet: bool) -> str:
+    if format not in _OUTPUT_FORMATS:
+        typer.secho(
+            "Choose the output format with --format table, jsonl or csv",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(1)
+    # the tables need rich, which is not even imported with --quiet
+    return "jsonl" if quiet and format == "table" else format
+
+
+def _status(message: str, format: str, quiet: bool) -> None:
+    # keeps the records alone on stdout
+    if not quiet:
+        typer.secho(message, err=format != "table")
+
 
 def _version_callback(value: bool) -> None:
     if value:
@@ -28,27 +97,458 @@ def main(
         help="Show the application's version and exit.",
         callback=_version_callback,
         is_eager=True,
-    )
+    ),
+    log_level: str = typer.Option(
+        "info",
+        "--log-level",
+        help="Logging level, e.g. debug to log a summary of every parsed bill.",
+    ),
+    trace_fragments: int = typer.Option(
+        0,
+        "--trace-fragments",
+        min=0,
+        help="Trace one of every N text fragments of the parsed bills, "
+        "0 disables the trace.",
+    ),
 ) -> None:
-    return
+    configure_logging(level=log_level.upper(), trace_every=trace_fragments)
 
 
 @app.command()
 def calculate_total_by_card(
     bill_path: str = typer.Option(
-        [], "--bill-path", "-bp", prompt="cembra bill file path"
+        ..., "--bill-path", "-bp", prompt=_prompt("cembra bill file path")
+    ),
+    holders: str = typer.Option(
+        ...,
+        "--holders",
+        "-hds",
+        prompt=_prompt("cembra bill card holders delimited by commma e.g. John,Jane"),
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Bypass the cache and show where the parsing time is spent.",
+    ),
+    format: str = typer.Option(
+        "table",
+        "--format",
+        "-f",
+        help="table, or jsonl or csv with one record per holder.",
+    ),
+    quiet: bool = typer.Option(
+        False,
+        "--quiet",
+        "-q",
+        help="Only print the records, as jsonl unless --format csv.",
+    ),
+) -> None:
+    format = _output_format(format, quiet)
+    if profile and format != "table":
+        typer.secho("--profile is only shown with --format table", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    _status(f"Calulating total for following holder(s): {holders}", format, quiet)
+    _status(f"Bill located at path: {bill_path}", format, quiet)
+    holders_list = _parse_holders(holders)
+    res = container.calculate_total_by_card.calculate_bill_total_by_card(
+        bill_path, holders_list, profile=profile
+    )
+    if format != "table":
+        container.record_view(format).display_total_by_card(res, bill_path=bill_path)
+        return
+    container.console_view.display_total_by_card(res)
+    if res.profile is not None:
+        container.console_view.display_parsing_profile(res.profile)
+
+
+@app.command()
+def calculate_total_by_card_batch(
+    bills: str = typer.Option(
+        ...,
+        "--bills",
+        "-b",
+        prompt=_prompt(
+            "directory or glob pattern of the cembra bills e.g. bills/**/*.pdf"
+        ),
+    ),
+    holders: str = typer.Option(
+        ...,
+        "--holders",
+        "-hds",
+        prompt=_prompt("cembra bill card holders delimited by commma e.g. John,Jane"),
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Number of worker processes, defaults to the number of CPUs.",
+    ),
+    format: str = typer.Option(
+        "table",
+        "--format",
+        "-f",
+        help="table, or jsonl or csv with one record per bill and holder, "
+        "written as soon as the bill is parsed.",
+    ),
+    quiet: bool = typer.Option(
+        False,
+        "--quiet",
+        "-q",
+        help="Only print the records, as jsonl unless --format csv.",
+    ),
+) -> None:
+    format = _output_format(format, quiet)
+    bill_paths = _resolve_bill_paths(bills)
+    if len(bill_paths) == 0:
+        typer.secho(f"No bills found at: {bills}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(1)
+    _status(
+        f"Calulating total of {len(bill_paths)} bill(s) for: {holders}", format, quiet
+    )
+    batch_usecase = container.calculate_total_by_card_batch
+    bill_results = batch_usecase.calculate_bills_total_by_card(
+        bill_paths, _parse_holders(holders), max_workers=workers
+    )
+    if format != "table":
+        record_view = container.record_view(format)
+        for bill_result in bill_results:
+            record_view.display_bill_total_by_card(bill_result)
+        return
+    console_view = container.console_view
+    displayed_results = []
+    for bill_result in bill_results:
+        console_view.display_bill_total_by_card(bill_result)
+        displayed_results.append(bill_result)
+    console_view.display_total_by_holder(
+        batch_usecase.aggregate_total_by_holder(displayed_results)
+    )
+
+
+@app.command()
+def ingest(
+    bills: str = typer.Option(
+        ...,
+        "--bills",
+        "-b",
+        prompt=_prompt(
+            "directory or glob pattern of the cembra bills e.g. bills/**/*.pdf"
+        ),
+    ),
+    holders: str = typer.Option(
+        ...,
+        "--holders",
+        "-hds",
+        prompt=_prompt("cembra bill card holders delimited by commma e.g. John,Jane"),
+    ),
+    checkpoint: str = typer.Option(
+        ...,
+        "--checkpoint",
+        "-c",
+        prompt=_prompt("checkpoint file recording the result of every bill"),
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Number of worker processes, defaults to the number of CPUs.",
+    ),
+    timeout: Optional[float] = typer.Option(
+        None,
+        "--timeout",
+        min=0,
+        help="Seconds a bill may take to parse before it is recorded as failed.",
+    ),
+    retry_failed: bool = typer.Option(
+        False,
+        "--retry-failed",
+        help="Parse again the bills recorded as failed in the checkpoint.",
+    ),
+) -> None:
+    """Calculates the total by card of many bills, resuming from the checkpoint
+    of an interrupted run."""
+    from cembrabillreader.domain.usecases import CalculateTotalByCardBatch
+
+    bill_paths = _resolve_bill_paths(bills)
+    if len(bill_paths) == 0:
+        typer.secho(f"No bills found at: {bills}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    console_view = container.console_view
+    with container.ingestion_checkpoint(checkpoint) as ingestion_checkpoint:
+        typer.secho(f"Ingesting {len(bill_paths)} bill(s), checkpoint: {checkpoint}")
+        for bill_result in container.ingest_bills.ingest_bills(
+            bill_paths,
+            _parse_holders(holders),
+            ingestion_checkpoint,
+            retry_failed=retry_failed,
+            max_workers=workers,
+            timeout=timeout,
+        ):
+            console_view.display_bill_total_by_card(bill_result)
+        results = ingestion_checkpoint.results()
+    # the checkpoint records the bills by absolute path
+    bill_keys = dict.fromkeys(os.path.abspath(bill_path) for bill_path in bill_paths)
+    total = CalculateTotalByCardBatch.aggregate_total_by_holder(
+        results[key] for key in bill_keys if key in results
+    )
+    console_view.display_total_by_holder(total)
+    if total.bills_failed > 0:
+        raise typer.Exit(1)
+
+
+@app.command()
+def export_transactions(
+    bills: str = typer.Option(
+        ...,
+        "--bills",
+        "-b",
+        prompt=_prompt(
+            "directory or glob pattern of the cembra bills e.g. bills/**/*.pdf"
+        ),
+    ),
+    holders: str = typer.Option(
+        ...,
+        "--holders",
+        "-hds",
+        prompt=_prompt("cembra bill card holders delimited by commma e.g. John,Jane"),
+    ),
+    output: str = typer.Option(
+        ..., "--output", "-o", prompt=_prompt("file to export the transactions to")
+    ),
+    format: Optional[str] = typer.Option(
+        None,
+        "--format",
+        "-f",
+        help="One of csv, parquet or arrow, defaults to the output's extension.",
+    ),
+) -> None:
+    format = _export_format(output, format)
+    bill_paths = _resolve_bill_paths(bills)
+    if len(bill_paths) == 0:
+        typer.secho(f"No bills found at: {bills}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    with _transaction_writer(output, format) as writer:
+        result = container.export_transactions.export_transactions(
+            bill_paths, _parse_holders(holders), writer
+        )
+    typer.secho(
+        f"Exported {result.transactions_exported} transaction(s) of "
+        f"{result.bills_processed} bill(s) to {output}"
+    )
+    if result.bills_failed > 0:
+        typer.secho(
+            f"{result.bills_failed} bill(s) could not be parsed", fg=typer.colors.RED
+        )
+
+
+@app.command()
+def consolidate(
+    bills: str = typer.Option(
+        ...,
+        "--bills",
+        "-b",
+        prompt=_prompt(
+            "directory or glob pattern of the cembra bills e.g. bills/**/*.pdf"
+        ),
+    ),
+    holders: str = typer.Option(
+        ...,
+        "--holders",
+        "-hds",
+        prompt=_prompt("cembra bill card holders delimited by commma e.g. John,Jane"),
+    ),
+    output: Optional[str] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Also export the consolidated transactions to this file.",
+    ),
+    format: Optional[str] = typer.Option(
+        None,
+        "--format",
+        "-f",
+        help="One of csv, parquet or arrow, defaults to the output's extension.",
+    ),
+) -> None:
+    """Totals the transactions of overlapping bills by holder, counting the
+    transactions listed on several bills once."""
+    if output is not None:
+        format = _export_format(output, format)
+    bill_paths = _resolve_bill_paths(bills)
+    if len(bill_paths) == 0:
+        typer.secho(f"No bills found at: {bills}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    consolidate_transactions = container.consolidate_transactions
+    if output is None:
+        result = consolidate_transactions.consolidate_transactions(
+            bill_paths, _parse_holders(holders)
+        )
+    else:
+        with _transaction_writer(output, format) as writer:
+            result = consolidate_transactions.consolidate_transactions(
+                bill_paths, _parse_holders(holders), writer
+            )
+    container.console_view.display_consolidated_transactions(result)
+
+
+@app.command()
+def aggregate_transactions(
+    bills: str = typer.Option(
+        ...,
+        "--bills",
+        "-b",
+        prompt=_prompt(
+            "directory or glob pattern of the cembra bills e.g. bills/**/*.pdf"
+        ),
+    ),
+    holders: str = typer.Option(
+        ...,
+        "--holders",
+        "-hds",
+        prompt=_prompt("cembra bill card holders delimited by commma e.g. John,Jane"),
+    ),
+    by: str = typer.Option(
+        "month",
+        "--by",
+        help="Group the transactions by month, registration_date, merchant "
+        "or category.",
+    ),
+    categories: Optional[str] = typer.Option(
+        None,
+        "--categories",
+        help="JSON file mapping each category to merchant substrings, "
+        'e.g. {"groceries": ["migros", "coop"]}.',
+    ),
+) -> None:
+    from cembrabillreader.domain.aggregation import CategoryMapping
+
+    bill_paths = _resolve_bill_paths(bills)
+    if len(bill_paths) == 0:
+        typer.secho(f"No bills found at: {bills}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    category_mapping = None
+    if categories is not None:
+        with open(categories) as file:
+            category_mapping = CategoryMapping(json.load(file))
+    try:
+        result = container.aggregate_transactions.aggregate_transactions(
+            bill_paths, _parse_holders(holders), by, category_mapping
+        )
+    except ValueError as e:
+        typer.secho(str(e), fg=typer.colors.RED)
+        raise typer.Exit(1)
+    container.console_view.display_aggregate_transactions(result)
+
+
+@app.command()
+def sync(
+    bills: str = typer.Option(
+        ...,
+        "--bills",
+        "-b",
+        prompt=_prompt(
+            "directory or glob pattern of the cembra bills e.g. bills/**/*.pdf"
+        ),
     ),
     holders: str = typer.Option(
+        ...,
         "--holders",
         "-hds",
-        prompt="cembra bill card holders delimited by commma e.g. John,Jane",
+        prompt=_prompt("cembra bill card holders delimited by commma e.g. John,Jane"),
+    ),
+) -> None:
+    bill_paths = _resolve_bill_paths(bills)
+    typer.secho(f"Syncing {len(bill_paths)} bill(s) into {container.index_path}")
+    result = container.sync_bill_index.sync(bill_paths, _parse_holders(holders))
+    typer.secho(
+        f"Indexed: {result.bills_indexed}, unchanged: {result.bills_unchanged}, "
+        f"removed: {result.bills_removed}, failed: {result.bills_failed}"
+    )
+    if result.bills_failed > 0:
+        raise typer.Exit(1)
+
+
+@app.command()
+def total_by_holder(
+    start_date: Optional[datetime] = typer.Option(
+        None,
+        "--from",
+        formats=["%Y-%m-%d"],
+        help="Only count the transactions made on or after this date.",
+    ),
+    end_date: Optional[datetime] = typer.Option(
+        None,
+        "--to",
+        formats=["%Y-%m-%d"],
+        help="Only count the transactions made on or before this date.",
     ),
 ) -> None:
-    typer.secho(f"Calulating total for following holder(s): {holders}")
-    typer.secho(f"Bill located at path: {bill_path}")
-    holders_list = holders.split(",")
-    holders_list = [h.strip() for h in holders_list]
-    res = calculate_total_by_card_usecase.calculate_bill_total_by_card(
-        bill_path, holders_list
+    """Totals the transactions by holder from the bills indexed with sync."""
+    try:
+        result = container.sync_bill_index.total_by_holder(
+            None if start_date is None else start_date.date(),
+            None if end_date is None else end_date.date(),
+        )
+    except ValueError as e:
+        typer.secho(str(e), fg=typer.colors.RED)
+        raise typer.Exit(1)
+    container.console_view.display_total_by_holder(result)
+
+
+@app.command()
+def invalidate_cache(
+    bill_path: Optional[str] = typer.Option(
+        None,
+        "--bill-path",
+        "-bp",
+        help="Only invalidate the cached results of this bill.",
+    ),
+) -> None:
+    removed = container.cembra_bill_cache.invalidate(bill_path)
+    typer.secho(f"Removed {removed} cached bill(s)")
+
+
+@app.command("serve")
+def serve_command(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on."),
+    port: int = typer.Option(8080, "--port", "-p", help="Port to listen on."),
+    unix_socket: Optional[str] = typer.Option(
+        None, "--unix-socket", help="Listen on this unix socket instead of a port."
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Number of worker processes, defaults to the number of CPUs.",
+    ),
+    max_pending: Optional[int] = typer.Option(
+        None,
+        "--max-pending",
+        min=1,
+        help="Bills parsed or queued at once before rejecting requests, "
+        "defaults to four per worker.",
+    ),
+) -> None:
+    import asyncio
+    import functools
+    from concurrent.futures import ProcessPoolExecutor
+
+    from cembrabillreader.presentation.service import BillTotalService, serve
+
+    workers = workers or os.cpu_count() or 1
+    new_executor = functools.partial(ProcessPoolExecutor, max_workers=workers)
+    service = BillTotalService(
+        container.calculate_total_by_card,
+        executor=new_executor(),
+        max_pending=max_pending or 4 * workers,
+        executor_factory=new_executor,
     )
-    console_view.display_total_by_card(res)
+    try:
+        asyncio.run(serve(service, host=host, port=port, unix_socket=unix_socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # the service replaces the pool when a worker dies
+        service.executor.shutdown()
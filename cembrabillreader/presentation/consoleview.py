@@ -1,7 +1,15 @@
 from rich.console import Console
 from rich.table import Table
 
-from cembrabillreader.domain.entities import CalculateTotalByCardResult
+from cembrabillreader.domain.money import format_cents
+from cembrabillreader.domain.entities import (
+    AggregateTransactionsResult,
+    BillTotalByCardResult,
+    CalculateTotalByCardResult,
+    ConsolidateTransactionsResult,
+    ParsingProfile,
+    TotalByHolderResult,
+)
 
 
 class ConsoleView:
@@ -12,9 +20,91 @@ class ConsoleView:
 
     def display_total_by_card(self, total: CalculateTotalByCardResult):
         table = Table("Holder", "Total")
-        table.add_row(total.principal_card.card_holder, str(total.principal_card.total))
-        if total.additional_card is not None:
+        table.add_row(
+            total.principal_card.card_holder,
+            format_cents(total.principal_card.total_cents),
+        )
+        for additional_card in total.additional_cards:
             table.add_row(
-                total.additional_card.card_holder, str(total.additional_card.total)
+                additional_card.card_holder, format_cents(additional_card.total_cents)
             )
         self._console.print(table)
+
+    def display_bill_total_by_card(self, bill_total: BillTotalByCardResult):
+        if bill_total.result is None:
+            self._console.print(
+                f"[red]{bill_total.bill_path}: {bill_total.error}[/red]"
+            )
+            return
+        self._console.print(bill_total.bill_path)
+        self.display_total_by_card(bill_total.result)
+
+    def display_total_by_holder(self, total: TotalByHolderResult):
+        table = Table("Holder", "Total")
+        for card_total in total.totals:
+            table.add_row(card_total.card_holder, format_cents(card_total.total_cents))
+        self._console.print(table)
+        self._console.print(
+            f"Bills processed: {total.bills_processed}, failed: {total.bills_failed}"
+        )
+
+    def display_consolidated_transactions(
+        self, consolidated: ConsolidateTransactionsResult
+    ):
+        table = Table("Holder", "Total")
+        for card_total in consolidated.totals:
+            table.add_row(card_total.card_holder, format_cents(card_total.total_cents))
+        self._console.print(table)
+        self._console.print(
+            f"Transactions: {consolidated.transactions_consolidated}, "
+            f"duplicates removed: {consolidated.duplicates_removed}"
+        )
+        self._console.print(
+            f"Bills processed: {consolidated.bills_processed}, "
+            f"failed: {consolidated.bills_failed}"
+        )
+
+    def display_aggregate_transactions(self, aggregate: AggregateTransactionsResult):
+        table = Table(
+            aggregate.grouping.replace("_", " ").capitalize(), "Count", "Total"
+        )
+        for group in aggregate.totals:
+            table.add_row(
+                group.key, str(group.transactions), format_cents(group.total_cents)
+            )
+        self._console.print(table)
+        self._console.print(
+            f"Bills processed: {aggregate.bills_processed}, "
+            f"failed: {aggregate.bills_failed}"
+        )
+
+    def display_parsing_profile(self, profile: ParsingProfile):
+        stages = Table("Stage", "Time (ms)")
+        for stage, seconds in [
+            ("page selection", profile.page_selection_seconds),
+            ("extraction", profile.extraction_seconds),
+            ("  visitor", profile.visitor_seconds),
+            ("    holder matching", profile.holder_matching_seconds),
+            ("    row parsing", profile.row_parsing_seconds),
+            ("total", profile.total_seconds),
+        ]:
+            stages.add_row(stage, f"{seconds * 1000:.2f}")
+        self._console.print(stages)
+        self._console.print(
+            f"Fragments seen: {profile.fragments_seen}, "
+            f"rejected: {profile.fragments_rejected} "
+            f"({profile.fragments_rejected / max(profile.fragments_seen, 1):.0%}), "
+            f"holder matches: {profile.holder_matches}, "
+            f"rows accepted: {profile.rows_accepted}"
+        )
+
+        pages = Table("Page", "Extracted", "Time (ms)", "Fragments", "Rows")
+        for page in profile.pages:
+            pages.add_row(
+                str(page.page_number + 1),
+                "yes" if page.extracted else "no",
+                f"{page.seconds * 1000:.2f}",
+                str(page.fragments),
+                str(page.rows),
+            )
+        self._console.print(pages)
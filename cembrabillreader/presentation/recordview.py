@@ -0,0 +1,83 @@
+import csv
+import json
+import sys
+from typing import TextIO
+
+from cembrabillreader.domain.entities import (
+    BillTotalByCardResult,
+    CalculateTotalByCardResult,
+)
+from cembrabillreader.domain.money import format_cents
+
+RECORD_FORMATS = ("jsonl", "csv")
+RECORD_COLUMNS = (
+    "bill",
+    "holder",
+    "is_principal_holder",
+    "total_cents",
+    "total",
+    "error",
+)
+
+
+class RecordView:
+    """Writes the totals as JSON Lines or CSV, one record per bill and holder.
+
+    Every bill is flushed as soon as it is written, so the records can be
+    piped into other tools while a batch is running. Unlike ConsoleView, it
+    does not need rich.
+    """
+
+    _stream: TextIO
+    _format: str
+
+    def __init__(self, format: str, stream: TextIO | None = None) -> None:
+        if format not in RECORD_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(RECORD_FORMATS)}")
+        self._stream = sys.stdout if stream is None else stream
+        self._format = format
+        if format == "csv":
+            self._csv_writer = csv.writer(self._stream, lineterminator="\n")
+            self._csv_writer.writerow(RECORD_COLUMNS)
+
+    def display_total_by_card(
+        self, total: CalculateTotalByCardResult, bill_path: str | None = None
+    ):
+        for card_total, is_principal_holder in [(total.principal_card, True)] + [
+            (card_total, False) for card_total in total.additional_cards
+        ]:
+            self.__write(
+                (
+                    bill_path,
+                    card_total.card_holder,
+                    is_principal_holder,
+                    card_total.total_cents,
+                    format_cents(card_total.total_cents),
+                    None,
+                )
+            )
+        self._stream.flush()
+
+    def display_bill_total_by_card(self, bill_total: BillTotalByCardResult):
+        if bill_total.result is None:
+            self.__write(
+                (bill_total.bill_path, None, None, None, None, bill_total.error)
+            )
+            self._stream.flush()
+            return
+        self.display_total_by_card(bill_total.result, bill_path=bill_total.bill_path)
+
+    def __write(self, record: tuple) -> None:
+        if self._format == "jsonl":
+            self._stream.write(json.dumps(dict(zip(RECORD_COLUMNS, record))) + "\n")
+            return
+        self._csv_writer.writerow(map(self.__csv_value, record))
+
+    @staticmethod
+    def __csv_value(value):
+        # booleans are spelled like in the CSV export of the transactions
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return value
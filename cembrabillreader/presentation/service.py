@@ -0,0 +1,298 @@
+"""This module provides the Cembra Bill Reader HTTP service.
+
+The service keeps the use cases and a pool of parsing workers warm, so
+every request only pays for the parsing of its bill. Requests are served on
+an asyncio event loop while the bills are parsed in the worker pool; once
+``max_pending`` bills are being parsed or waiting for a worker, new requests
+are rejected with 503 instead of queueing without bound. A worker dying, e.g.
+killed for running out of memory on a bad PDF, breaks the pool: the request
+gets a 500 and, given an ``executor_factory``, the pool is replaced.
+
+    GET  /health
+    POST /total-by-card                   {"bill_path": "...", "holders": [...]}
+    POST /total-by-card?holders=John,Jane with the PDF as request body
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import BrokenExecutor, Executor
+from typing import Callable, NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+from cembrabillreader.domain.billfile import BillSource
+from cembrabillreader.domain.entities import CalculateTotalByCardResult
+from cembrabillreader.domain.usecases import CalculateTotalByCard
+
+DEFAULT_MAX_BODY_BYTES = 32 * 1024 * 1024
+_MAX_HEADER_LINES = 100
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+    503: "Service Unavailable",
+}
+
+
+class ServiceBusyError(Exception):
+    pass
+
+
+class _HttpError(Exception):
+    status: int
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _HttpRequest(NamedTuple):
+    method: str
+    path: str
+    query: dict[str, list[str]]
+    headers: dict[str, str]
+    body: bytes
+
+
+class BillTotalService:
+    __calculate_total_by_card: CalculateTotalByCard
+    __executor: Executor
+    __executor_factory: Callable[[], Executor] | None
+    __max_pending: int
+    __max_body_bytes: int
+    __pending: int
+
+    def __init__(
+        self,
+        calculate_total_by_card: CalculateTotalByCard,
+        executor: Executor,
+        max_pending: int,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        executor_factory: Callable[[], Executor] | None = None,
+    ) -> None:
+        self.__calculate_total_by_card = calculate_total_by_card
+        self.__executor = executor
+        self.__executor_factory = executor_factory
+        self.__max_pending = max_pending
+        self.__max_body_bytes = max_body_bytes
+        self.__pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self.__pending
+
+    @property
+    def executor(self) -> Executor:
+        return self.__executor
+
+    async def calculate_bill_total_by_card(
+        self, bill_path: BillSource, expected_holders: list[str]
+    ) -> CalculateTotalByCardResult:
+        if self.__pending >= self.__max_pending:
+            raise ServiceBusyError(f"{self.__pending} bills are already pending")
+        self.__pending += 1
+        executor = self.__executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor,
+                self.__calculate_total_by_card.calculate_bill_total_by_card,
+                bill_path,
+                expected_holders,
+            )
+        except BrokenExecutor:
+            self.__replace_broken_executor(executor)
+            raise
+        finally:
+            self.__pending -= 1
+
+    def __replace_broken_executor(self, executor: Executor) -> None:
+        # the requests pending on the broken executor fail together, it is
+        # replaced only once
+        if self.__executor_factory is None or executor is not self.__executor:
+            return
+        logging.error("a parsing worker died, replacing the worker pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.__executor = self.__executor_factory()
+
+    async def calculate_uploaded_bill_total_by_card(
+        self, bill: bytes, expected_holders: list[str]
+    ) -> CalculateTotalByCardResult:
+        # the repositories read the uploaded bytes as they are, no temp file
+        return await self.calculate_bill_total_by_card(bill, expected_holders)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await self.__read_request(reader)
+                except _HttpError as e:
+                    self.__write_response(writer, e.status, {"error": str(e)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                status, body, extra_headers = await self.__dispatch(request)
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                self.__write_response(writer, status, body, keep_alive, extra_headers)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def __dispatch(
+        self, request: _HttpRequest
+    ) -> tuple[int, dict | str, dict[str, str]]:
+        if request.path == "/health":
+            if request.method != "GET":
+                return 405, {"error": "method not allowed"}, {}
+            return 200, {"status": "ok", "pending": self.__pending}, {}
+        if request.path != "/total-by-card":
+            return 404, {"error": "not found"}, {}
+        if request.method != "POST":
+            return 405, {"error": "method not allowed"}, {}
+
+        try:
+            content_type = request.headers.get("content-type", "")
+            if content_type.startswith("application/json"):
+                bill_path, holders = self.__parse_json_request(request.body)
+                result = await self.calculate_bill_total_by_card(bill_path, holders)
+            else:
+                holders = [
+                    h.strip()
+                    for value in request.query.get("holders", [])
+                    for h in value.split(",")
+                ]
+                result = await self.calculate_uploaded_bill_total_by_card(
+                    request.body, holders
+                )
+        except _HttpError as e:
+            return e.status, {"error": str(e)}, {}
+        except ServiceBusyError as e:
+            return 503, {"error": str(e)}, {"Retry-After": "1"}
+        except ValueError as e:
+            return 422, {"error": str(e)}, {}
+        except Exception:
+            logging.exception("cannot calculate the total of a bill")
+            return 500, {"error": "internal error"}, {}
+        return 200, result.model_dump_json(), {}
+
+    @staticmethod
+    def __parse_json_request(body: bytes) -> tuple[str, list[str]]:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise _HttpError(400, "request body is not valid json")
+        if not isinstance(payload, dict):
+            raise _HttpError(400, "request body must be a json object")
+        bill_path = payload.get("bill_path")
+        holders = payload.get("holders")
+        if not isinstance(bill_path, str):
+            raise _HttpError(400, "bill_path must be a string")
+        if not isinstance(holders, list) or not all(
+            isinstance(h, str) for h in holders
+        ):
+            raise _HttpError(400, "holders must be a list of strings")
+        return bill_path, holders
+
+    async def __read_request(self, reader: asyncio.StreamReader) -> _HttpRequest | None:
+        request_line = await self.__read_line(reader, 400, "request line too long")
+        if request_line == b"":
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            raise _HttpError(400, "malformed request line")
+
+        headers = {}
+        for _ in range(_MAX_HEADER_LINES):
+            line = await self.__read_line(reader, 431, "header line too long")
+            line = line.decode("latin-1").strip()
+            if line == "":
+                break
+            name, separator, value = line.partition(":")
+            if separator == "":
+                raise _HttpError(400, "malformed header")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise _HttpError(400, "too many headers")
+
+        transfer_encoding = headers.get("transfer-encoding", "identity").lower()
+        if transfer_encoding == "chunked":
+            raise _HttpError(411, "chunked request bodies are not supported")
+        if transfer_encoding != "identity":
+            raise _HttpError(501, f"unsupported transfer-encoding {transfer_encoding}")
+        try:
+            content_length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise _HttpError(400, "malformed content-length")
+        if content_length < 0:
+            raise _HttpError(400, "malformed content-length")
+        if content_length > self.__max_body_bytes:
+            raise _HttpError(413, "request body too large")
+        body = await reader.readexactly(content_length) if content_length else b""
+
+        url = urlsplit(target)
+        return _HttpRequest(method, url.path, parse_qs(url.query), headers, body)
+
+    @staticmethod
+    async def __read_line(
+        reader: asyncio.StreamReader, status: int, message: str
+    ) -> bytes:
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # the line does not fit in the buffer of the stream
+            raise _HttpError(status, message)
+
+    @staticmethod
+    def __write_response(
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: dict | str,
+        keep_alive: bool,
+        extra_headers: dict[str, str] | None = None,
+    ) -> None:
+        payload = (body if isinstance(body, str) else json.dumps(body)).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(payload)),
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        headers.update(extra_headers or {})
+        head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        writer.write(head.encode("latin-1") + b"\r\n" + payload)
+
+
+async def serve(
+    service: BillTotalService,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    unix_socket: str | None = None,
+) -> None:
+    if unix_socket is not None:
+        server = await asyncio.start_unix_server(
+            service.handle_connection, path=unix_socket
+        )
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+    for socket in server.sockets:
+        logging.info("serving on %s", socket.getsockname())
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,84 @@
+import datetime
+from decimal import Decimal
+
+from cembrabillreader.domain.transactionstore import BillTransaction
+from cembrabillreader.domain.transactionwriter import (
+    EXPORT_COLUMNS,
+    TransactionWriter,
+)
+
+ARROW_FORMATS = ("parquet", "arrow")
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+class ArrowTransactionWriter(TransactionWriter):
+    """Writes the transactions as Parquet or as an Arrow IPC file.
+
+    Every chunk becomes a Parquet row group or an Arrow record batch, the
+    dates are date32 and the amounts decimal128(18, 2). Requires pyarrow,
+    which is an optional dependency.
+    """
+
+    def __init__(self, path: str, format: str = "parquet") -> None:
+        if format not in ARROW_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(ARROW_FORMATS)}")
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ImportError(
+                f"exporting to {format} requires pyarrow, "
+                "install it with: pip install pyarrow"
+            ) from e
+
+        self.__pa = pyarrow
+        self.__schema = pyarrow.schema(
+            list(
+                zip(
+                    EXPORT_COLUMNS,
+                    [
+                        pyarrow.string(),
+                        pyarrow.string(),
+                        pyarrow.bool_(),
+                        pyarrow.date32(),
+                        pyarrow.date32(),
+                        pyarrow.string(),
+                        pyarrow.decimal128(18, 2),
+                    ],
+                )
+            )
+        )
+        if format == "parquet":
+            import pyarrow.parquet
+
+            self.__writer = pyarrow.parquet.ParquetWriter(path, self.__schema)
+        else:
+            self.__writer = pyarrow.ipc.new_file(path, self.__schema)
+
+    def write(self, transactions: list[BillTransaction]) -> None:
+        pa = self.__pa
+        records = [t.transaction for t in transactions]
+        batch = pa.record_batch(
+            [
+                pa.array([t.bill_path for t in transactions], pa.string()),
+                pa.array([t.holder for t in transactions], pa.string()),
+                pa.array([t.is_principal_holder for t in transactions], pa.bool_()),
+                self.__dates([r.transaction_date for r in records]),
+                self.__dates([r.registration_date for r in records]),
+                pa.array([r.description for r in records], pa.string()),
+                pa.array(
+                    [Decimal(r.amount_cents).scaleb(-2) for r in records],
+                    pa.decimal128(18, 2),
+                ),
+            ],
+            schema=self.__schema,
+        )
+        self.__writer.write_batch(batch)
+
+    def __dates(self, ordinals: list[int]):
+        pa = self.__pa
+        return pa.array(
+            [ordinal - _EPOCH_ORDINAL for ordinal in ordinals], pa.int32()
+        ).cast(pa.date32())
+
+    def close(self) -> None:
+        self.__writer.close()
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+from pydantic import ValidationError
+
+from cembrabillreader.domain.billfile import (
+    BillSource,
+    content_hash,
+    describe_bill,
+)
+from cembrabillreader.domain.entities import CembraBill
+from cembrabillreader.domain.repository import CembraBillRepository
+
+DEFAULT_MAX_CACHE_SIZE_BYTES = 256 * 1024 * 1024
+CACHE_ENTRY_SUFFIX = ".json"
+
+
+class CachingCembraBillRepository(CembraBillRepository):
+    """Stores the bills loaded by another repository on disk.
+
+    Entries are keyed by the content hash of the PDF, the expected holders and
+    the parser version of the wrapped repository, so a bill is only parsed
+    again when one of them changes. The least recently used entries are
+    evicted once the cache grows over ``max_size_bytes``.
+    """
+
+    __repository: CembraBillRepository
+    __cache_dir: str
+    __max_size_bytes: int
+
+    def __init__(
+        self,
+        repository: CembraBillRepository,
+        cache_dir: str,
+        max_size_bytes: int = DEFAULT_MAX_CACHE_SIZE_BYTES,
+    ) -> None:
+        self.__repository = repository
+        self.__cache_dir = cache_dir
+        self.__max_size_bytes = max_size_bytes
+        self.parser_version = repository.parser_version
+
+    def load_cembra_bill(
+        self,
+        path_to_bill: BillSource,
+        expected_holders: list[str],
+        profile: bool = False,
+    ) -> CembraBill:
+        if profile:
+            # a cached bill would not tell anything about the parsing
+            return self.__repository.load_cembra_bill(
+                path_to_bill, expected_holders, profile=True
+            )
+        content_hash = self.content_hash(path_to_bill)
+        entry_path = self.__entry_path(content_hash, expected_holders)
+
+        cembra_bill = self.__read_entry(entry_path)
+        if cembra_bill is not None:
+            logging.debug("cache hit for %s", describe_bill(path_to_bill))
+            return cembra_bill
+
+        cembra_bill = self.__repository.load_cembra_bill(path_to_bill, expected_holders)
+        self.__write_entry(entry_path, cembra_bill)
+        self.__evict()
+        return cembra_bill
+
+    def invalidate(self, path_to_bill: str | None = None) -> int:
+        """Removes the entries of a bill, or every entry when no bill is given.
+
+        Returns the number of removed entries.
+        """
+        prefix = "" if path_to_bill is None else self.content_hash(path_to_bill)
+        removed = 0
+        for entry_name, _, _ in self.__entries():
+            if entry_name.startswith(prefix) and self.__remove(entry_name):
+                removed += 1
+        return removed
+
+    @staticmethod
+    def content_hash(path_to_bill: BillSource) -> str:
+        return content_hash(path_to_bill)
+
+    def __entry_path(self, content_hash: str, expected_holders: list[str]) -> str:
+        key = hashlib.sha256(
+            "\0".join(
+                [type(self.__repository).__qualname__, self.parser_version]
+                + expected_holders
+            ).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(
+            self.__cache_dir, f"{content_hash}-{key[:16]}{CACHE_ENTRY_SUFFIX}"
+        )
+
+    def __read_entry(self, entry_path: str) -> CembraBill | None:
+        try:
+            with open(entry_path, "rb") as file:
+                cembra_bill = CembraBill.model_validate_json(file.read())
+        except FileNotFoundError:
+            return None
+        except ValidationError as e:
+            logging.warning("discarding corrupted cache entry %s: %s", entry_path, e)
+            self.__remove(os.path.basename(entry_path))
+            return None
+        # the modification time tracks the last use for the LRU eviction
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+        return cembra_bill
+
+    def __write_entry(self, entry_path: str, cembra_bill: CembraBill) -> None:
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        # write then rename so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.__cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(cembra_bill.model_dump_json().encode("utf-8"))
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __evict(self) -> None:
+        entries = self.__entries()
+        cache_size = sum(size for _, size, _ in entries)
+        for entry_name, size, _ in sorted(entries, key=lambda e: e[2]):
+            if cache_size <= self.__max_size_bytes:
+                break
+            if self.__remove(entry_name):
+                cache_size -= size
+
+    def __entries(self) -> list[tuple[str, int, float]]:
+        entries = []
+        try:
+            with os.scandir(self.__cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(CACHE_ENTRY_SUFFIX):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.name, stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def __remove(self, entry_name: str) -> bool:
+        try:
+            os.remove(os.path.join(self.__cache_dir, entry_name))
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,36 @@
+import csv
+import datetime
+
+from cembrabillreader.domain.money import format_cents
+from cembrabillreader.domain.transactionstore import BillTransaction
+from cembrabillreader.domain.transactionwriter import (
+    EXPORT_COLUMNS,
+    TransactionWriter,
+)
+
+
+class CsvTransactionWriter(TransactionWriter):
+    """Writes the transactions as CSV with ISO dates and amounts like 470.00."""
+
+    def __init__(self, path: str) -> None:
+        self.__file = open(path, "w", newline="", encoding="utf-8")
+        self.__writer = csv.writer(self.__file)
+        self.__writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, transactions: list[BillTransaction]) -> None:
+        fromordinal = datetime.date.fromordinal
+        self.__writer.writerows(
+            (
+                bill_path,
+                holder,
+                "true" if is_principal_holder else "false",
+                fromordinal(record.transaction_date).isoformat(),
+                fromordinal(record.registration_date).isoformat(),
+                record.description,
+                format_cents(record.amount_cents),
+            )
+            for bill_path, holder, is_principal_holder, record in transactions
+        )
+
+    def close(self) -> None:
+        self.__file.close()
@@ -0,0 +1,69 @@
+import logging
+import os
+
+from pydantic import ValidationError
+
+from cembrabillreader.domain.checkpoint import IngestionCheckpoint
+from cembrabillreader.domain.entities import BillTotalByCardResult
+
+
+class JsonlIngestionCheckpoint(IngestionCheckpoint):
+    """Appends the results to a JSON Lines file, one bill per line.
+
+    Every line is flushed and synced before record returns. A run killed in
+    the middle of a line leaves it incomplete, it is ignored when the file
+    is read again; the last line of a bill wins. The bills are recorded with
+    their absolute path, so a run resumed from another working directory or
+    spelling the paths differently finds them.
+    """
+
+    def __init__(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        self.__results: dict[str, BillTotalByCardResult] = {}
+        if os.path.exists(path):
+            self.__results = self.__read(path)
+        self.__file = open(path, "a", encoding="utf-8")
+        if self.__file.tell() > 0 and not self.__ends_with_newline(path):
+            # keeps the next line apart from an incomplete one
+            self.__file.write("\n")
+
+    def results(self) -> dict[str, BillTotalByCardResult]:
+        return dict(self.__results)
+
+    def record(self, result: BillTotalByCardResult) -> None:
+        bill_path = os.path.abspath(result.bill_path)
+        result = result.model_copy(update={"bill_path": bill_path})
+        self.__file.write(result.model_dump_json() + "\n")
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__results[bill_path] = result
+
+    def close(self) -> None:
+        self.__file.close()
+
+    @staticmethod
+    def __read(path: str) -> dict[str, BillTotalByCardResult]:
+        results = {}
+        with open(path, encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip() == "":
+                    continue
+                try:
+                    result = BillTotalByCardResult.model_validate_json(line)
+                except ValidationError:
+                    logging.warning(
+                        "ignoring incomplete line %d of checkpoint %s",
+                        line_number,
+                        path,
+                    )
+                    continue
+                results[os.path.abspath(result.bill_path)] = result
+        return results
+
+    @staticmethod
+    def __ends_with_newline(path: str) -> bool:
+        with open(path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b"\n"
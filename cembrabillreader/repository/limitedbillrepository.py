@@ -0,0 +1,112 @@
+from functools import partial
+from typing import Callable, Iterator
+
+from cembrabillreader.domain.billfile import BillSource, describe_bill, open_bill
+from cembrabillreader.domain.entities import CembraBill
+from cembrabillreader.domain.errors import BillMemoryLimitError, BillParsingError
+from cembrabillreader.domain.repository import CembraBillRepository
+from cembrabillreader.domain.supervisor import run_supervised
+from cembrabillreader.domain.transactionstore import HolderTransaction
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+
+def _run_with_memory_limit(
+    memory_limit_bytes: int | None, function: Callable, *arguments
+):
+    if memory_limit_bytes is not None:
+        _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+        if hard_limit != resource.RLIM_INFINITY:
+            memory_limit_bytes = min(memory_limit_bytes, hard_limit)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, hard_limit))
+    try:
+        return function(*arguments)
+    except MemoryError:
+        raise BillMemoryLimitError(
+            f"needed more than {memory_limit_bytes} bytes of memory"
+        )
+
+
+def _list_transactions(
+    iter_transactions: Callable, path_to_bill: BillSource, expected_holders
+) -> list[HolderTransaction]:
+    return list(iter_transactions(path_to_bill, expected_holders))
+
+
+class LimitedCembraBillRepository(CembraBillRepository):
+    """Parses the bills of another repository within time and memory limits.
+
+    Every bill is parsed in a supervised process of its own, see
+    run_supervised, which is killed once it runs longer than
+    ``timeout_seconds``; its address space is limited to
+    ``memory_limit_bytes``. A bill over a limit raises a BillTimeoutError or
+    BillMemoryLimitError, the caller's process is never stalled by it.
+    The transactions of a bill are only yielded once it is parsed.
+    """
+
+    __repository: CembraBillRepository
+    __timeout_seconds: float | None
+    __memory_limit_bytes: int | None
+
+    def __init__(
+        self,
+        repository: CembraBillRepository,
+        timeout_seconds: float | None = None,
+        memory_limit_bytes: int | None = None,
+    ) -> None:
+        if memory_limit_bytes is not None and resource is None:
+            raise ValueError("memory limits are not supported on this platform")
+        self.__repository = repository
+        self.__timeout_seconds = timeout_seconds
+        self.__memory_limit_bytes = memory_limit_bytes
+        self.parser_version = repository.parser_version
+
+    def load_cembra_bill(
+        self,
+        path_to_bill: BillSource,
+        expected_holders: list[str],
+        profile: bool = False,
+    ) -> CembraBill:
+        return self.__run_supervised(
+            self.__repository.load_cembra_bill,
+            path_to_bill,
+            expected_holders,
+            profile,
+        )
+
+    def iter_transactions(
+        self, path_to_bill: BillSource, expected_holders: list[str]
+    ) -> Iterator[HolderTransaction]:
+        yield from self.__run_supervised(
+            partial(_list_transactions, self.__repository.iter_transactions),
+            path_to_bill,
+            expected_holders,
+        )
+
+    def __run_supervised(
+        self, function: Callable, path_to_bill: BillSource, *arguments
+    ):
+        description = describe_bill(path_to_bill)
+        if not isinstance(path_to_bill, (str, bytes)):
+            # streams, buffers and mmaps do not all reach a worker process
+            with open_bill(path_to_bill) as file:
+                path_to_bill = file.read()
+        ((_, result, error),) = run_supervised(
+            _run_with_memory_limit,
+            [
+                (
+                    description,
+                    (self.__memory_limit_bytes, function, path_to_bill, *arguments),
+                )
+            ],
+            max_workers=1,
+            timeout=self.__timeout_seconds,
+        )
+        if isinstance(error, BillParsingError):
+            raise type(error)(f"{description}: {error}") from error
+        if error is not None:
+            raise error
+        return result
@@ -1,43 +1,169 @@
 import datetime
 import logging
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Iterator
 from dateutil import parser
 import pypdf
+from pypdf.generic import ArrayObject, NameObject
 
-from cembrabillreader.domain.entities import Card, CembraBill, Transaction
+from cembrabillreader.diagnostics import fragment_trace_logger
+from cembrabillreader.domain.billfile import BillSource, describe_bill, open_bill
+from cembrabillreader.domain.entities import (
+    Card,
+    CembraBill,
+    PageProfile,
+    ParsingProfile,
+    Transaction,
+)
+from cembrabillreader.domain.errors import BillParsingError
+from cembrabillreader.domain.money import to_cents
 from cembrabillreader.domain.repository import CembraBillRepository
+from cembrabillreader.domain.transactionstore import (
+    HolderTransaction,
+    TransactionRecord,
+    TransactionStore,
+)
 
 
 # table entry example: 04.06.2023 05.06.2023 Merchant Name CHE 470.00
+BOOK_ENTRY_DATES = re.compile(r"(\d{2})\.(\d{2})\.(\d{4}) (\d{2})\.(\d{2})\.(\d{4}) ")
+
+
+def parse_book_entry(
+    book_entry: str, dateutil_fallback: bool = False
+) -> TransactionRecord | None:
+    """Parses a booking table row, returns None for any other fragment.
+
+    Rows are expected to start with two dd.mm.yyyy dates; when
+    dateutil_fallback is set, fragments not matching this format are
+    parsed by dateutil instead of being rejected.
+    """
+    match = BOOK_ENTRY_DATES.match(book_entry)
+    if match is None:
+        if dateutil_fallback:
+            transaction = _from_fuzzy_book_entry(book_entry)
+            return None if transaction is None else transaction.to_record()
+        return None
+
+    description, _, amount_entry = book_entry[match.end() :].rpartition(" ")
+    try:
+        day, month, year, reg_day, reg_month, reg_year = map(int, match.groups())
+        transaction_date = datetime.date(year, month, day).toordinal()
+        registration_date = datetime.date(reg_year, reg_month, reg_day).toordinal()
+        amount_cents = to_cents(amount_entry)
+    except ValueError:
+        return None
+    return TransactionRecord(
+        transaction_date=transaction_date,
+        registration_date=registration_date,
+        description=description,
+        amount_cents=amount_cents,
+    )
+
+
 class PdfTableTransaction(Transaction):
-    def from_book_entry(book_entry: str):
-        entries = book_entry.split(" ")
-        transaction_date: datetime = None
-        registration_date: datetime = None
-        description: str = ""
-        amount: float = None
-        try:
-            transaction_date = parser.parse(entries[0]).date()
-            registration_date = parser.parse(entries[1]).date()
-            amount = float(entries[len(entries) - 1])
-            amount = round(amount, 2)
-            description_parts = entries[2 : len(entries) - 1]
-            description = " ".join(description_parts)
-            return Transaction(
-                transaction_date=transaction_date,
-                registration_date=registration_date,
-                amount=amount,
-                description=description,
-            )
-        except Exception as e:
+    def from_book_entry(book_entry: str, dateutil_fallback: bool = False):
+        record = parse_book_entry(book_entry, dateutil_fallback=dateutil_fallback)
+        return None if record is None else Transaction.from_record(record)
+
+
+def _from_fuzzy_book_entry(book_entry: str):
+    entries = book_entry.split(" ")
+    try:
+        transaction_date = parser.parse(entries[0], dayfirst=True).date()
+        registration_date = parser.parse(entries[1], dayfirst=True).date()
+        amount = entries[len(entries) - 1]
+        description_parts = entries[2 : len(entries) - 1]
+        description = " ".join(description_parts)
+        return Transaction(
+            transaction_date=transaction_date,
+            registration_date=registration_date,
+            amount=amount,
+            description=description,
+        )
+    except Exception as e:
+        return None
+
+
+class HolderMatcher:
+    """Finds the expected holders in a text with a single precompiled regex.
+
+    The holder names are merged into a trie shaped pattern, so the cost of a
+    search depends on the length of the text and not on the number of holders.
+    """
+
+    _holders_by_name: dict[str, str]
+    _pattern: re.Pattern | None
+
+    def __init__(self, expected_holders: list[str]) -> None:
+        self._holders_by_name = {}
+        for holder in expected_holders:
+            if holder != "":
+                self._holders_by_name.setdefault(holder.lower(), holder)
+        self._pattern = (
+            re.compile(self.__trie_pattern(self._holders_by_name), re.IGNORECASE)
+            if len(self._holders_by_name) > 0
+            else None
+        )
+
+    def search(self, text: str) -> str | None:
+        if self._pattern is None:
             return None
+        match = self._pattern.search(text)
+        if match is None:
+            return None
+        return self._holders_by_name.get(match.group(0).lower())
+
+    def find(self, input_holder: str) -> str | None:
+        """Returns the expected holder named input_holder or containing it."""
+        name = input_holder.lower()
+        holder = self._holders_by_name.get(name)
+        if holder is not None:
+            return holder
+        for expected_name, expected_holder in self._holders_by_name.items():
+            if name in expected_name:
+                return expected_holder
+        return None
+
+    @staticmethod
+    def __trie_pattern(names) -> str:
+        trie: dict = {}
+        for name in names:
+            node = trie
+            for char in name:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: dict) -> str:
+            branches = [
+                re.escape(char) + build(child)
+                for char, child in node.items()
+                if char != ""
+            ]
+            if len(branches) == 0:
+                return ""
+            pattern = (
+                branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            )
+            # the longest name matching at a position wins
+            return f"(?:{pattern})?" if "" in node else pattern
+
+        return build(trie)
 
 
 class TransactionsVisitorHelper:
     _reading_principal_card_transactions: bool
     _expected_holders: list[str]
-    _cards_by_holder: dict[str, Card]
+    _holder_matcher: HolderMatcher
+    _stores_by_holder: dict[str, TransactionStore]
+    _principal_holders: set[str]
+    _streamed: list[HolderTransaction] | None
     _current_holder: str | None
     _visited_holders: set[str]
+    _rows: int
 
     def __validate_string_list(self, argument):
         if not isinstance(argument, list):
@@ -46,28 +172,27 @@ class TransactionsVisitorHelper:
         if not all(isinstance(item, str) for item in argument):
             raise ValueError("All items in the list must be strings.")
 
-    def __init__(self, expected_holders: list[str]) -> None:
+    def __init__(self, expected_holders: list[str], stream: bool = False) -> None:
+        """
+        stream: instead of keeping the transactions in the cards, buffer them
+            until they are taken with take_streamed.
+        """
         self.__validate_string_list(expected_holders)
         self._expected_holders = expected_holders
-        self._cards_by_holder = {}
+        self._holder_matcher = HolderMatcher(expected_holders)
+        self._stores_by_holder = {}
+        self._principal_holders = set()
+        self._streamed = [] if stream else None
         self._visited_holders = set()
         self._current_holder = None
         self._reading_principal_card_transactions = False
+        self._rows = 0
 
     def dispatch_next_transactions_to_holder(self, input_holder: str):
-        logging.debug("dispatch_next_transactions_to_holder: %s ", input_holder)
-        holders = [
-            expected_holder
-            for expected_holder in self._expected_holders
-            if input_holder.lower() in expected_holder.lower()
-        ]
-        if (holders is None or len(holders) == 0) or (
-            holders[0] == "" or holders[0] is None
-        ):
+        holder = self._holder_matcher.find(input_holder)
+        if holder is None:
             raise ValueError("Holder could not be found")
 
-        holder = holders[0]
-
         # first time matching a holder
         if self._current_holder is None:
             self._reading_principal_card_transactions = True
@@ -79,65 +204,749 @@ class TransactionsVisitorHelper:
         self._current_holder = holder
 
     def matches_holder(self, booking_entry: str) -> str | None:
-        matched_holder = [
-            expected_holder
-            for expected_holder in self._expected_holders
-            if booking_entry.lower().find(expected_holder.lower()) != -1
-        ]
-        if len(matched_holder) == 0:
-            return None
-        holder = matched_holder.pop()
-
-        return holder
+        return self._holder_matcher.search(booking_entry)
 
     def add_transaction(self, transaction: Transaction):
-        logging.debug("add_transaction: %s ", transaction)
+        self.add_record(transaction.to_record())
+
+    def add_record(self, record: TransactionRecord):
         if self._current_holder is None:
             raise ValueError("Holder for transaction is not set")
-        logging.debug("TransactionsDispatcher.add_transaction")
-        if self._current_holder not in self._cards_by_holder:
-            self._cards_by_holder[self._current_holder] = Card(
-                holder=self._current_holder,
-                is_principal_holder=self._reading_principal_card_transactions,
-                transactions=[],
+        self._rows += 1
+        store = self._stores_by_holder.get(self._current_holder)
+        if store is None:
+            store = self._stores_by_holder[self._current_holder] = TransactionStore()
+            if self._reading_principal_card_transactions:
+                self._principal_holders.add(self._current_holder)
+        if self._streamed is None:
+            store.append(record)
+        else:
+            self._streamed.append(
+                HolderTransaction(
+                    self._current_holder,
+                    self._current_holder in self._principal_holders,
+                    record,
+                )
             )
-        self._cards_by_holder[self._current_holder].add_transaction(transaction)
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    def take_streamed(self) -> list[HolderTransaction]:
+        streamed = self._streamed
+        self._streamed = []
+        return streamed
 
     @property
     def cards(self) -> list[Card]:
-        return [v for v in self._cards_by_holder.values()]
+        return [
+            Card.from_store(
+                holder=holder,
+                is_principal_holder=holder in self._principal_holders,
+                store=store,
+            )
+            for holder, store in self._stores_by_holder.items()
+        ]
+
+
+class BookingPageSelector:
+    """Tells whether a page may contain booking table rows or holder headers.
+
+    The check scans the raw content stream instead of extracting its text, so
+    it is only conclusive for pages showing literal strings in simple fonts:
+    whenever the content cannot be inspected cheaply the page is selected.
+    """
+
+    _LITERAL_STRING = re.compile(rb"\(((?:[^()\\]|\\.)*)\)", re.DOTALL)
+    _HEX_STRING = re.compile(rb"<[0-9A-Fa-f\s]*>\s*(?:Tj|\]|'|\")")
+    _ESCAPE = re.compile(rb"\\([0-7]{1,3}|.)", re.DOTALL)
+    _ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+    _DATE = re.compile(rb"\d{2}\.\d{2}\.\d{4}")
+
+    # word spacing is often kerning, e.g. [(Jane)-600(Smith)] TJ, so names are
+    # compared without their whitespace
+    _WHITESPACE = b" \t\n\r\f\v\x00"
+    # the Symbolic flag of a font descriptor, its glyphs are not standard text
+    _SYMBOLIC_FLAG = 1 << 2
+
+    _holders: list[bytes] | None
+
+    def __init__(self, expected_holders: list[str]) -> None:
+        lowered = [h.lower() for h in expected_holders]
+        # non ascii names cannot be matched case insensitively on raw bytes
+        self._holders = (
+            [h.encode("ascii").translate(None, self._WHITESPACE) for h in lowered]
+            if all(h.isascii() for h in lowered)
+            else None
+        )
+
+    def may_contain_bookings(self, page: pypdf.PageObject) -> bool:
+        data = self.__raw_content(page)
+        if data is None:
+            return False
+        if b"BT" not in data:
+            # no text is shown on the page, e.g. a scanned marketing insert,
+            # unless it is drawn from within a form xobject
+            return self.__has_form_xobject(page)
+        if self._holders is None or not self.__has_inspectable_text(page, data):
+            return True
+
+        text = b"".join(self._LITERAL_STRING.findall(data))
+        if b"\\" in text:
+            text = self._ESCAPE.sub(self.__unescape, text)
+        if self._DATE.search(text) is not None:
+            return True
+        text = text.lower().translate(None, self._WHITESPACE)
+        return any(holder in text for holder in self._holders)
+
+    def __raw_content(self, page: pypdf.PageObject) -> bytes | None:
+        contents = page.get(NameObject("/Contents"))
+        if contents is None:
+            return None
+        contents = contents.get_object()
+        if isinstance(contents, ArrayObject):
+            return b"\n".join(c.get_object().get_data() for c in contents)
+        return contents.get_data()
+
+    def __has_inspectable_text(self, page: pypdf.PageObject, data: bytes) -> bool:
+        if self._HEX_STRING.search(data) is not None:
+            return False
+        if self.__has_form_xobject(page):
+            return False
+        resources = page.get(NameObject("/Resources"))
+        if resources is None:
+            return True
+        for font in resources.get_object().get("/Font", {}).values():
+            if not self.__has_plain_encoding(font.get_object()):
+                return False
+        return True
+
+    @staticmethod
+    def __has_form_xobject(page: pypdf.PageObject) -> bool:
+        # text may be drawn from within form xobjects
+        resources = page.get(NameObject("/Resources"))
+        if resources is None:
+            return False
+        return any(
+            xobject.get_object().get("/Subtype") == "/Form"
+            for xobject in resources.get_object().get("/XObject", {}).values()
+        )
+
+    @classmethod
+    def __has_plain_encoding(cls, font) -> bool:
+        # composite and type 3 fonts do not encode text as plain bytes
+        if font.get("/Subtype") not in ("/Type1", "/TrueType"):
+            return False
+        # the bytes of fonts mapping their own codes to unicode, e.g. subset
+        # TrueType fonts, are not the text pypdf extracts
+        if "/ToUnicode" in font:
+            return False
+        encoding = font.get("/Encoding")
+        if encoding is not None:
+            encoding = encoding.get_object()
+            if not isinstance(encoding, NameObject) and "/Differences" in encoding:
+                return False
+        descriptor = font.get("/FontDescriptor")
+        if descriptor is not None:
+            flags = descriptor.get_object().get("/Flags", 0)
+            if int(flags) & cls._SYMBOLIC_FLAG:
+                return False
+        return True
+
+    @staticmethod
+    def __unescape(match: re.Match) -> bytes:
+        escaped = match.group(1)
+        if escaped[0] in b"01234567":
+            return bytes([int(escaped, 8) & 0xFF])
+        return BookingPageSelector._ESCAPES.get(escaped, escaped)
+
+
+def _extract_text(page: pypdf.PageObject, visitor, layout: bool) -> None:
+    if not layout:
+        page.extract_text(visitor_text=visitor)
+        return
+    row_builder = LayoutRowBuilder()
+    page.extract_text(
+        visitor_operand_before=row_builder.operand_before,
+        visitor_operand_after=row_builder.operand_after,
+        visitor_text=row_builder.add_fragment,
+    )
+    for row in row_builder.rows():
+        visitor(row, None, None, None, None)
+
+
+def _extract_page_texts(
+    bill: str | bytes, page_numbers: list[int], layout: bool
+) -> list[list[str]]:
+    """Extracts the texts the visitor gets for each page, in a worker process."""
+    with open_bill(bill) as file:
+        pages = pypdf.PdfReader(file).pages
+        page_texts = []
+        for page_number in page_numbers:
+            texts: list[str] = []
+            _extract_text(
+                pages[page_number],
+                lambda text, cm, tm, font_dict, font_size: texts.append(text),
+                layout,
+            )
+            page_texts.append(texts)
+        return page_texts
+
+
+class LayoutRowBuilder:
+    """Rebuilds the text lines of a page from the position of its fragments.
+
+    pypdf reports a fragment once its text is flushed, with the text matrix
+    of that moment, so the position of a fragment is taken from the first
+    text showing operator feeding it instead. Fragments whose baselines are
+    within ``row_tolerance`` points form a row, read from left to right.
+    """
+
+    _SHOW_TEXT = (b"Tj", b"TJ")
+    # these move to the next line before showing their text
+    _NEXT_LINE_SHOW_TEXT = (b"'", b'"')
+
+    _row_tolerance: float
+    _position: tuple[float, float] | None
+    _fragments: list[tuple[float, float, str]]
+
+    def __init__(self, row_tolerance: float = 2.0) -> None:
+        self._row_tolerance = row_tolerance
+        self._position = None
+        self._fragments = []
+
+    def operand_before(self, operator, operands, cm, tm) -> None:
+        if self._position is None and operator in self._SHOW_TEXT:
+            self._position = self.__position(cm, tm)
+
+    def operand_after(self, operator, operands, cm, tm) -> None:
+        if self._position is None and operator in self._NEXT_LINE_SHOW_TEXT:
+            self._position = self.__position(cm, tm)
+
+    def add_fragment(self, text, cm, tm, font_dict, font_size) -> None:
+        position = self._position
+        self._position = None
+        text = text.strip()
+        if text == "":
+            return
+        x, y = self.__position(cm, tm) if position is None else position
+        self._fragments.append((x, y, text))
+
+    def rows(self) -> list[str]:
+        """The rows of the page from top to bottom, emptying the builder."""
+        rows: list[list[tuple[float, str]]] = []
+        row_y = None
+        # pdf coordinates grow upwards
+        for x, y, text in sorted(self._fragments, key=lambda f: -f[1]):
+            if row_y is None or row_y - y > self._row_tolerance:
+                rows.append([])
+                row_y = y
+            rows[-1].append((x, text))
+        self._fragments = []
+        return [" ".join(text for _, text in sorted(row)) for row in rows]
+
+    @staticmethod
+    def __position(cm, tm) -> tuple[float, float]:
+        return (
+            tm[4] * cm[0] + tm[5] * cm[2] + cm[4],
+            tm[4] * cm[1] + tm[5] * cm[3] + cm[5],
+        )
+
+
+class FragmentClassifier:
+    """First stage of the visitor, tells what a text fragment may be.
+
+    Only the length and the first character of a fragment are looked at, so
+    whitespace, page numbers, single glyph runs and headers are discarded
+    before any matching or parsing: a fragment shorter than every holder
+    name and the stop marker cannot be a holder header or the end of the
+    table, and a booking row starts with its dd.mm.yyyy transaction date.
+    """
+
+    NOISE = 0
+    NAME = 1
+    ROW = 2
+    # two dates and the space after each, and at least one amount digit
+    MIN_ROW_LENGTH = len("04.06.2023 05.06.2023 ") + 1
+    # dates and amount of a row parsed by dateutil, e.g. 4/6/23 5/6/23 9
+    MIN_FUZZY_ROW_LENGTH = len("a b c")
+
+    __slots__ = ("_min_name_length", "_min_row_length", "_dateutil_fallback")
+
+    def __init__(
+        self,
+        expected_holders: list[str],
+        stop_marker: str | None = None,
+        dateutil_fallback: bool = False,
+    ) -> None:
+        names = [holder for holder in expected_holders if holder != ""]
+        if stop_marker is not None:
+            names.append(stop_marker)
+        self._min_name_length = min((len(name) for name in names), default=sys.maxsize)
+        self._min_row_length = (
+            self.MIN_FUZZY_ROW_LENGTH if dateutil_fallback else self.MIN_ROW_LENGTH
+        )
+        self._dateutil_fallback = dateutil_fallback
+
+    def classify(self, text: str) -> int:
+        """NOISE, or NAME and/or ROW when it may be a holder header or the stop
+        marker, and a booking row."""
+        length = len(text)
+        kind = self.NAME if length >= self._min_name_length else self.NOISE
+        if length >= self._min_row_length and (
+            self._dateutil_fallback or text[0].isdigit()
+        ):
+            kind |= self.ROW
+        if kind != self.NOISE and text.isspace():
+            return self.NOISE
+        return kind
+
+
+class ParsingProfiler:
+    """Collects the counters and timers of the parsing of one bill."""
+
+    __slots__ = (
+        "pages",
+        "fragments_seen",
+        "fragments_rejected",
+        "holder_matches",
+        "rows_accepted",
+        "page_selection_seconds",
+        "extraction_seconds",
+        "visitor_seconds",
+        "holder_matching_seconds",
+        "row_parsing_seconds",
+        "started_at",
+    )
+
+    def __init__(self) -> None:
+        self.pages: list[PageProfile] = []
+        self.fragments_seen = 0
+        self.fragments_rejected = 0
+        self.holder_matches = 0
+        self.rows_accepted = 0
+        self.page_selection_seconds = 0.0
+        self.extraction_seconds = 0.0
+        self.visitor_seconds = 0.0
+        self.holder_matching_seconds = 0.0
+        self.row_parsing_seconds = 0.0
+        self.started_at = time.perf_counter()
+
+    def add_page(
+        self,
+        page_number: int,
+        extracted: bool,
+        seconds: float,
+        fragments: int,
+        rows: int,
+    ) -> None:
+        self.pages.append(
+            PageProfile(
+                page_number=page_number,
+                extracted=extracted,
+                seconds=seconds,
+                fragments=fragments,
+                rows=rows,
+            )
+        )
+
+    def build(self) -> ParsingProfile:
+        return ParsingProfile(
+            pages=self.pages,
+            fragments_seen=self.fragments_seen,
+            fragments_rejected=self.fragments_rejected,
+            holder_matches=self.holder_matches,
+            rows_accepted=self.rows_accepted,
+            page_selection_seconds=self.page_selection_seconds,
+            extraction_seconds=self.extraction_seconds,
+            visitor_seconds=self.visitor_seconds,
+            holder_matching_seconds=self.holder_matching_seconds,
+            row_parsing_seconds=self.row_parsing_seconds,
+            total_seconds=time.perf_counter() - self.started_at,
+        )
+
+
+class ParsingSession:
+    """The state of the parsing of one bill.
+
+    Every call on a PdfCembraBillRepository parses in its own session, so one
+    repository can parse many bills at the same time from several threads.
+    """
+
+    helper: TransactionsVisitorHelper
+    profiler: ParsingProfiler | None
+    stop_marker_seen: bool
+    fragments_rejected: int
+    _classify: Callable[[str], int]
+    _stop_marker: str | None
+    _dateutil_fallback: bool
+
+    def __init__(
+        self,
+        helper: TransactionsVisitorHelper,
+        classifier: FragmentClassifier,
+        stop_marker: str | None = None,
+        dateutil_fallback: bool = False,
+        profiler: ParsingProfiler | None = None,
+    ) -> None:
+        self.helper = helper
+        self.profiler = profiler
+        self.stop_marker_seen = False
+        self.fragments_rejected = 0
+        self._classify = classifier.classify
+        self._stop_marker = stop_marker
+        self._dateutil_fallback = dateutil_fallback
+
+    def transactions_visitor(self, text, cm, tm, font_dict, font_size):
+        if self.stop_marker_seen:
+            return
+        kind = self._classify(text)
+        if kind == FragmentClassifier.NOISE:
+            self.fragments_rejected += 1
+            return
+        if self._stop_marker is not None and self._stop_marker in text.lower():
+            self.stop_marker_seen = True
+            return
+        matched_holder = self.helper.matches_holder(text)
+        if matched_holder is not None:
+            self.helper.dispatch_next_transactions_to_holder(matched_holder)
+            return
+
+        if kind & FragmentClassifier.ROW:
+            record = parse_book_entry(text, dateutil_fallback=self._dateutil_fallback)
+            if record is not None:
+                self.helper.add_record(record)
+
+    def traced_transactions_visitor(self, text, cm, tm, font_dict, font_size):
+        fragment_trace_logger.debug(
+            "fragment %r at %s font size %s",
+            text,
+            None if tm is None else tm[4:6],
+            font_size,
+        )
+        self.transactions_visitor(text, cm, tm, font_dict, font_size)
+
+    def profiled_transactions_visitor(self, text, cm, tm, font_dict, font_size):
+        # mirrors transactions_visitor, timing each stage
+        started_at = time.perf_counter()
+        profiler = self.profiler
+        profiler.fragments_seen += 1
+        try:
+            if self.stop_marker_seen:
+                return
+            kind = self._classify(text)
+            if kind == FragmentClassifier.NOISE:
+                self.fragments_rejected += 1
+                profiler.fragments_rejected += 1
+                return
+            if self._stop_marker is not None and self._stop_marker in text.lower():
+                self.stop_marker_seen = True
+                return
+            matched_holder = self.helper.matches_holder(text)
+            matched_at = time.perf_counter()
+            profiler.holder_matching_seconds += matched_at - started_at
+            if matched_holder is not None:
+                profiler.holder_matches += 1
+                self.helper.dispatch_next_transactions_to_holder(matched_holder)
+                return
+
+            if kind & FragmentClassifier.ROW:
+                record = parse_book_entry(
+                    text, dateutil_fallback=self._dateutil_fallback
+                )
+                profiler.row_parsing_seconds += time.perf_counter() - matched_at
+                if record is not None:
+                    profiler.rows_accepted += 1
+                    self.helper.add_record(record)
+        finally:
+            profiler.visitor_seconds += time.perf_counter() - started_at
 
 
 class PdfCembraBillRepository(CembraBillRepository):
-    __helper: TransactionsVisitorHelper = None
+    """Parses the Cembra bills in PDF.
 
-    def load_cembra_bill(self, path_to_bill: str, expected_holders: list[str]):
-        self.__helper = TransactionsVisitorHelper(expected_holders=expected_holders)
+    The repository only keeps its configuration, the state of a parsing
+    lives in a ParsingSession, so an instance can be shared by threads.
+    """
+
+    parser_version = "3"
+    __select_pages: bool
+    __stop_marker: str | None
+    __dateutil_fallback: bool
+    __layout: bool
+    __page_workers: int
+
+    def __init__(
+        self,
+        select_pages: bool = True,
+        stop_marker: str | None = None,
+        dateutil_fallback: bool = False,
+        layout: bool = False,
+        page_workers: int = 1,
+    ):
+        """
+        select_pages: skip the text extraction of pages that cannot contain
+            any booking, see BookingPageSelector.
+        stop_marker: text closing the booking table, e.g. the statement's
+            total line; nothing is extracted after the fragment containing it.
+        dateutil_fallback: parse rows whose dates are not dd.mm.yyyy with
+            dateutil, see PdfTableTransaction.from_book_entry.
+        layout: rebuild the rows of the pages from the position of their
+            fragments, see LayoutRowBuilder, and parse whole rows instead of
+            fragments; rows split in several fragments are only found so.
+        page_workers: extract the text of the pages in this many processes,
+            for bills with many pages; the texts are still parsed in page
+            order. Profiled loads always extract the pages sequentially.
+        """
+        if page_workers < 1:
+            raise ValueError("page_workers must be at least 1")
+        self.__select_pages = select_pages
+        self.__stop_marker = None if stop_marker is None else stop_marker.lower()
+        self.__dateutil_fallback = dateutil_fallback
+        self.__layout = layout
+        self.__page_workers = page_workers
+        # the options changing the parsed bill are part of the parser version,
+        # so bills cached or indexed with other options are parsed again
+        options = []
+        if self.__stop_marker is not None:
+            options.append(f"stop:{self.__stop_marker}")
+        if dateutil_fallback:
+            options.append("dateutil")
+        if layout:
+            # the layout mode finds rows the fragments mode misses
+            options.append("layout")
+        if options:
+            self.parser_version = "-".join(
+                [PdfCembraBillRepository.parser_version] + options
+            )
+
+    def load_cembra_bill(
+        self,
+        path_to_bill: BillSource,
+        expected_holders: list[str],
+        profile: bool = False,
+    ):
+        session = self.__new_session(
+            TransactionsVisitorHelper(expected_holders=expected_holders),
+            expected_holders,
+            ParsingProfiler() if profile else None,
+        )
         try:
-            with open(path_to_bill, "rb") as file:
-                pdf_reader = pypdf.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text = page.extract_text(visitor_text=self._transactions_visitor)
+            for _ in self.__visit_pages(path_to_bill, expected_holders, session):
+                pass
 
             principal = None
-            additional = None
-            for c in self.__helper.cards:
+            additional = []
+            for c in session.helper.cards:
                 if c.is_principal_holder:
                     principal = c
                 else:
-                    additional = c
-            return CembraBill(principal_card=principal, additional_card=additional)
+                    additional.append(c)
+            if principal is None:
+                raise BillParsingError(
+                    f"none of the holders {expected_holders} found in "
+                    f"{describe_bill(path_to_bill)}"
+                )
+            return CembraBill(
+                principal_card=principal,
+                additional_cards=additional,
+                profile=None if session.profiler is None else session.profiler.build(),
+            )
         except RuntimeError as e:
-            logging.critical("could not parse cembra bill", e)
+            logging.critical("could not parse cembra bill: %s", e)
             raise e
 
-    def _transactions_visitor(self, text, cm, tm, font_dict, font_size):
-        logging.debug("transactions_visitor: %s", text)
-        matched_holder = self.__helper.matches_holder(text)
-        if matched_holder is not None:
-            self.__helper.dispatch_next_transactions_to_holder(matched_holder)
-            return
+    def iter_transactions(
+        self, path_to_bill: BillSource, expected_holders: list[str]
+    ) -> Iterator[HolderTransaction]:
+        """Yields the transactions of a bill page by page, as they are parsed."""
+        helper = TransactionsVisitorHelper(
+            expected_holders=expected_holders, stream=True
+        )
+        session = self.__new_session(helper, expected_holders)
+        for _ in self.__visit_pages(path_to_bill, expected_holders, session):
+            yield from helper.take_streamed()
+
+    def __new_session(
+        self,
+        helper: TransactionsVisitorHelper,
+        expected_holders: list[str],
+        profiler: ParsingProfiler | None = None,
+    ) -> ParsingSession:
+        return ParsingSession(
+            helper,
+            FragmentClassifier(
+                expected_holders,
+                stop_marker=self.__stop_marker,
+                dateutil_fallback=self.__dateutil_fallback,
+            ),
+            stop_marker=self.__stop_marker,
+            dateutil_fallback=self.__dateutil_fallback,
+            profiler=profiler,
+        )
+
+    def __visit_pages(
+        self,
+        path_to_bill: BillSource,
+        expected_holders: list[str],
+        session: ParsingSession,
+    ) -> Iterator[int]:
+        """Feeds the bill pages to the visitor, yields after each page."""
+        started_at = time.perf_counter()
+        extracted_pages = 0
+        # the page selector only recognizes dd.mm.yyyy dates
+        page_selector = (
+            BookingPageSelector(expected_holders)
+            if self.__select_pages and not self.__dateutil_fallback
+            else None
+        )
+        # the fragments only go through logging while they are traced
+        visitor = (
+            session.traced_transactions_visitor
+            if fragment_trace_logger.isEnabledFor(logging.DEBUG)
+            else session.transactions_visitor
+        )
+        with open_bill(path_to_bill) as file:
+            pdf_reader = pypdf.PdfReader(file)
+            pages = len(pdf_reader.pages)
+            if session.profiler is not None:
+                page_numbers = self.__visit_profiled_pages(
+                    pdf_reader, page_selector, session
+                )
+            elif self.__page_workers > 1:
+                page_numbers = self.__visit_pages_in_parallel(
+                    file, path_to_bill, pdf_reader, page_selector, visitor, session
+                )
+            else:
+                page_numbers = self.__visit_selected_pages(
+                    pdf_reader, page_selector, visitor, session
+                )
+            for page_number in page_numbers:
+                extracted_pages += 1
+                yield page_number
+        self.__log_summary(
+            path_to_bill,
+            pages,
+            extracted_pages,
+            len(expected_holders),
+            started_at,
+            session,
+        )
+
+    def __visit_selected_pages(
+        self,
+        pdf_reader: pypdf.PdfReader,
+        page_selector: BookingPageSelector | None,
+        visitor,
+        session: ParsingSession,
+    ) -> Iterator[int]:
+        for page_number, page in enumerate(pdf_reader.pages):
+            if session.stop_marker_seen:
+                break
+            if page_selector is not None and (
+                not page_selector.may_contain_bookings(page)
+            ):
+                continue
+            self.__extract_text(page, visitor)
+            yield page_number
 
-        t = PdfTableTransaction.from_book_entry(text)
-        if t != None:
-            self.__helper.add_transaction(t)
+    def __extract_text(self, page: pypdf.PageObject, visitor) -> None:
+        _extract_text(page, visitor, self.__layout)
+
+    def __visit_pages_in_parallel(
+        self,
+        bill: BinaryIO,
+        path_to_bill: BillSource,
+        pdf_reader: pypdf.PdfReader,
+        page_selector: BookingPageSelector | None,
+        visitor,
+        session: ParsingSession,
+    ) -> Iterator[int]:
+        selected_pages = [
+            page_number
+            for page_number, page in enumerate(pdf_reader.pages)
+            if page_selector is None or page_selector.may_contain_bookings(page)
+        ]
+        if isinstance(path_to_bill, str):
+            source = path_to_bill
+        else:
+            # the workers get their own copy of the content
+            bill.seek(0)
+            source = bill.read()
+        # more chunks than workers, so a slow chunk does not hold the others
+        chunk_size = max(1, -(-len(selected_pages) // (self.__page_workers * 2)))
+        chunks = [
+            selected_pages[i : i + chunk_size]
+            for i in range(0, len(selected_pages), chunk_size)
+        ]
+        executor = ProcessPoolExecutor(max_workers=self.__page_workers)
+        try:
+            futures = [
+                executor.submit(_extract_page_texts, source, chunk, self.__layout)
+                for chunk in chunks
+            ]
+            # the texts are replayed in page order, like a sequential run
+            for chunk, future in zip(chunks, futures):
+                for page_number, texts in zip(chunk, future.result()):
+                    if session.stop_marker_seen:
+                        return
+                    for text in texts:
+                        visitor(text, None, None, None, None)
+                    yield page_number
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def __log_summary(
+        path_to_bill: BillSource,
+        pages: int,
+        extracted_pages: int,
+        holders: int,
+        started_at: float,
+        session: ParsingSession,
+    ) -> None:
+        summary = {
+            "bill": describe_bill(path_to_bill),
+            "pages": pages,
+            "extracted_pages": extracted_pages,
+            "holders": holders,
+            "fragments_rejected": session.fragments_rejected,
+            "rows": session.helper.rows,
+            "stop_marker_seen": session.stop_marker_seen,
+            "seconds": round(time.perf_counter() - started_at, 6),
+        }
+        logging.debug(
+            "parsed bill %s",
+            " ".join(f"{key}={value}" for key, value in summary.items()),
+            extra={"bill_summary": summary},
+        )
+
+    def __visit_profiled_pages(
+        self,
+        pdf_reader: pypdf.PdfReader,
+        page_selector: BookingPageSelector | None,
+        session: ParsingSession,
+    ) -> Iterator[int]:
+        profiler = session.profiler
+        for page_number, page in enumerate(pdf_reader.pages):
+            if session.stop_marker_seen:
+                break
+            started_at = time.perf_counter()
+            selected = page_selector is None or page_selector.may_contain_bookings(page)
+            selected_at = time.perf_counter()
+            profiler.page_selection_seconds += selected_at - started_at
+            fragments = profiler.fragments_seen
+            rows = profiler.rows_accepted
+            if selected:
+                self.__extract_text(page, session.profiled_transactions_visitor)
+                profiler.extraction_seconds += time.perf_counter() - selected_at
+            profiler.add_page(
+                page_number=page_number,
+                extracted=selected,
+                seconds=time.perf_counter() - started_at,
+                fragments=profiler.fragments_seen - fragments,
+                rows=profiler.rows_accepted - rows,
+            )
+            if selected:
+                yield page_number
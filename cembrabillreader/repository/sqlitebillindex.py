@@ -0,0 +1,188 @@
+import datetime
+import json
+import os
+import sqlite3
+
+from cembrabillreader.domain.billindex import BillIndex
+from cembrabillreader.domain.entities import (
+    CardTotal,
+    IndexedBill,
+    TotalByHolderResult,
+)
+from cembrabillreader.domain.transactionstore import HolderTransaction
+
+# dates are stored as ordinals, like in TransactionRecord
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bills (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    holders TEXT NOT NULL,
+    parser_version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cards (
+    bill_id INTEGER NOT NULL REFERENCES bills (id) ON DELETE CASCADE,
+    holder TEXT NOT NULL,
+    is_principal_holder INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL,
+    PRIMARY KEY (bill_id, holder)
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    bill_id INTEGER NOT NULL REFERENCES bills (id) ON DELETE CASCADE,
+    holder TEXT NOT NULL,
+    is_principal_holder INTEGER NOT NULL,
+    transaction_date INTEGER NOT NULL,
+    registration_date INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_by_date
+    ON transactions (transaction_date, holder, amount_cents, bill_id);
+CREATE INDEX IF NOT EXISTS transactions_by_bill ON transactions (bill_id);
+"""
+
+
+class SqliteBillIndex(BillIndex):
+    """Keeps the bills, their card totals and transactions in SQLite.
+
+    The totals over a date range are answered from a covering index on the
+    transaction dates, without reading the bills again.
+    """
+
+    __connection: sqlite3.Connection
+
+    def __init__(self, database_path: str) -> None:
+        directory = os.path.dirname(database_path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        self.__connection = sqlite3.connect(database_path)
+        self.__connection.execute("PRAGMA foreign_keys = ON")
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        self.__connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def indexed_bill(self, path_to_bill: str) -> IndexedBill | None:
+        row = self.__connection.execute(
+            "SELECT path, mtime_ns, size, content_hash, holders, parser_version "
+            "FROM bills WHERE path = ?",
+            (path_to_bill,),
+        ).fetchone()
+        if row is None:
+            return None
+        path, mtime_ns, size, content_hash, holders, parser_version = row
+        return IndexedBill(
+            path=path,
+            mtime_ns=mtime_ns,
+            size=size,
+            content_hash=content_hash,
+            holders=json.loads(holders),
+            parser_version=parser_version,
+        )
+
+    def indexed_paths(self) -> list[str]:
+        return [
+            path
+            for (path,) in self.__connection.execute(
+                "SELECT path FROM bills ORDER BY path"
+            )
+        ]
+
+    def index_bill(
+        self, bill: IndexedBill, transactions: list[HolderTransaction]
+    ) -> None:
+        totals_cents: dict[str, list] = {}
+        for holder, is_principal_holder, record in transactions:
+            card = totals_cents.setdefault(holder, [is_principal_holder, 0])
+            card[1] += record.amount_cents
+
+        with self.__connection:
+            self.__connection.execute("DELETE FROM bills WHERE path = ?", (bill.path,))
+            bill_id = self.__connection.execute(
+                "INSERT INTO bills "
+                "(path, mtime_ns, size, content_hash, holders, parser_version) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self.__bill_row(bill),
+            ).lastrowid
+            self.__connection.executemany(
+                "INSERT INTO cards VALUES (?, ?, ?, ?)",
+                (
+                    (bill_id, holder, is_principal_holder, total_cents)
+                    for holder, (
+                        is_principal_holder,
+                        total_cents,
+                    ) in totals_cents.items()
+                ),
+            )
+            self.__connection.executemany(
+                "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        bill_id,
+                        holder,
+                        is_principal_holder,
+                        record.transaction_date,
+                        record.registration_date,
+                        record.description,
+                        record.amount_cents,
+                    )
+                    for holder, is_principal_holder, record in transactions
+                ),
+            )
+
+    def update_bill(self, bill: IndexedBill) -> None:
+        path, *values = self.__bill_row(bill)
+        with self.__connection:
+            self.__connection.execute(
+                "UPDATE bills SET mtime_ns = ?, size = ?, content_hash = ?, "
+                "holders = ?, parser_version = ? WHERE path = ?",
+                (*values, path),
+            )
+
+    def remove_bill(self, path_to_bill: str) -> None:
+        with self.__connection:
+            self.__connection.execute(
+                "DELETE FROM bills WHERE path = ?", (path_to_bill,)
+            )
+
+    def total_by_holder(
+        self,
+        start_date: datetime.date | None = None,
+        end_date: datetime.date | None = None,
+    ) -> TotalByHolderResult:
+        start = datetime.date.min if start_date is None else start_date
+        end = datetime.date.max if end_date is None else end_date
+        rows = self.__connection.execute(
+            "SELECT holder, SUM(amount_cents) "
+            "FROM transactions WHERE transaction_date BETWEEN ? AND ? "
+            "GROUP BY holder ORDER BY holder",
+            (start.toordinal(), end.toordinal()),
+        ).fetchall()
+        (bills,) = self.__connection.execute(
+            "SELECT COUNT(DISTINCT bill_id) FROM transactions "
+            "WHERE transaction_date BETWEEN ? AND ?",
+            (start.toordinal(), end.toordinal()),
+        ).fetchone()
+        return TotalByHolderResult(
+            totals=[
+                CardTotal(card_holder=holder, total_cents=total_cents)
+                for holder, total_cents in rows
+            ],
+            bills_processed=bills,
+            bills_failed=0,
+        )
+
+    @staticmethod
+    def __bill_row(bill: IndexedBill) -> tuple:
+        return (
+            bill.path,
+            bill.mtime_ns,
+            bill.size,
+            bill.content_hash,
+            json.dumps(bill.holders),
+            bill.parser_version,
+        )
@@ -0,0 +1,110 @@
+from array import array
+from datetime import date
+import unittest
+from unittest.mock import patch
+
+from cembrabillreader.domain.aggregation import (
+    UNCATEGORIZED,
+    CategoryMapping,
+    factorize,
+    group_columns,
+    group_sums,
+)
+from cembrabillreader.domain.transactionstore import (
+    TransactionRecord,
+    TransactionStore,
+)
+
+
+def store_of(*rows):
+    store = TransactionStore()
+    for transaction_date, registration_date, description, amount_cents in rows:
+        store.append(
+            TransactionRecord(
+                transaction_date.toordinal(),
+                registration_date.toordinal(),
+                description,
+                amount_cents,
+            )
+        )
+    return store
+
+
+class TestAggregation(unittest.TestCase):
+    def setUp(self):
+        self.store = store_of(
+            (date(2023, 5, 30), date(2023, 6, 1), "MIGROS  Zurich", 1000),
+            (date(2023, 6, 2), date(2023, 6, 2), "Coop Bern", 250),
+            (date(2023, 6, 3), date(2023, 6, 5), "MIGROS Zurich", -300),
+            (date(2023, 6, 3), date(2023, 6, 5), "SBB CFF FFS", 4200),
+        )
+
+    def test_factorize(self):
+        keys, codes = factorize(["b", "a", "b", "c"], str.upper)
+
+        self.assertEqual(keys, ["B", "A", "C"])
+        self.assertEqual(list(codes), [0, 1, 0, 2])
+
+    def test_factorize_merges_values_with_the_same_key(self):
+        keys, codes = factorize([1, 2, 3, 4], lambda value: value % 2)
+
+        self.assertEqual(keys, [1, 0])
+        self.assertEqual(list(codes), [0, 1, 0, 1])
+
+    def test_group_sums(self):
+        self.assertEqual(
+            group_sums(array("q", [1, 0, 1, 3]), array("q", [100, -20, 5, 7]), 4),
+            ([-20, 105, 0, 7], [1, 2, 0, 1]),
+        )
+
+    @patch("cembrabillreader.domain.aggregation._pyarrow", return_value=None)
+    def test_group_sums_without_pyarrow(self, _):
+        self.assertEqual(
+            group_sums(array("q", [1, 0, 1, 3]), array("q", [100, -20, 5, 7]), 4),
+            ([-20, 105, 0, 7], [1, 2, 0, 1]),
+        )
+
+    def test_group_by_month(self):
+        self.assertEqual(
+            group_columns(self.store, "month"),
+            (["2023-05", "2023-06"], [1000, 4150], [1, 3]),
+        )
+
+    def test_group_by_registration_date(self):
+        self.assertEqual(
+            group_columns(self.store, "registration_date"),
+            (["2023-06-01", "2023-06-02", "2023-06-05"], [1000, 250, 3900], [1, 1, 2]),
+        )
+
+    def test_group_by_merchant(self):
+        self.assertEqual(
+            group_columns(self.store, "merchant"),
+            (
+                ["MIGROS Zurich", "Coop Bern", "SBB CFF FFS"],
+                [700, 250, 4200],
+                [2, 1, 1],
+            ),
+        )
+
+    def test_group_by_category(self):
+        categories = CategoryMapping(
+            {"groceries": ["migros", "coop"], "transport": ["sbb"]}
+        )
+
+        self.assertEqual(
+            group_columns(self.store, "category", categories),
+            (["groceries", "transport"], [950, 4200], [3, 1]),
+        )
+
+    def test_category_mapping_defaults_to_uncategorized(self):
+        categories = CategoryMapping({"groceries": ["migros"]})
+
+        self.assertEqual(categories.category("Coop Bern"), UNCATEGORIZED)
+        self.assertEqual(group_columns(self.store, "category")[0], [UNCATEGORIZED])
+
+    def test_unknown_grouping(self):
+        with self.assertRaises(ValueError):
+            group_columns(self.store, "holder")
+
+    def test_empty_store(self):
+        self.assertEqual(group_columns(TransactionStore(), "month"), ([], [], []))
@@ -0,0 +1,49 @@
+import hashlib
+import io
+import os
+import tempfile
+import unittest
+
+from cembrabillreader.domain.billfile import content_hash, describe_bill, open_bill
+
+CONTENT = b"%PDF-1.4 some bill"
+
+
+class TestBillFile(unittest.TestCase):
+    def test_content_hash(self):
+        expected = hashlib.sha256(CONTENT).hexdigest()
+        stream = io.BytesIO(CONTENT)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bill_path = os.path.join(tmp_dir, "bill.pdf")
+            with open(bill_path, "wb") as file:
+                file.write(CONTENT)
+
+            self.assertEqual(content_hash(bill_path), expected)
+        self.assertEqual(content_hash(CONTENT), expected)
+        self.assertEqual(content_hash(bytearray(CONTENT)), expected)
+        self.assertEqual(content_hash(stream), expected)
+        # the stream can still be read afterwards
+        self.assertEqual(stream.read(), CONTENT)
+
+    def test_open_bill_buffers(self):
+        for bill in [CONTENT, bytearray(CONTENT), memoryview(CONTENT)]:
+            with open_bill(bill) as stream:
+                stream.seek(-4, io.SEEK_END)
+                self.assertEqual(stream.read(), b"bill")
+                stream.seek(0)
+                self.assertEqual(stream.read(4), b"%PDF")
+                self.assertEqual(stream.tell(), 4)
+
+    def test_open_bill_leaves_streams_open(self):
+        stream = io.BytesIO(CONTENT)
+
+        with open_bill(stream) as opened:
+            self.assertIs(opened, stream)
+
+        self.assertFalse(stream.closed)
+
+    def test_describe_bill(self):
+        self.assertEqual(describe_bill("bill.pdf"), "bill.pdf")
+        self.assertEqual(describe_bill(CONTENT), "<bytes of 18 bytes>")
+        self.assertEqual(describe_bill(io.BytesIO(CONTENT)), "<BytesIO>")
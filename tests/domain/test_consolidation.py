@@ -0,0 +1,105 @@
+from datetime import date
+import unittest
+
+from cembrabillreader.domain.consolidation import ConsolidatedTimeline
+from cembrabillreader.domain.transactionstore import (
+    HolderTransaction,
+    TransactionRecord,
+)
+
+
+def holder_transaction(holder, day, description, amount_cents, registration_day=None):
+    return HolderTransaction(
+        holder,
+        holder == "John",
+        TransactionRecord(
+            day.toordinal(),
+            (registration_day or day).toordinal(),
+            description,
+            amount_cents,
+        ),
+    )
+
+
+def timeline_rows(timeline):
+    return [
+        (
+            t.bill_path,
+            t.holder,
+            date.fromordinal(t.transaction.transaction_date),
+            t.transaction.description,
+            t.transaction.amount_cents,
+        )
+        for t in timeline
+    ]
+
+
+class TestConsolidatedTimeline(unittest.TestCase):
+    def test_transactions_of_overlapping_bills_are_kept_once(self):
+        timeline = ConsolidatedTimeline()
+        pending = holder_transaction("John", date(2023, 5, 30), "Migros", 1000)
+
+        self.assertEqual(
+            timeline.add_bill(
+                "may.pdf",
+                [
+                    holder_transaction("John", date(2023, 5, 2), "SBB", 500),
+                    pending,
+                ],
+            ),
+            0,
+        )
+        self.assertEqual(
+            timeline.add_bill(
+                "june.pdf",
+                [pending, holder_transaction("John", date(2023, 6, 1), "Coop", 200)],
+            ),
+            1,
+        )
+
+        self.assertEqual(len(timeline), 3)
+        self.assertEqual(timeline.duplicates, 1)
+        self.assertEqual(timeline.totals_cents(), {"John": 1700})
+        self.assertEqual(
+            timeline_rows(timeline),
+            [
+                ("may.pdf", "John", date(2023, 5, 2), "SBB", 500),
+                ("may.pdf", "John", date(2023, 5, 30), "Migros", 1000),
+                ("june.pdf", "John", date(2023, 6, 1), "Coop", 200),
+            ],
+        )
+
+    def test_identical_transactions_of_one_bill_are_kept(self):
+        timeline = ConsolidatedTimeline()
+        ticket = holder_transaction("John", date(2023, 6, 1), "SBB", 300)
+
+        timeline.add_bill("june.pdf", [ticket, ticket])
+        timeline.add_bill("july.pdf", [ticket])
+        timeline.add_bill("august.pdf", [ticket, ticket, ticket])
+
+        self.assertEqual(len(timeline), 3)
+        self.assertEqual(timeline.duplicates, 3)
+        self.assertEqual(
+            [row[0] for row in timeline_rows(timeline)],
+            ["june.pdf", "june.pdf", "august.pdf"],
+        )
+
+    def test_transactions_differing_by_any_key_are_kept(self):
+        timeline = ConsolidatedTimeline()
+        day = date(2023, 6, 1)
+
+        timeline.add_bill("a.pdf", [holder_transaction("John", day, "SBB", 300)])
+        timeline.add_bill(
+            "b.pdf",
+            [
+                holder_transaction("Jane", day, "SBB", 300),
+                holder_transaction("John", date(2023, 6, 2), "SBB", 300),
+                holder_transaction("John", day, "SBB", 300, date(2023, 6, 3)),
+                holder_transaction("John", day, "SBB", 301),
+                holder_transaction("John", day, "SBB Bern", 300),
+            ],
+        )
+
+        self.assertEqual(len(timeline), 6)
+        self.assertEqual(timeline.duplicates, 0)
+        self.assertEqual(timeline.totals_cents(), {"John": 1501, "Jane": 300})
@@ -0,0 +1,42 @@
+import unittest
+
+from cembrabillreader.domain.entities import (
+    CalculateTotalByCardResult,
+    Card,
+    CardTotal,
+    CembraBill,
+)
+
+
+class TestEntities(unittest.TestCase):
+    def test_cembra_bill_accepts_a_single_additional_card(self):
+        principal = Card(holder="John", is_principal_holder=True)
+        additional = Card(holder="Jane", is_principal_holder=False)
+
+        self.assertEqual(
+            CembraBill(
+                principal_card=principal, additional_card=additional
+            ).additional_cards,
+            [additional],
+        )
+        self.assertEqual(
+            CembraBill(principal_card=principal, additional_card=None).additional_cards,
+            [],
+        )
+
+    def test_result_accepts_a_single_additional_card(self):
+        principal = CardTotal(card_holder="John", total=10.0)
+        additional = CardTotal(card_holder="Jane", total=20.0)
+
+        result = CalculateTotalByCardResult(
+            principal_card=principal, additional_card=additional
+        )
+
+        self.assertEqual(result.additional_cards, [additional])
+        self.assertEqual(result.total_cents, 3000)
+        self.assertEqual(
+            CalculateTotalByCardResult(
+                principal_card=principal, additional_card=None
+            ).additional_cards,
+            [],
+        )
@@ -0,0 +1,53 @@
+import unittest
+from decimal import Decimal
+
+from cembrabillreader.domain.entities import CardTotal, Transaction
+from cembrabillreader.domain.money import format_cents, to_cents
+
+
+class TestMoney(unittest.TestCase):
+    def test_to_cents(self):
+        self.assertEqual(to_cents("470.00"), 47000)
+        self.assertEqual(to_cents("-12.30"), -1230)
+        self.assertEqual(to_cents("1.005"), 101)
+        self.assertEqual(to_cents("-1.005"), -101)
+        self.assertEqual(to_cents(0.1), 10)
+        self.assertEqual(to_cents(1.15), 115)
+        self.assertEqual(to_cents(Decimal("101.55")), 10155)
+        self.assertEqual(to_cents(3), 300)
+
+    def test_to_cents_invalid_amount(self):
+        for amount in [
+            "CHE",
+            "",
+            "nan",
+            "inf",
+            True,
+            "1e17",
+            "99999999999999999999.00",
+            10**17,
+            1e30,
+        ]:
+            with self.assertRaises(ValueError):
+                to_cents(amount)
+
+    def test_format_cents(self):
+        self.assertEqual(format_cents(47000), "470.00")
+        self.assertEqual(format_cents(-5), "-0.05")
+        self.assertEqual(format_cents(0), "0.00")
+
+    def test_entities_store_cents(self):
+        total = CardTotal(card_holder="John", total=0.1 + 0.2)
+
+        self.assertEqual(total.total_cents, 30)
+        self.assertEqual(total.total, 0.3)
+        self.assertEqual(CardTotal.model_validate_json(total.model_dump_json()), total)
+        self.assertEqual(
+            Transaction(
+                transaction_date="2023-06-04T00:00:00",
+                registration_date="2023-06-05T00:00:00",
+                description="Some Transaction",
+                amount="101.55",
+            ).amount_cents,
+            10155,
+        )
@@ -0,0 +1,54 @@
+import os
+import time
+import unittest
+
+from cembrabillreader.domain.errors import BillTimeoutError, WorkerCrashedError
+from cembrabillreader.domain.supervisor import run_supervised
+
+
+def work(behaviour, value):
+    if behaviour == "raise":
+        raise ValueError(f"bad {value}")
+    if behaviour == "crash":
+        os._exit(3)
+    if behaviour == "hang":
+        time.sleep(60)
+    return value * 2
+
+
+class TestRunSupervised(unittest.TestCase):
+    def run_tasks(self, behaviours, **kwargs):
+        outcomes = run_supervised(
+            work,
+            ((i, (behaviour, i)) for i, behaviour in enumerate(behaviours)),
+            **kwargs,
+        )
+        return {key: (result, error) for key, result, error in outcomes}
+
+    def test_results(self):
+        outcomes = self.run_tasks(["ok"] * 5, max_workers=2)
+
+        self.assertEqual(outcomes, {i: (i * 2, None) for i in range(5)})
+
+    def test_failures_are_isolated(self):
+        started_at = time.monotonic()
+        outcomes = self.run_tasks(
+            ["ok", "raise", "crash", "hang", "ok"], max_workers=2, timeout=1
+        )
+
+        self.assertLess(time.monotonic() - started_at, 30)
+        self.assertEqual(outcomes[0], (0, None))
+        self.assertEqual(outcomes[4], (8, None))
+        self.assertIsInstance(outcomes[1][1], ValueError)
+        self.assertEqual(str(outcomes[1][1]), "bad 1")
+        self.assertIsInstance(outcomes[2][1], WorkerCrashedError)
+        self.assertIn("code 3", str(outcomes[2][1]))
+        self.assertIsInstance(outcomes[3][1], BillTimeoutError)
+
+    def test_closing_kills_the_running_processes(self):
+        outcomes = run_supervised(
+            work, [(0, ("ok", 0)), (1, ("hang", 1))], max_workers=2
+        )
+
+        self.assertEqual(next(outcomes), (0, 0, None))
+        outcomes.close()
@@ -0,0 +1,99 @@
+import unittest
+from datetime import date, datetime
+
+from cembrabillreader.domain.entities import Card, Transaction
+from cembrabillreader.domain.transactionstore import (
+    TransactionRecord,
+    TransactionStore,
+)
+
+
+class TestTransactionStore(unittest.TestCase):
+    def create_store(self) -> TransactionStore:
+        store = TransactionStore()
+        store.append(
+            TransactionRecord(
+                transaction_date=date(2023, 6, 4).toordinal(),
+                registration_date=date(2023, 6, 5).toordinal(),
+                description="Some Transaction",
+                amount_cents=10010,
+            )
+        )
+        store.append(
+            TransactionRecord(
+                transaction_date=date(2023, 6, 6).toordinal(),
+                registration_date=date(2023, 6, 7).toordinal(),
+                description="Refund",
+                amount_cents=-20,
+            )
+        )
+        return store
+
+    def test_append_and_iterate(self):
+        store = self.create_store()
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.total_cents(), 9990)
+        self.assertEqual(
+            [(r.description, r.amount_cents) for r in store],
+            [("Some Transaction", 10010), ("Refund", -20)],
+        )
+
+    def test_card_from_store(self):
+        card = Card.from_store(
+            holder="John", is_principal_holder=True, store=self.create_store()
+        )
+
+        self.assertEqual(card.calculate_total(), 99.9)
+        self.assertEqual(
+            card.transactions[0],
+            Transaction(
+                transaction_date=datetime(2023, 6, 4),
+                registration_date=datetime(2023, 6, 5),
+                description="Some Transaction",
+                amount=100.10,
+            ),
+        )
+
+    def test_card_total_sums_cents(self):
+        card = Card(holder="John", is_principal_holder=True, transactions=[])
+        for _ in range(10):
+            card.add_transaction(
+                Transaction(
+                    transaction_date=datetime(2023, 6, 4),
+                    registration_date=datetime(2023, 6, 5),
+                    description="Coffee",
+                    amount=0.1,
+                )
+            )
+
+        self.assertEqual(card.calculate_total(), 1.0)
+        self.assertEqual(len(card.transactions), 10)
+
+    def test_card_transactions_cannot_desync_the_total(self):
+        transaction = Transaction(
+            transaction_date=datetime(2023, 6, 4),
+            registration_date=datetime(2023, 6, 5),
+            description="Some Transaction",
+            amount=470.0,
+        )
+        card = Card(holder="John", is_principal_holder=True, transactions=[])
+
+        with self.assertRaises(AttributeError):
+            card.transactions.append(transaction)
+        with self.assertRaises((AttributeError, ValueError)):
+            card.transactions = [transaction]
+        card.add_transaction(transaction)
+
+        self.assertEqual(card.calculate_total(), 470.0)
+        self.assertEqual(card.transactions, (transaction,))
+
+    def test_card_round_trips_through_json(self):
+        card = Card.from_store(
+            holder="John", is_principal_holder=True, store=self.create_store()
+        )
+
+        loaded = Card.model_validate_json(card.model_dump_json())
+
+        self.assertEqual(loaded, card)
+        self.assertEqual(loaded.calculate_total(), 99.9)
@@ -0,0 +1,194 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+import typer
+from typer.testing import CliRunner
+
+from cembrabillreader import __main__ as cembrabillreader_main
+from cembrabillreader import __version__
+from cembrabillreader.dependencies import Container
+from cembrabillreader.domain.entities import (
+    BillTotalByCardResult,
+    CalculateTotalByCardResult,
+    CardTotal,
+)
+from cembrabillreader.presentation import cli
+
+
+class TestCli(unittest.TestCase):
+    def test_version_does_not_import_the_parser(self):
+        code = (
+            "import sys\n"
+            "from typer.testing import CliRunner\n"
+            "from cembrabillreader.presentation import cli\n"
+            "CliRunner().invoke(cli.app, ['--version'])\n"
+            "print(','.join(m for m in ['pypdf', 'pydantic', 'dateutil']"
+            " if m in sys.modules))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout
+
+        self.assertEqual(output.strip(), "")
+
+    def test_version(self):
+        result = CliRunner().invoke(cli.app, ["--version"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn(__version__, result.stdout)
+
+    def test_invalidate_cache_does_not_build_the_usecases(self):
+        container = Container()
+        with patch.dict(os.environ, {"CEMBRABILLREADER_CACHE_DIR": "/nonexistent"}):
+            with patch.object(cli, "container", container):
+                result = CliRunner().invoke(cli.app, ["invalidate-cache"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Removed 0 cached bill(s)", result.stdout)
+        self.assertIn("cembra_bill_cache", vars(container))
+        self.assertNotIn("calculate_total_by_card", vars(container))
+        self.assertNotIn("console_view", vars(container))
+
+    def test_quiet_does_not_import_rich(self):
+        code = (
+            "import runpy, sys\n"
+            "sys.argv = ['cembrabillreader', 'calculate-total-by-card', '-q', '--help']\n"
+            "try:\n"
+            "    runpy.run_module('cembrabillreader', run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sys.modules.get('rich', 'missing'))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout
+
+        self.assertIn("--bill-path", output)
+        self.assertEqual(output.splitlines()[-1], "None")
+
+    def test_quiet_is_only_detected_on_commands_having_it(self):
+        for args, quiet in [
+            (["calculate-total-by-card", "-q"], True),
+            (
+                ["--log-level", "debug", "calculate-total-by-card-batch", "--quiet"],
+                True,
+            ),
+            (["calculate-total-by-card", "--holders", "-q", "--bill-path", "a"], False),
+            (["calculate-total-by-card", "--format", "csv"], False),
+            (["export-transactions", "-q"], False),
+            (["--log-level", "-q"], False),
+            (["-q"], False),
+        ]:
+            with self.subTest(args):
+                self.assertEqual(cembrabillreader_main._is_quiet(args), quiet)
+
+    def test_quiet_commands_options_with_value(self):
+        commands = typer.main.get_command(cli.app).commands
+        for (
+            name,
+            options,
+        ) in cembrabillreader_main._QUIET_COMMAND_OPTIONS_WITH_VALUE.items():
+            with self.subTest(name):
+                self.assertEqual(
+                    {
+                        opt
+                        for param in commands[name].params
+                        if not getattr(param, "is_flag", False)
+                        for opt in param.opts
+                    },
+                    options,
+                )
+
+    def test_calculate_total_by_card_records(self):
+        container = MagicMock()
+        container.calculate_total_by_card.calculate_bill_total_by_card.return_value = (
+            CalculateTotalByCardResult(
+                principal_card=CardTotal(card_holder="John", total_cents=47000),
+                additional_cards=[CardTotal(card_holder="Jane", total_cents=-120)],
+            )
+        )
+        container.record_view.side_effect = Container().record_view
+        arguments = ["calculate-total-by-card", "-bp", "bill.pdf", "-hds", "John,Jane"]
+
+        with patch.object(cli, "container", container):
+            quiet = CliRunner(mix_stderr=False).invoke(cli.app, arguments + ["-q"])
+            csv = CliRunner(mix_stderr=False).invoke(cli.app, arguments + ["-f", "csv"])
+
+        self.assertEqual(quiet.exit_code, 0)
+        self.assertEqual(
+            quiet.stdout.splitlines(),
+            [
+                '{"bill": "bill.pdf", "holder": "John", "is_principal_holder": true, '
+                '"total_cents": 47000, "total": "470.00", "error": null}',
+                '{"bill": "bill.pdf", "holder": "Jane", "is_principal_holder": false, '
+                '"total_cents": -120, "total": "-1.20", "error": null}',
+            ],
+        )
+        self.assertEqual(quiet.stderr, "")
+        self.assertEqual(
+            csv.stdout.splitlines(),
+            [
+                "bill,holder,is_principal_holder,total_cents,total,error",
+                "bill.pdf,John,true,47000,470.00,",
+                "bill.pdf,Jane,false,-120,-1.20,",
+            ],
+        )
+        self.assertIn("Bill located at path: bill.pdf", csv.stderr)
+        container.console_view.display_total_by_card.assert_not_called()
+
+    def test_batch_records_are_written_per_bill(self):
+        container = MagicMock()
+        container.calculate_total_by_card_batch.calculate_bills_total_by_card.return_value = iter(
+            [
+                BillTotalByCardResult(
+                    bill_path="a.pdf", result=None, error="cannot calculate total"
+                ),
+                BillTotalByCardResult(
+                    bill_path="b.pdf",
+                    result=CalculateTotalByCardResult(
+                        principal_card=CardTotal(card_holder="John", total_cents=100)
+                    ),
+                    error=None,
+                ),
+            ]
+        )
+        container.record_view.side_effect = Container().record_view
+
+        with patch.object(cli, "_resolve_bill_paths", return_value=["a.pdf", "b.pdf"]):
+            with patch.object(cli, "container", container):
+                result = CliRunner(mix_stderr=False).invoke(
+                    cli.app,
+                    ["calculate-total-by-card-batch", "-b", "bills", "-hds", "John"]
+                    + ["-f", "csv", "-q"],
+                )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(
+            result.stdout.splitlines(),
+            [
+                "bill,holder,is_principal_holder,total_cents,total,error",
+                "a.pdf,,,,,cannot calculate total",
+                "b.pdf,John,true,100,1.00,",
+            ],
+        )
+
+    def test_missing_options_are_not_prompted_without_a_terminal(self):
+        result = CliRunner().invoke(
+            cli.app, ["calculate-total-by-card", "-bp", "bill.pdf"], input="John\n"
+        )
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("Missing option", result.output)
+
+
+class TestContainer(unittest.TestCase):
+    def test_builds_each_dependency_once(self):
+        container = Container()
+
+        usecase = container.calculate_total_by_card_batch
+
+        self.assertIs(container.calculate_total_by_card_batch, usecase)
+        self.assertIs(container.cembra_bill_repository, container.cembra_bill_cache)
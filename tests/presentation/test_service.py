@@ -0,0 +1,225 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from cembrabillreader.domain.entities import CalculateTotalByCardResult, CardTotal
+from cembrabillreader.presentation.service import BillTotalService
+
+RESULT = CalculateTotalByCardResult(
+    principal_card=CardTotal(card_holder="John", total_cents=1050)
+)
+
+
+class CrashingCalculateTotalByCard:
+    def calculate_bill_total_by_card(self, bill_path, expected_holders):
+        if bill_path == "crash.pdf":
+            # like a worker killed for running out of memory
+            os._exit(1)
+        return RESULT
+
+
+class TestBillTotalService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.usecase_mock = MagicMock()
+        self.usecase_mock.calculate_bill_total_by_card.return_value = RESULT
+        self.service = BillTotalService(
+            self.usecase_mock, executor=self.executor, max_pending=1
+        )
+        self.server = await asyncio.start_server(
+            self.service.handle_connection, "127.0.0.1", 0
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def request(self, method, target, body=b"", content_type="application/json"):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(
+            f"{method} {target} HTTP/1.1\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, payload = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(payload)
+
+    async def raw_request(self, data):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(data)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return int(response.split()[1])
+
+    async def test_health(self):
+        status, body = await self.request("GET", "/health")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {"status": "ok", "pending": 0})
+
+    async def test_total_by_card_of_bill_path(self):
+        status, body = await self.request(
+            "POST",
+            "/total-by-card",
+            json.dumps({"bill_path": "bill.pdf", "holders": ["John"]}).encode(),
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body["principal_card"]["total_cents"], 1050)
+        self.usecase_mock.calculate_bill_total_by_card.assert_called_once_with(
+            "bill.pdf", ["John"]
+        )
+
+    async def test_total_by_card_of_uploaded_bill(self):
+        status, _ = await self.request(
+            "POST",
+            "/total-by-card?holders=John,%20Jane",
+            b"%PDF-1.4",
+            content_type="application/pdf",
+        )
+
+        self.assertEqual(status, 200)
+        self.usecase_mock.calculate_bill_total_by_card.assert_called_once_with(
+            b"%PDF-1.4", ["John", "Jane"]
+        )
+
+    async def test_rejects_requests_when_busy(self):
+        parsing = threading.Event()
+        release = threading.Event()
+
+        def calculate(bill_path, expected_holders):
+            parsing.set()
+            release.wait(5)
+            return RESULT
+
+        self.usecase_mock.calculate_bill_total_by_card.side_effect = calculate
+        body = json.dumps({"bill_path": "bill.pdf", "holders": ["John"]}).encode()
+
+        first = asyncio.create_task(self.request("POST", "/total-by-card", body))
+        await asyncio.get_running_loop().run_in_executor(None, parsing.wait, 5)
+        status, _ = await self.request("POST", "/total-by-card", body)
+        release.set()
+
+        self.assertEqual(status, 503)
+        self.assertEqual((await first)[0], 200)
+
+    async def test_invalid_requests(self):
+        self.usecase_mock.calculate_bill_total_by_card.side_effect = ValueError(
+            "cannot calculate total"
+        )
+
+        self.assertEqual((await self.request("GET", "/unknown"))[0], 404)
+        self.assertEqual((await self.request("GET", "/total-by-card"))[0], 405)
+        self.assertEqual(
+            (await self.request("POST", "/total-by-card", b"{not json"))[0], 400
+        )
+        self.assertEqual(
+            (
+                await self.request(
+                    "POST",
+                    "/total-by-card",
+                    json.dumps({"bill_path": "bill.pdf", "holders": "John"}).encode(),
+                )
+            )[0],
+            400,
+        )
+        self.assertEqual(
+            (
+                await self.request(
+                    "POST",
+                    "/total-by-card",
+                    json.dumps({"bill_path": "bill.pdf", "holders": ["J"]}).encode(),
+                )
+            )[0],
+            422,
+        )
+
+    async def test_lines_too_long(self):
+        self.assertEqual(
+            await self.raw_request(
+                b"GET /health?" + b"x" * 70_000 + b" HTTP/1.1\r\n\r\n"
+            ),
+            400,
+        )
+        self.assertEqual(
+            await self.raw_request(
+                b"GET /health HTTP/1.1\r\nX-Long: " + b"x" * 70_000 + b"\r\n\r\n"
+            ),
+            431,
+        )
+
+    async def test_chunked_request_body(self):
+        status = await self.raw_request(
+            b"POST /total-by-card?holders=John HTTP/1.1\r\n"
+            b"Content-Type: application/pdf\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"8\r\n%PDF-1.4\r\n0\r\n\r\n"
+        )
+
+        self.assertEqual(status, 411)
+        self.usecase_mock.calculate_bill_total_by_card.assert_not_called()
+
+    async def test_unexpected_errors(self):
+        self.usecase_mock.calculate_bill_total_by_card.side_effect = RuntimeError(
+            "unexpected"
+        )
+
+        with self.assertLogs(level="ERROR"):
+            status, body = await self.request(
+                "POST",
+                "/total-by-card",
+                json.dumps({"bill_path": "bill.pdf", "holders": ["John"]}).encode(),
+            )
+
+        self.assertEqual(status, 500)
+        self.assertEqual(body, {"error": "internal error"})
+
+
+class TestBillTotalServiceWorkerCrash(unittest.IsolatedAsyncioTestCase):
+    request = TestBillTotalService.request
+
+    async def asyncSetUp(self):
+        def new_executor():
+            # forked workers would keep the test connections open
+            return ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("forkserver")
+            )
+
+        self.service = BillTotalService(
+            CrashingCalculateTotalByCard(),
+            executor=new_executor(),
+            max_pending=2,
+            executor_factory=new_executor,
+        )
+        self.server = await asyncio.start_server(
+            self.service.handle_connection, "127.0.0.1", 0
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.service.executor.shutdown()
+
+    async def test_replaces_the_worker_pool_when_a_worker_dies(self):
+        def body(bill_path):
+            return json.dumps({"bill_path": bill_path, "holders": ["John"]}).encode()
+
+        with self.assertLogs(level="ERROR"):
+            status, _ = await self.request("POST", "/total-by-card", body("crash.pdf"))
+        self.assertEqual(status, 500)
+
+        status, response = await self.request(
+            "POST", "/total-by-card", body("bill.pdf")
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(response["principal_card"]["total_cents"], 1050)
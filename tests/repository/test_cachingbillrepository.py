@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from cembrabillreader.domain.entities import Card, CembraBill, Transaction
+from cembrabillreader.repository.cachingbillrepository import (
+    CachingCembraBillRepository,
+)
+
+
+def create_cembra_bill(holder: str) -> CembraBill:
+    return CembraBill(
+        principal_card=Card(
+            holder=holder,
+            is_principal_holder=True,
+            transactions=[
+                Transaction(
+                    transaction_date=datetime(2023, 6, 4),
+                    registration_date=datetime(2023, 6, 5),
+                    description="Some Transaction",
+                    amount=100.0,
+                )
+            ],
+        ),
+    )
+
+
+class TestCachingCembraBillRepository(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        self.repository_mock = MagicMock()
+        self.repository_mock.parser_version = "1"
+        self.repository_mock.load_cembra_bill.side_effect = (
+            lambda path, holders, profile=False: create_cembra_bill(holders[0])
+        )
+        self.repository = CachingCembraBillRepository(
+            self.repository_mock, cache_dir=self.cache_dir
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_bill(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "wb") as file:
+            file.write(content)
+        return path
+
+    def test_load_cembra_bill_from_bytes_is_cached(self):
+        bill_path = self.write_bill("bill.pdf", b"content")
+        self.repository.load_cembra_bill(bill_path, ["John"])
+
+        with open(bill_path, "rb") as file:
+            self.repository.load_cembra_bill(file, ["John"])
+        self.repository.load_cembra_bill(b"content", ["John"])
+
+        self.repository_mock.load_cembra_bill.assert_called_once()
+
+    def test_load_cembra_bill_is_cached(self):
+        bill_path = self.write_bill("bill.pdf", b"content")
+
+        first = self.repository.load_cembra_bill(bill_path, ["John"])
+        second = self.repository.load_cembra_bill(bill_path, ["John"])
+
+        self.assertEqual(first, second)
+        self.repository_mock.load_cembra_bill.assert_called_once()
+
+    def test_profiled_load_bypasses_cache(self):
+        bill_path = self.write_bill("bill.pdf", b"content")
+        self.repository.load_cembra_bill(bill_path, ["John"])
+
+        self.repository.load_cembra_bill(bill_path, ["John"], profile=True)
+
+        self.repository_mock.load_cembra_bill.assert_called_with(
+            bill_path, ["John"], profile=True
+        )
+        self.assertEqual(self.repository_mock.load_cembra_bill.call_count, 2)
+
+    def test_cache_key_depends_on_content_holders_and_parser_version(self):
+        bill_path = self.write_bill("bill.pdf", b"content")
+        self.repository.load_cembra_bill(bill_path, ["John"])
+
+        self.repository.load_cembra_bill(bill_path, ["Jane"])
+        self.write_bill("bill.pdf", b"changed content")
+        self.repository.load_cembra_bill(bill_path, ["John"])
+        self.repository_mock.parser_version = "2"
+        CachingCembraBillRepository(
+            self.repository_mock, cache_dir=self.cache_dir
+        ).load_cembra_bill(bill_path, ["John"])
+
+        self.assertEqual(self.repository_mock.load_cembra_bill.call_count, 4)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        paths = [self.write_bill(f"{i}.pdf", str(i).encode()) for i in range(3)]
+        self.repository.load_cembra_bill(paths[0], ["John"])
+        entry_size = sum(e.stat().st_size for e in os.scandir(self.cache_dir))
+        repository = CachingCembraBillRepository(
+            self.repository_mock,
+            cache_dir=self.cache_dir,
+            max_size_bytes=2 * entry_size,
+        )
+        repository.load_cembra_bill(paths[1], ["John"])
+        # make the first entry the most recently used one
+        entries = sorted(os.scandir(self.cache_dir), key=lambda e: e.name)
+        for entry in entries:
+            used = (
+                2000
+                if entry.name.startswith(repository.content_hash(paths[0]))
+                else 1000
+            )
+            os.utime(entry.path, (used, used))
+
+        repository.load_cembra_bill(paths[2], ["John"])
+
+        cached = {e.name.split("-")[0] for e in os.scandir(self.cache_dir)}
+        self.assertEqual(
+            cached,
+            {repository.content_hash(paths[0]), repository.content_hash(paths[2])},
+        )
+
+    def test_invalidate(self):
+        first = self.write_bill("first.pdf", b"first")
+        second = self.write_bill("second.pdf", b"second")
+        self.repository.load_cembra_bill(first, ["John"])
+        self.repository.load_cembra_bill(first, ["Jane"])
+        self.repository.load_cembra_bill(second, ["John"])
+
+        self.assertEqual(self.repository.invalidate(first), 2)
+        self.assertEqual(self.repository.invalidate(), 1)
+        self.assertEqual(self.repository.invalidate(), 0)
+
+    def test_corrupted_entry_is_parsed_again(self):
+        bill_path = self.write_bill("bill.pdf", b"content")
+        self.repository.load_cembra_bill(bill_path, ["John"])
+        for entry in os.scandir(self.cache_dir):
+            with open(entry.path, "w") as file:
+                file.write("{not json")
+
+        cembra_bill = self.repository.load_cembra_bill(bill_path, ["John"])
+
+        self.assertEqual(cembra_bill.principal_card.holder, "John")
+        self.assertEqual(self.repository_mock.load_cembra_bill.call_count, 2)
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+from cembrabillreader.domain.entities import (
+    BillTotalByCardResult,
+    CalculateTotalByCardResult,
+    CardTotal,
+)
+from cembrabillreader.repository.jsonlcheckpoint import JsonlIngestionCheckpoint
+
+
+def succeeded(bill_path, total_cents):
+    return BillTotalByCardResult(
+        bill_path=bill_path,
+        result=CalculateTotalByCardResult(
+            principal_card=CardTotal(card_holder="John", total_cents=total_cents)
+        ),
+        error=None,
+    )
+
+
+def failed(bill_path):
+    return BillTotalByCardResult(
+        bill_path=bill_path,
+        result=None,
+        error="took longer than 1 seconds",
+        error_type="BillTimeoutError",
+    )
+
+
+class TestJsonlIngestionCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "run", "checkpoint.jsonl")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_results_survive_reopening(self):
+        with JsonlIngestionCheckpoint(self.path) as checkpoint:
+            self.assertEqual(checkpoint.results(), {})
+            checkpoint.record(succeeded("a.pdf", 1000))
+            checkpoint.record(failed("b.pdf"))
+
+        with JsonlIngestionCheckpoint(self.path) as checkpoint:
+            self.assertEqual(
+                checkpoint.results(),
+                {
+                    os.path.abspath("a.pdf"): succeeded(os.path.abspath("a.pdf"), 1000),
+                    os.path.abspath("b.pdf"): failed(os.path.abspath("b.pdf")),
+                },
+            )
+
+    def test_last_result_of_a_bill_wins(self):
+        with JsonlIngestionCheckpoint(self.path) as checkpoint:
+            checkpoint.record(failed("a.pdf"))
+            checkpoint.record(succeeded("a.pdf", 500))
+
+        with JsonlIngestionCheckpoint(self.path) as checkpoint:
+            self.assertEqual(
+                checkpoint.results(),
+                {os.path.abspath("a.pdf"): succeeded(os.path.abspath("a.pdf"), 500)},
+            )
+
+    def test_incomplete_line_is_ignored(self):
+        with JsonlIngestionCheckpoint(self.path) as checkpoint:
+            checkpoint.record(succeeded("a.pdf", 1000))
+        with open(self.path, "a") as file:
+            file.write(succeeded("b.pdf", 200).model_dump_json()[:20])
+
+        with self.assertLogs(level="WARNING"):
+            checkpoint = JsonlIngestionCheckpoint(self.path)
+        with checkpoint:
+            self.assertEqual(list(checkpoint.results()), [os.path.abspath("a.pdf")])
+            checkpoint.record(succeeded("c.pdf", 300))
+
+        with self.assertLogs(level="WARNING"):
+            checkpoint = JsonlIngestionCheckpoint(self.path)
+        with checkpoint:
+            self.assertEqual(
+                list(checkpoint.results()),
+                [os.path.abspath("a.pdf"), os.path.abspath("c.pdf")],
+            )
+
+    def test_results_are_found_from_another_working_directory(self):
+        bill_path = os.path.join(self.tmp_dir.name, "bills", "a.pdf")
+        cwd = os.getcwd()
+        try:
+            os.chdir(self.tmp_dir.name)
+            with JsonlIngestionCheckpoint(self.path) as checkpoint:
+                checkpoint.record(succeeded(os.path.join("bills", "a.pdf"), 1000))
+            os.chdir(os.path.join(self.tmp_dir.name, "run"))
+            with JsonlIngestionCheckpoint(self.path) as checkpoint:
+                self.assertEqual(list(checkpoint.results()), [bill_path])
+        finally:
+            os.chdir(cwd)
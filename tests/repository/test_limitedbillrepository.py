@@ -0,0 +1,103 @@
+import io
+import os
+import time
+import unittest
+
+from benchmarks.synthetic import generate_statement
+from cembrabillreader.domain.errors import (
+    BillMemoryLimitError,
+    BillTimeoutError,
+    WorkerCrashedError,
+)
+from cembrabillreader.domain.repository import CembraBillRepository
+from cembrabillreader.domain.usecases import CalculateTotalByCard
+from cembrabillreader.repository.limitedbillrepository import (
+    LimitedCembraBillRepository,
+)
+from cembrabillreader.repository.pdfbillrepository import PdfCembraBillRepository
+
+
+class MisbehavingRepository(CembraBillRepository):
+    # the bill names how to misbehave
+    parser_version = "misbehaving"
+
+    def load_cembra_bill(self, path_to_bill, expected_holders, profile=False):
+        if path_to_bill == "hang":
+            time.sleep(60)
+        if path_to_bill == "balloon":
+            memory = []
+            while True:
+                memory.append(bytearray(64 * 1024 * 1024))
+        if path_to_bill == "crash":
+            os._exit(9)
+        raise RuntimeError(f"cannot read {path_to_bill}")
+
+
+class TestLimitedCembraBillRepository(unittest.TestCase):
+    def test_results_equal_the_wrapped_repository(self):
+        statement = generate_statement(pages=2, rows_per_page=10, holders=2)
+        repository = PdfCembraBillRepository()
+        limited = LimitedCembraBillRepository(
+            repository, timeout_seconds=30, memory_limit_bytes=2 * 1024**3
+        )
+
+        self.assertEqual(limited.parser_version, repository.parser_version)
+        expected = repository.load_cembra_bill(statement.pdf, statement.holders)
+        for bill in [statement.pdf, io.BytesIO(statement.pdf)]:
+            self.assertEqual(
+                limited.load_cembra_bill(bill, statement.holders), expected
+            )
+        self.assertEqual(
+            [
+                (holder, record.amount_cents)
+                for holder, _, record in limited.iter_transactions(
+                    statement.pdf, statement.holders
+                )
+            ],
+            [
+                (holder, record.amount_cents)
+                for holder, _, record in repository.iter_transactions(
+                    statement.pdf, statement.holders
+                )
+            ],
+        )
+
+    def test_timeout(self):
+        limited = LimitedCembraBillRepository(
+            MisbehavingRepository(), timeout_seconds=0.5
+        )
+
+        started_at = time.monotonic()
+        with self.assertRaises(BillTimeoutError) as raised:
+            limited.load_cembra_bill("hang", ["John"])
+        self.assertLess(time.monotonic() - started_at, 30)
+        self.assertTrue(str(raised.exception).startswith("hang: "))
+
+    def test_memory_limit(self):
+        limited = LimitedCembraBillRepository(
+            MisbehavingRepository(), memory_limit_bytes=1024**3
+        )
+
+        with self.assertRaises(BillMemoryLimitError):
+            limited.load_cembra_bill("balloon", ["John"])
+
+    def test_crash(self):
+        limited = LimitedCembraBillRepository(MisbehavingRepository())
+
+        with self.assertRaises(WorkerCrashedError):
+            list(limited.iter_transactions("crash", ["John"]))
+
+    def test_other_errors_are_raised_as_is(self):
+        limited = LimitedCembraBillRepository(MisbehavingRepository())
+
+        with self.assertRaisesRegex(RuntimeError, "cannot read bill.pdf"):
+            limited.load_cembra_bill("bill.pdf", ["John"])
+
+    def test_typed_errors_surface_through_calculate_total_by_card(self):
+        calculate_total_by_card = CalculateTotalByCard(
+            LimitedCembraBillRepository(MisbehavingRepository(), timeout_seconds=0.5)
+        )
+
+        with self.assertLogs(level="CRITICAL"):
+            with self.assertRaises(BillTimeoutError):
+                calculate_total_by_card.calculate_bill_total_by_card("hang", ["John"])
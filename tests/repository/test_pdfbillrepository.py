@@ -1,10 +1,25 @@
+import io
 from os import path
+import tempfile
 import unittest
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+import pypdf
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+)
+
 from cembrabillreader.domain.entities import Card, CembraBill, Transaction
+from cembrabillreader.domain.errors import BillParsingError
 from cembrabillreader.repository.pdfbillrepository import (
+    BookingPageSelector,
+    FragmentClassifier,
+    LayoutRowBuilder,
     PdfCembraBillRepository,
     PdfTableTransaction,
     TransactionsVisitorHelper,
@@ -13,6 +28,14 @@ from cembrabillreader.repository.pdfbillrepository import (
 MOCK_BILL_CONTENT_PATH = "tests/mock_bill_content"
 
 
+def page_mock(fragments):
+    page = MagicMock()
+    page.extract_text.side_effect = lambda visitor_text: [
+        visitor_text(f, None, None, None, None) for f in fragments
+    ]
+    return page
+
+
 class TestPdfCembraBillRepository(unittest.TestCase):
     def test_load_cembra_bill(self):
         # Mock the PdfReader and its behavior
@@ -80,6 +103,362 @@ class TestPdfCembraBillRepository(unittest.TestCase):
             self.assertEqual(cembra_bill.additional_card.holder, "Additional Holder")
             file_mock.assert_called_once_with("path/to/bill.pdf", "rb")
 
+    def test_iter_transactions_yields_page_by_page(self):
+        pages = [
+            page_mock(["John", "22.09.2023 24.09.2023 Merchant CHE 1.50"]),
+            page_mock(["Jane", "23.09.2023 24.09.2023 Merchant CHE 2.00"]),
+        ]
+        pdf_reader_mock = MagicMock()
+        pdf_reader_mock.pages = pages
+
+        with patch("builtins.open", MagicMock()):
+            with patch("pypdf.PdfReader", return_value=pdf_reader_mock):
+                transactions = PdfCembraBillRepository(
+                    select_pages=False
+                ).iter_transactions("path/to/bill.pdf", ["John", "Jane"])
+                holder, is_principal_holder, transaction = next(transactions)
+                pages[1].extract_text.assert_not_called()
+                remaining = list(transactions)
+
+        self.assertEqual((holder, is_principal_holder), ("John", True))
+        self.assertEqual(transaction.amount_cents, 150)
+        self.assertEqual(
+            [(t.holder, t.is_principal_holder) for t in remaining], [("Jane", False)]
+        )
+
+    def test_load_cembra_bill_stops_at_stop_marker(self):
+        pages = [
+            page_mock(["John", "22.09.2023 24.09.2023 Merchant CHE 1.50"]),
+            page_mock(["Total 1.50", "23.09.2023 24.09.2023 Merchant CHE 2.00"]),
+            page_mock(["24.09.2023 24.09.2023 Merchant CHE 3.00"]),
+        ]
+        pdf_reader_mock = MagicMock()
+        pdf_reader_mock.pages = pages
+
+        with patch("builtins.open", MagicMock()):
+            with patch("pypdf.PdfReader", return_value=pdf_reader_mock):
+                cembra_bill = PdfCembraBillRepository(
+                    select_pages=False, stop_marker="TOTAL"
+                ).load_cembra_bill("path/to/bill.pdf", ["John"])
+
+        self.assertEqual(len(cembra_bill.principal_card.transactions), 1)
+        pages[2].extract_text.assert_not_called()
+
+    def test_load_cembra_bill_rejects_amounts_out_of_range(self):
+        pdf_reader_mock = MagicMock()
+        pdf_reader_mock.pages = [
+            page_mock(
+                [
+                    "John",
+                    "22.09.2023 24.09.2023 Merchant CHE 99999999999999999999.00",
+                    "22.09.2023 24.09.2023 Merchant CHE 1e17",
+                    "23.09.2023 24.09.2023 Merchant CHE 2.00",
+                ]
+            )
+        ]
+
+        with patch("builtins.open", MagicMock()):
+            with patch("pypdf.PdfReader", return_value=pdf_reader_mock):
+                cembra_bill = PdfCembraBillRepository(
+                    select_pages=False
+                ).load_cembra_bill("path/to/bill.pdf", ["John"])
+
+        self.assertEqual(cembra_bill.principal_card.calculate_total_cents(), 200)
+
+    def test_parser_version_depends_on_the_parsing_options(self):
+        versions = [
+            PdfCembraBillRepository(**options).parser_version
+            for options in [
+                {},
+                {"stop_marker": "TOTAL"},
+                {"stop_marker": "Total amount due"},
+                {"dateutil_fallback": True},
+                {"layout": True},
+            ]
+        ]
+
+        self.assertEqual(len(set(versions)), len(versions))
+        self.assertEqual(
+            PdfCembraBillRepository(select_pages=False, page_workers=2).parser_version,
+            PdfCembraBillRepository().parser_version,
+        )
+
+
+class TestBookingPageSelector(unittest.TestCase):
+    def create_page(self, content: bytes, font_subtype: str = "/Type1", **font_entries):
+        page = pypdf.PageObject.create_blank_page(width=595, height=842)
+        stream = DecodedStreamObject()
+        stream.set_data(content)
+        page[NameObject("/Contents")] = stream
+        font = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject(font_subtype),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+                **{NameObject(f"/{k}"): v for k, v in font_entries.items()},
+            }
+        )
+        page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+            }
+        )
+        return page
+
+    def test_selects_pages_with_bookings_or_holders(self):
+        selector = BookingPageSelector(["John Doe"])
+
+        self.assertTrue(
+            selector.may_contain_bookings(
+                self.create_page(b"BT /F1 9 Tf (22.09.2023 24.09.2023 A 1.00) Tj ET")
+            )
+        )
+        self.assertTrue(
+            selector.may_contain_bookings(
+                self.create_page(b"BT /F1 9 Tf [(22.0)-20(9.2023)] TJ ET")
+            )
+        )
+        self.assertTrue(
+            selector.may_contain_bookings(
+                self.create_page(b"BT /F1 9 Tf (JOHN\\040DOE 1234) Tj ET")
+            )
+        )
+
+    def test_selects_pages_with_kerned_holders(self):
+        selector = BookingPageSelector(["John Doe", "Jane Smith"])
+
+        self.assertTrue(
+            selector.may_contain_bookings(
+                self.create_page(b"BT /F1 9 Tf [(Jane)-600(Smith)] TJ ET")
+            )
+        )
+        self.assertTrue(
+            selector.may_contain_bookings(
+                self.create_page(b"BT /F1 9 Tf [(J)20(ohn)] TJ 12 0 Td (Doe) Tj ET")
+            )
+        )
+
+    def create_form_page(self, form_content: bytes):
+        page = self.create_page(b"q /Fm0 Do Q")
+        form = DecodedStreamObject()
+        form.set_data(form_content)
+        form.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Form"),
+                NameObject("/BBox"): ArrayObject(
+                    [NumberObject(0), NumberObject(0)]
+                    + [NumberObject(595), NumberObject(842)]
+                ),
+                NameObject("/Resources"): DictionaryObject(
+                    {NameObject("/Font"): page["/Resources"]["/Font"]}
+                ),
+            }
+        )
+        page["/Resources"][NameObject("/XObject")] = DictionaryObject(
+            {NameObject("/Fm0"): form}
+        )
+        return page
+
+    def test_load_cembra_bill_with_text_drawn_from_a_form_xobject(self):
+        writer = pypdf.PdfWriter()
+        writer.add_page(
+            self.create_form_page(
+                b"BT /F1 9 Tf 40 800 Td (John Doe 1234) Tj 0 -12 Td "
+                b"(22.09.2023 24.09.2023 Coop-1234 Zuerich CHE 10.00) Tj ET"
+            )
+        )
+        bill = io.BytesIO()
+        writer.write(bill)
+
+        for select_pages in [False, True]:
+            with self.subTest(select_pages=select_pages):
+                cembra_bill = PdfCembraBillRepository(
+                    select_pages=select_pages
+                ).load_cembra_bill(bill.getvalue(), ["John Doe"])
+
+                self.assertEqual(
+                    cembra_bill.principal_card.calculate_total_cents(), 1000
+                )
+
+    def test_load_cembra_bill_without_holder(self):
+        writer = pypdf.PdfWriter()
+        writer.add_page(self.create_page(b"BT /F1 9 Tf (General terms) Tj ET"))
+        bill = io.BytesIO()
+        writer.write(bill)
+
+        with self.assertRaises(BillParsingError):
+            PdfCembraBillRepository().load_cembra_bill(bill.getvalue(), ["John Doe"])
+
+    def test_load_cembra_bill_with_kerned_holder_header_page(self):
+        writer = pypdf.PdfWriter()
+        for content in [
+            b"BT /F1 9 Tf 40 800 Td (John Doe 1234) Tj 0 -12 Td "
+            b"(22.09.2023 24.09.2023 Coop-1234 Zuerich CHE 10.00) Tj ET",
+            b"BT /F1 9 Tf 40 800 Td [(Jane)-600(Smith)-600(5678)] TJ ET",
+            b"BT /F1 9 Tf 40 800 Td "
+            b"(23.09.2023 25.09.2023 Migros MM Basel CHE 20.00) Tj ET",
+        ]:
+            writer.add_page(self.create_page(content))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bill_path = path.join(tmp_dir, "bill.pdf")
+            with open(bill_path, "wb") as file:
+                writer.write(file)
+
+            for select_pages in [False, True]:
+                with self.subTest(select_pages=select_pages):
+                    cembra_bill = PdfCembraBillRepository(
+                        select_pages=select_pages
+                    ).load_cembra_bill(bill_path, ["John Doe", "Jane Smith"])
+
+                    self.assertEqual(cembra_bill.principal_card.calculate_total(), 10.0)
+                    self.assertEqual(len(cembra_bill.additional_cards), 1)
+                    self.assertEqual(
+                        cembra_bill.additional_cards[0].calculate_total(), 20.0
+                    )
+
+    def test_selects_pages_with_fonts_mapping_their_own_codes(self):
+        selector = BookingPageSelector(["John Doe"])
+        content = b"BT /F1 9 Tf (\001\002\003) Tj ET"
+        differences = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Encoding"),
+                NameObject("/Differences"): ArrayObject(),
+            }
+        )
+        descriptor = DictionaryObject({NameObject("/Flags"): NumberObject(4)})
+
+        for font_entries in [
+            {"ToUnicode": DecodedStreamObject()},
+            {"Encoding": differences},
+            {"FontDescriptor": descriptor},
+        ]:
+            with self.subTest(list(font_entries)):
+                self.assertTrue(
+                    selector.may_contain_bookings(
+                        self.create_page(
+                            content, font_subtype="/TrueType", **font_entries
+                        )
+                    )
+                )
+        self.assertFalse(
+            selector.may_contain_bookings(
+                self.create_page(
+                    content,
+                    Encoding=NameObject("/WinAnsiEncoding"),
+                    FontDescriptor=DictionaryObject(
+                        {NameObject("/Flags"): NumberObject(32)}
+                    ),
+                )
+            )
+        )
+
+    def test_skips_pages_without_bookings(self):
+        selector = BookingPageSelector(["John Doe"])
+
+        self.assertFalse(
+            selector.may_contain_bookings(
+                self.create_page(b"BT /F1 9 Tf (General terms) Tj ET")
+            )
+        )
+        self.assertFalse(
+            selector.may_contain_bookings(self.create_page(b"q 1 0 0 1 0 0 cm Q"))
+        )
+
+    def test_selects_pages_drawing_form_xobjects(self):
+        self.assertTrue(
+            BookingPageSelector(["John Doe"]).may_contain_bookings(
+                self.create_form_page(b"BT /F1 9 Tf (General terms) Tj ET")
+            )
+        )
+
+    def test_selects_pages_that_cannot_be_inspected(self):
+        self.assertTrue(
+            BookingPageSelector(["John Doe"]).may_contain_bookings(
+                self.create_page(b"BT /F1 9 Tf <0012> Tj ET", font_subtype="/Type0")
+            )
+        )
+        self.assertTrue(
+            BookingPageSelector(["Jérôme"]).may_contain_bookings(
+                self.create_page(b"BT /F1 9 Tf (General terms) Tj ET")
+            )
+        )
+
+
+class TestFragmentClassifier(unittest.TestCase):
+    def test_classify(self):
+        classifier = FragmentClassifier(
+            ["John Doe", "Jane Smith"], stop_marker="total amount due"
+        )
+        name, row = FragmentClassifier.NAME, FragmentClassifier.ROW
+
+        for text, kind in [
+            ("", FragmentClassifier.NOISE),
+            ("\n", FragmentClassifier.NOISE),
+            ("1/3", FragmentClassifier.NOISE),
+            ("CHF", FragmentClassifier.NOISE),
+            ("       \n", FragmentClassifier.NOISE),
+            (" " * 40, FragmentClassifier.NOISE),
+            ("John Doe", name),
+            ("Your monthly statement", name),
+            ("04.06.2023 05.06.2023 Merchant CHE 470.00", name | row),
+            ("04.06.2023 05.06.2023 1", name | row),
+        ]:
+            with self.subTest(text):
+                self.assertEqual(classifier.classify(text), kind)
+
+    def test_rows_parsed_by_dateutil_need_no_leading_digit(self):
+        classifier = FragmentClassifier(["John Doe"], dateutil_fallback=True)
+
+        self.assertEqual(
+            classifier.classify("Jun 4 Jun 5 Merchant 470.00"),
+            FragmentClassifier.NAME | FragmentClassifier.ROW,
+        )
+        self.assertEqual(classifier.classify("a b c"), FragmentClassifier.ROW)
+        self.assertEqual(classifier.classify("abc"), FragmentClassifier.NOISE)
+
+    def test_no_names(self):
+        classifier = FragmentClassifier([""])
+
+        self.assertEqual(classifier.classify("Your monthly statement"), 0)
+
+
+class TestLayoutRowBuilder(unittest.TestCase):
+    IDENTITY = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+
+    def show(self, row_builder, text, x, y, cm=IDENTITY):
+        tm = [1.0, 0.0, 0.0, 1.0, x, y]
+        row_builder.operand_before(b"Tj", [text], cm, tm)
+        # pypdf flushes the text later, with the matrix of that moment
+        row_builder.add_fragment(text + "\n", cm, self.IDENTITY, None, 9.0)
+
+    def test_rows(self):
+        row_builder = LayoutRowBuilder()
+        self.show(row_builder, "470.00", 480, 788)
+        self.show(row_builder, "04.06.2023 05.06.2023", 40, 788.5)
+        self.show(row_builder, "Merchant CHE", 150, 787.5)
+        self.show(row_builder, "Total amount due", 40, 700)
+        self.show(row_builder, "John Doe", 40, 800)
+        row_builder.add_fragment("   ", None, None, None, None)
+
+        self.assertEqual(
+            row_builder.rows(),
+            [
+                "John Doe",
+                "04.06.2023 05.06.2023 Merchant CHE 470.00",
+                "Total amount due",
+            ],
+        )
+        self.assertEqual(row_builder.rows(), [])
+
+    def test_rows_in_page_space(self):
+        row_builder = LayoutRowBuilder()
+        cm = [1.0, 0.0, 0.0, 1.0, 100.0, 0.0]
+        self.show(row_builder, "b", 0, 10, cm=cm)
+        self.show(row_builder, "a", 50, 10)
+
+        self.assertEqual(row_builder.rows(), ["a b"])
+
 
 class TestPdfTableTransaction(unittest.TestCase):
     def test_from_book_entry(self):
@@ -99,3 +478,30 @@ class TestPdfTableTransaction(unittest.TestCase):
 
         # Assert the expected Transaction instance is returned
         self.assertIsNone(transaction)
+
+    def test_from_book_entry_is_day_first(self):
+        transaction = PdfTableTransaction.from_book_entry(
+            "04.06.2023 05.06.2023 Merchant CHE -12.30"
+        )
+
+        self.assertEqual(transaction.transaction_date, datetime(2023, 6, 4))
+        self.assertEqual(transaction.registration_date, datetime(2023, 6, 5))
+        self.assertEqual(transaction.amount, -12.30)
+
+    def test_from_book_entry_invalid_row(self):
+        for book_entry in [
+            "31.02.2023 05.06.2023 Merchant CHE 1.00",
+            "04.06.2023 05.06.2023 Merchant CHE",
+            "04.06.2023 Merchant CHE 1.00",
+        ]:
+            self.assertIsNone(PdfTableTransaction.from_book_entry(book_entry))
+
+    def test_from_book_entry_dateutil_fallback(self):
+        book_entry = "2023-09-22 2023-09-24 Merchant CHE 101.55"
+
+        self.assertIsNone(PdfTableTransaction.from_book_entry(book_entry))
+        transaction = PdfTableTransaction.from_book_entry(
+            book_entry, dateutil_fallback=True
+        )
+        self.assertEqual(transaction.transaction_date, datetime(2023, 9, 22))
+        self.assertEqual(transaction.description, "Merchant CHE")
@@ -0,0 +1,101 @@
+import unittest
+from datetime import date
+
+from cembrabillreader.domain.entities import IndexedBill
+from cembrabillreader.domain.transactionstore import (
+    HolderTransaction,
+    TransactionRecord,
+)
+from cembrabillreader.repository.sqlitebillindex import SqliteBillIndex
+
+
+def indexed_bill(path, content_hash="hash"):
+    return IndexedBill(
+        path=path,
+        mtime_ns=1,
+        size=2,
+        content_hash=content_hash,
+        holders=["John", "Jane"],
+        parser_version="3",
+    )
+
+
+def holder_transaction(holder, day, amount_cents):
+    ordinal = date(2023, 6, day).toordinal()
+    return HolderTransaction(
+        holder,
+        holder == "John",
+        TransactionRecord(ordinal, ordinal + 1, "Merchant", amount_cents),
+    )
+
+
+class TestSqliteBillIndex(unittest.TestCase):
+    def setUp(self):
+        self.bill_index = SqliteBillIndex(":memory:")
+        self.addCleanup(self.bill_index.close)
+
+    def test_index_bill(self):
+        bill = indexed_bill("/bills/june.pdf")
+
+        self.bill_index.index_bill(bill, [holder_transaction("John", 4, 47000)])
+
+        self.assertEqual(self.bill_index.indexed_bill("/bills/june.pdf"), bill)
+        self.assertIsNone(self.bill_index.indexed_bill("/bills/july.pdf"))
+        self.assertEqual(self.bill_index.indexed_paths(), ["/bills/june.pdf"])
+
+    def test_total_by_holder(self):
+        self.bill_index.index_bill(
+            indexed_bill("/bills/a.pdf"),
+            [
+                holder_transaction("John", 4, 47000),
+                holder_transaction("Jane", 10, 1230),
+                holder_transaction("John", 20, -500),
+            ],
+        )
+        self.bill_index.index_bill(
+            indexed_bill("/bills/b.pdf"), [holder_transaction("John", 25, 100)]
+        )
+
+        result = self.bill_index.total_by_holder()
+        self.assertEqual(
+            [(t.card_holder, t.total_cents) for t in result.totals],
+            [("Jane", 1230), ("John", 46600)],
+        )
+        self.assertEqual(result.bills_processed, 2)
+
+        result = self.bill_index.total_by_holder(date(2023, 6, 10), date(2023, 6, 20))
+        self.assertEqual(
+            [(t.card_holder, t.total_cents) for t in result.totals],
+            [("Jane", 1230), ("John", -500)],
+        )
+        self.assertEqual(result.bills_processed, 1)
+
+    def test_index_bill_replaces_transactions(self):
+        self.bill_index.index_bill(
+            indexed_bill("/bills/a.pdf"), [holder_transaction("John", 4, 47000)]
+        )
+
+        self.bill_index.index_bill(
+            indexed_bill("/bills/a.pdf", "new hash"),
+            [holder_transaction("John", 4, 100)],
+        )
+
+        self.assertEqual(
+            self.bill_index.indexed_bill("/bills/a.pdf").content_hash, "new hash"
+        )
+        self.assertEqual(self.bill_index.total_by_holder().totals[0].total_cents, 100)
+
+    def test_update_and_remove_bill(self):
+        self.bill_index.index_bill(
+            indexed_bill("/bills/a.pdf"), [holder_transaction("John", 4, 47000)]
+        )
+
+        self.bill_index.update_bill(indexed_bill("/bills/a.pdf", "other hash"))
+        self.assertEqual(
+            self.bill_index.indexed_bill("/bills/a.pdf").content_hash, "other hash"
+        )
+        self.assertEqual(self.bill_index.total_by_holder().totals[0].total_cents, 47000)
+
+        self.bill_index.remove_bill("/bills/a.pdf")
+        self.assertEqual(self.bill_index.indexed_paths(), [])
+        self.assertEqual(self.bill_index.total_by_holder().totals, [])
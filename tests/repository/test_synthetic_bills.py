@@ -0,0 +1,258 @@
+import io
+import logging
+import mmap
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import TOTAL_LINE, generate_statement
+from cembrabillreader.diagnostics import (
+    FRAGMENT_TRACE_LOGGER_NAME,
+    configure_logging,
+)
+from cembrabillreader.repository.pdfbillrepository import PdfCembraBillRepository
+
+
+class TestSyntheticBills(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_statement(self, **kwargs):
+        statement = generate_statement(**kwargs)
+        bill_path = os.path.join(self.tmp_dir.name, "statement.pdf")
+        with open(bill_path, "wb") as file:
+            file.write(statement.pdf)
+        return statement, bill_path
+
+    def test_load_cembra_bill(self):
+        statement, bill_path = self.write_statement(
+            pages=3, rows_per_page=10, holders=3
+        )
+
+        for repository in [
+            PdfCembraBillRepository(),
+            PdfCembraBillRepository(select_pages=False, stop_marker=TOTAL_LINE),
+        ]:
+            cembra_bill = repository.load_cembra_bill(bill_path, statement.holders)
+
+            self.assertEqual(cembra_bill.principal_card.holder, statement.holders[0])
+            self.assertEqual(
+                {
+                    card.holder: card.calculate_total_cents()
+                    for card in [cembra_bill.principal_card]
+                    + cembra_bill.additional_cards
+                },
+                statement.totals_cents,
+            )
+
+    def test_load_cembra_bill_from_memory(self):
+        statement, bill_path = self.write_statement(
+            pages=2, rows_per_page=10, holders=2
+        )
+        repository = PdfCembraBillRepository()
+        expected = repository.load_cembra_bill(bill_path, statement.holders)
+
+        with open(bill_path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            for bill in [
+                statement.pdf,
+                bytearray(statement.pdf),
+                memoryview(statement.pdf),
+                io.BytesIO(statement.pdf),
+                file,
+                mapped,
+            ]:
+                with self.subTest(type(bill).__name__):
+                    self.assertEqual(
+                        repository.load_cembra_bill(bill, statement.holders),
+                        expected,
+                    )
+
+    def test_load_cembra_bill_layout(self):
+        statement, bill_path = self.write_statement(
+            pages=2, rows_per_page=10, holders=2, split_columns=True
+        )
+        repository = PdfCembraBillRepository(layout=True)
+
+        cembra_bill = repository.load_cembra_bill(bill_path, statement.holders)
+
+        self.assertEqual(
+            {
+                card.holder: card.calculate_total_cents()
+                for card in [cembra_bill.principal_card] + cembra_bill.additional_cards
+            },
+            statement.totals_cents,
+        )
+        self.assertEqual(
+            cembra_bill.principal_card.transactions[0].description,
+            "Restaurant Kronenhalle Zuerich CHE",
+        )
+        self.assertNotEqual(
+            repository.parser_version, PdfCembraBillRepository().parser_version
+        )
+
+    def test_load_cembra_bill_page_workers(self):
+        statement, bill_path = self.write_statement(
+            pages=6, rows_per_page=10, holders=3, noise_pages=1
+        )
+
+        for options in [{}, {"layout": True}, {"stop_marker": TOTAL_LINE}]:
+            with self.subTest(**options):
+                expected = PdfCembraBillRepository(**options).load_cembra_bill(
+                    bill_path, statement.holders
+                )
+                repository = PdfCembraBillRepository(page_workers=2, **options)
+
+                self.assertEqual(
+                    repository.load_cembra_bill(bill_path, statement.holders),
+                    expected,
+                )
+                self.assertEqual(
+                    repository.load_cembra_bill(statement.pdf, statement.holders),
+                    expected,
+                )
+                self.assertEqual(
+                    len(
+                        list(
+                            repository.iter_transactions(
+                                io.BytesIO(statement.pdf), statement.holders
+                            )
+                        )
+                    ),
+                    statement.rows,
+                )
+
+    def test_iter_transactions(self):
+        statement, bill_path = self.write_statement(
+            pages=2, rows_per_page=10, holders=2
+        )
+
+        transactions = list(
+            PdfCembraBillRepository().iter_transactions(bill_path, statement.holders)
+        )
+
+        self.assertEqual(len(transactions), statement.rows)
+        self.assertEqual(
+            sum(t.transaction.amount_cents for t in transactions),
+            sum(statement.totals_cents.values()),
+        )
+
+    def test_shared_repository_from_threads(self):
+        statements = [
+            generate_statement(pages=2, rows_per_page=8, holders=holders, seed=seed)
+            for seed, holders in enumerate([1, 2, 3, 2])
+        ]
+        repository = PdfCembraBillRepository(stop_marker=TOTAL_LINE)
+        expected_bills = [
+            repository.load_cembra_bill(s.pdf, s.holders) for s in statements
+        ]
+
+        def load(index):
+            statement = statements[index % len(statements)]
+            return repository.load_cembra_bill(statement.pdf, statement.holders)
+
+        def iterate(index):
+            statement = statements[index % len(statements)]
+            return [
+                (holder, is_principal_holder, record.amount_cents, record.description)
+                for holder, is_principal_holder, record in repository.iter_transactions(
+                    statement.pdf, statement.holders
+                )
+            ]
+
+        expected_transactions = [iterate(index) for index in range(len(statements))]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bills = list(executor.map(load, range(32)))
+            transactions = list(executor.map(iterate, range(32)))
+
+        for index in range(32):
+            self.assertEqual(bills[index], expected_bills[index % len(statements)])
+            self.assertEqual(
+                transactions[index], expected_transactions[index % len(statements)]
+            )
+
+    def test_load_cembra_bill_profile(self):
+        statement, bill_path = self.write_statement(
+            pages=2, rows_per_page=10, holders=2, noise_pages=1
+        )
+        repository = PdfCembraBillRepository()
+
+        profile = repository.load_cembra_bill(
+            bill_path, statement.holders, profile=True
+        ).profile
+
+        self.assertIsNone(
+            repository.load_cembra_bill(bill_path, statement.holders).profile
+        )
+        self.assertEqual(profile.rows_accepted, statement.rows)
+        self.assertEqual(profile.holder_matches, 2)
+        self.assertEqual(profile.fragments_rejected, statement.pages - 2)
+        self.assertEqual(len(profile.pages), statement.pages)
+        self.assertEqual(
+            [p.extracted for p in profile.pages],
+            [False] + [True] * (statement.pages - 2) + [False],
+        )
+        self.assertEqual(
+            sum(p.fragments for p in profile.pages), profile.fragments_seen
+        )
+        self.assertGreater(profile.extraction_seconds, profile.visitor_seconds)
+
+    def test_load_cembra_bill_summary_log(self):
+        statement, bill_path = self.write_statement(
+            pages=2, rows_per_page=10, holders=2, noise_pages=1
+        )
+
+        with self.assertLogs(level=logging.DEBUG) as logs:
+            PdfCembraBillRepository().load_cembra_bill(bill_path, statement.holders)
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(
+            {
+                key: value
+                for key, value in logs.records[0].bill_summary.items()
+                if key != "seconds"
+            },
+            {
+                "bill": bill_path,
+                "pages": statement.pages,
+                "extracted_pages": statement.pages - 2,
+                "holders": 2,
+                # the empty fragment opening every extracted page
+                "fragments_rejected": statement.pages - 2,
+                "rows": statement.rows,
+                "stop_marker_seen": False,
+            },
+        )
+
+    def test_load_cembra_bill_fragment_trace(self):
+        statement, bill_path = self.write_statement(
+            pages=1, rows_per_page=10, holders=1, noise_pages=0
+        )
+        repository = PdfCembraBillRepository()
+        trace_logger = logging.getLogger(FRAGMENT_TRACE_LOGGER_NAME)
+        traced = []
+        handler = logging.Handler()
+        handler.emit = traced.append
+        trace_logger.addHandler(handler)
+        self.addCleanup(trace_logger.removeHandler, handler)
+        self.addCleanup(configure_logging, trace_every=0)
+
+        repository.load_cembra_bill(bill_path, statement.holders)
+        self.assertEqual(traced, [])
+
+        configure_logging(trace_every=1)
+        repository.load_cembra_bill(bill_path, statement.holders)
+        fragments = len(traced)
+        traced.clear()
+        configure_logging(trace_every=4)
+        repository.load_cembra_bill(bill_path, statement.holders)
+
+        # the holder line, the ten rows and the total line at least
+        self.assertGreaterEqual(fragments, 12)
+        self.assertEqual(len(traced), -(-fragments // 4))
@@ -3,6 +3,7 @@ from datetime import datetime
 
 from cembrabillreader.domain.entities import Transaction
 from cembrabillreader.repository.pdfbillrepository import (
+    HolderMatcher,
     TransactionsVisitorHelper,
 )
 
@@ -37,6 +38,12 @@ class TestTransactionsVisitorHelper(unittest.TestCase):
         self.assertEqual("Principal Holder", res)
         self.assertIsNone(helper.matches_holder("Non-existent Holder line of text"))
 
+    def test_matches_holder_prefers_longest_name(self):
+        helper = TransactionsVisitorHelper(expected_holders=["John Doe", "John"])
+
+        self.assertEqual("John Doe", helper.matches_holder("Card of JOHN DOE"))
+        self.assertEqual("John", helper.matches_holder("Card of john Smith"))
+
     def test_dispatch_next_transactions_to_holder_non_existant(self):
         helper = TransactionsVisitorHelper(expected_holders=["principal"])
         helper.dispatch_next_transactions_to_holder("PRINCIPAL")
@@ -109,3 +116,26 @@ class TestTransactionsVisitorHelper(unittest.TestCase):
         self.assertEqual(cards[1].is_principal_holder, False)
         self.assertEqual(len(cards[1].transactions), 1)
         self.assertEqual(cards[1].transactions[0], transactions_to_add[1])
+
+
+class TestHolderMatcher(unittest.TestCase):
+    def test_search_many_holders(self):
+        holders = [f"Holder {i}" for i in range(100)] + ["Anna (Jr.)"]
+        matcher = HolderMatcher(holders)
+
+        self.assertEqual("Holder 42", matcher.search("card holder 42 CHE"))
+        self.assertEqual("Holder 7", matcher.search("card holder 7 CHE"))
+        self.assertEqual("Anna (Jr.)", matcher.search("anna (jr.) 1234"))
+        self.assertIsNone(matcher.search("Holder x"))
+
+    def test_find(self):
+        matcher = HolderMatcher(["John Doe", "Jane"])
+
+        self.assertEqual("John Doe", matcher.find("JOHN DOE"))
+        self.assertEqual("John Doe", matcher.find("doe"))
+        self.assertIsNone(matcher.find("Alice"))
+
+    def test_no_holders(self):
+        matcher = HolderMatcher(["", ""])
+
+        self.assertIsNone(matcher.search("any text"))
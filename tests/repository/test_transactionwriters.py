@@ -0,0 +1,121 @@
+import csv
+import os
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from cembrabillreader.domain.transactionstore import (
+    BillTransaction,
+    TransactionRecord,
+)
+from cembrabillreader.domain.transactionwriter import EXPORT_COLUMNS
+from cembrabillreader.repository.arrowtransactionwriter import (
+    ArrowTransactionWriter,
+)
+from cembrabillreader.repository.csvtransactionwriter import CsvTransactionWriter
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+TRANSACTIONS = [
+    BillTransaction(
+        "bill.pdf",
+        "John Doe",
+        True,
+        TransactionRecord(
+            date(2023, 6, 4).toordinal(),
+            date(2023, 6, 5).toordinal(),
+            "Merchant, Name CHE",
+            47000,
+        ),
+    ),
+    BillTransaction(
+        "bill.pdf",
+        "Jane Smith",
+        False,
+        TransactionRecord(
+            date(2023, 6, 30).toordinal(),
+            date(2023, 7, 1).toordinal(),
+            "Refund",
+            -1230,
+        ),
+    ),
+]
+
+
+class TestTransactionWriters(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_csv_transaction_writer(self):
+        path = os.path.join(self.tmp_dir.name, "transactions.csv")
+
+        with CsvTransactionWriter(path) as writer:
+            writer.write(TRANSACTIONS[:1])
+            writer.write(TRANSACTIONS[1:])
+
+        with open(path, newline="", encoding="utf-8") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(
+            rows,
+            [
+                list(EXPORT_COLUMNS),
+                [
+                    "bill.pdf",
+                    "John Doe",
+                    "true",
+                    "2023-06-04",
+                    "2023-06-05",
+                    "Merchant, Name CHE",
+                    "470.00",
+                ],
+                [
+                    "bill.pdf",
+                    "Jane Smith",
+                    "false",
+                    "2023-06-30",
+                    "2023-07-01",
+                    "Refund",
+                    "-12.30",
+                ],
+            ],
+        )
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow_transaction_writer(self):
+        import pyarrow.parquet
+
+        for format, read_table in [
+            ("parquet", pyarrow.parquet.read_table),
+            ("arrow", lambda path: pyarrow.ipc.open_file(path).read_all()),
+        ]:
+            path = os.path.join(self.tmp_dir.name, f"transactions.{format}")
+
+            with ArrowTransactionWriter(path, format=format) as writer:
+                writer.write(TRANSACTIONS[:1])
+                writer.write(TRANSACTIONS[1:])
+
+            table = read_table(path)
+            self.assertEqual(table.column_names, list(EXPORT_COLUMNS))
+            self.assertEqual(
+                table.to_pylist()[1],
+                {
+                    "bill": "bill.pdf",
+                    "holder": "Jane Smith",
+                    "is_principal_holder": False,
+                    "transaction_date": date(2023, 6, 30),
+                    "registration_date": date(2023, 7, 1),
+                    "description": "Refund",
+                    "amount": Decimal("-12.30"),
+                },
+            )
+
+    def test_arrow_transaction_writer_with_invalid_format(self):
+        with self.assertRaises(ValueError):
+            ArrowTransactionWriter(os.path.join(self.tmp_dir.name, "t"), format="xls")
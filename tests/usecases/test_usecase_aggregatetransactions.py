@@ -0,0 +1,95 @@
+from datetime import date
+import unittest
+from unittest.mock import MagicMock
+
+from cembrabillreader.domain.aggregation import CategoryMapping
+from cembrabillreader.domain.entities import Card, CembraBill
+from cembrabillreader.domain.transactionstore import (
+    TransactionRecord,
+    TransactionStore,
+)
+from cembrabillreader.domain.usecases import AggregateTransactions
+
+
+def card(holder, *transactions):
+    store = TransactionStore()
+    for day, description, amount_cents in transactions:
+        store.append(
+            TransactionRecord(
+                day.toordinal(), day.toordinal(), description, amount_cents
+            )
+        )
+    return Card.from_store(
+        holder=holder, is_principal_holder=holder == "John", store=store
+    )
+
+
+class TestAggregateTransactions(unittest.TestCase):
+    def setUp(self):
+        self.bills = {
+            "a.pdf": CembraBill(
+                principal_card=card("John", (date(2023, 5, 2), "Migros", 1000)),
+                additional_cards=[card("Jane", (date(2023, 6, 1), "SBB", 500))],
+            ),
+            "b.pdf": CembraBill(
+                principal_card=card("John", (date(2023, 6, 3), "Migros", 200))
+            ),
+        }
+        self.bill_repository_mock = MagicMock()
+        self.bill_repository_mock.load_cembra_bill.side_effect = (
+            lambda bill_path, holders: self.bills[bill_path]
+        )
+        self.aggregate_transactions = AggregateTransactions(self.bill_repository_mock)
+
+    def totals(self, result):
+        return [(g.key, g.total_cents, g.transactions) for g in result.totals]
+
+    def test_aggregate_by_month(self):
+        result = self.aggregate_transactions.aggregate_transactions(
+            ["a.pdf", "b.pdf"], ["John", "Jane"], "month"
+        )
+
+        self.assertEqual(result.grouping, "month")
+        self.assertEqual(
+            self.totals(result), [("2023-05", 1000, 1), ("2023-06", 700, 2)]
+        )
+        self.assertEqual((result.bills_processed, result.bills_failed), (2, 0))
+
+    def test_aggregate_by_category(self):
+        result = self.aggregate_transactions.aggregate_transactions(
+            ["a.pdf", "b.pdf"],
+            ["John", "Jane"],
+            "category",
+            CategoryMapping({"groceries": ["migros"]}),
+        )
+
+        self.assertEqual(
+            self.totals(result),
+            [("groceries", 1200, 2), ("uncategorized", 500, 1)],
+        )
+
+    def test_failed_bill_is_skipped(self):
+        def load_cembra_bill(bill_path, holders):
+            if bill_path == "a.pdf":
+                raise ValueError("cannot parse")
+            return self.bills[bill_path]
+
+        self.bill_repository_mock.load_cembra_bill.side_effect = load_cembra_bill
+
+        result = self.aggregate_transactions.aggregate_transactions(
+            ["a.pdf", "b.pdf"], ["John"], "merchant"
+        )
+
+        self.assertEqual(self.totals(result), [("Migros", 200, 1)])
+        self.assertEqual((result.bills_processed, result.bills_failed), (1, 1))
+
+    def test_unknown_grouping(self):
+        with self.assertRaises(ValueError):
+            self.aggregate_transactions.aggregate_transactions(
+                ["a.pdf"], ["John"], "holder"
+            )
+        self.bill_repository_mock.load_cembra_bill.assert_not_called()
+
+    def test_no_holders(self):
+        with self.assertRaises(ValueError):
+            self.aggregate_transactions.aggregate_transactions(["a.pdf"], [], "month")
@@ -6,6 +6,12 @@ from cembrabillreader.domain.usecases import (
     CalculateTotalByCardResult,
 )
 from cembrabillreader.domain.entities import CembraBill, Card, Transaction
+from cembrabillreader.domain.errors import BillParsingError
+from cembrabillreader.domain.repository import CembraBillRepository
+from cembrabillreader.domain.transactionstore import (
+    HolderTransaction,
+    TransactionRecord,
+)
 
 
 class TestCalculateTotalByCard(unittest.TestCase):
@@ -38,11 +44,75 @@ class TestCalculateTotalByCard(unittest.TestCase):
         with self.assertRaises(ValueError):
             calculate_total_by_card.calculate_bill_total_by_card("/path/to/bill", [])
 
-        # Test with more than two holders
-        with self.assertRaises(ValueError):
+    def test_calculate_bill_total_by_card_with_unreadable_bill(self):
+        bill_repository_mock = MagicMock()
+        bill_repository_mock.load_cembra_bill.side_effect = RuntimeError("EOF marker")
+        calculate_total_by_card = CalculateTotalByCard(bill_repository_mock)
+
+        with self.assertRaises(BillParsingError) as raised:
             calculate_total_by_card.calculate_bill_total_by_card(
-                "/path/to/bill", ["John Doe", "Jane Smith", "Alice"]
+                "/path/to/bill", ["John Doe"]
             )
+        self.assertEqual(
+            str(raised.exception),
+            "cannot calculate total of /path/to/bill: EOF marker",
+        )
+        self.assertIsInstance(raised.exception.__cause__, RuntimeError)
+
+    def test_calculate_bill_total_by_card_with_many_additional_cards(self):
+        bill_repository_mock = MagicMock()
+        cembra_bill = self.create_mock_cembra_bill()
+        cembra_bill.additional_cards.append(
+            Card(holder="Alice", is_principal_holder=False, transactions=[])
+        )
+        bill_repository_mock.load_cembra_bill.return_value = cembra_bill
+        calculate_total_by_card = CalculateTotalByCard(bill_repository_mock)
+
+        result = calculate_total_by_card.calculate_bill_total_by_card(
+            "/path/to/bill", ["John Doe", "Jane Smith", "Alice"]
+        )
+
+        self.assertEqual(
+            [(c.card_holder, c.total) for c in result.additional_cards],
+            [("Jane Smith", 33.90), ("Alice", 0)],
+        )
+
+    def test_calculate_bill_total_by_card_streaming(self):
+        bill_repository_mock = MagicMock()
+        bill_repository_mock.iter_transactions.return_value = iter(
+            [
+                HolderTransaction("John Doe", True, self.create_record(750_00)),
+                HolderTransaction("Jane Smith", False, self.create_record(15_00)),
+                HolderTransaction("John Doe", True, self.create_record(650_00)),
+                HolderTransaction("Jane Smith", False, self.create_record(18_90)),
+            ]
+        )
+        calculate_total_by_card = CalculateTotalByCard(bill_repository_mock)
+
+        result = calculate_total_by_card.calculate_bill_total_by_card_streaming(
+            "/path/to/bill", ["John Doe", "Jane Smith"]
+        )
+
+        self.assertEqual(result.principal_card.card_holder, "John Doe")
+        self.assertEqual(result.principal_card.total, 1400.0)
+        self.assertEqual(result.additional_card.card_holder, "Jane Smith")
+        self.assertEqual(result.additional_card.total, 33.90)
+
+    def test_calculate_bill_total_by_card_streaming_from_loaded_bill(self):
+        class Repository(CembraBillRepository):
+            def load_cembra_bill(_, path_to_bill, expected_holders, profile=False):
+                return self.create_mock_cembra_bill()
+
+        calculate_total_by_card = CalculateTotalByCard(Repository())
+
+        self.assertEqual(
+            calculate_total_by_card.calculate_bill_total_by_card_streaming(
+                "/path/to/bill", ["John Doe", "Jane Smith"]
+            ),
+            calculate_total_by_card.calculate_bill_total_by_card(
+                "/path/to/bill", ["John Doe", "Jane Smith"]
+            ),
+        )
 
     def test_calculate_total_for_card(self):
         card = self.create_mock_principal_card()
@@ -59,11 +129,19 @@ class TestCalculateTotalByCard(unittest.TestCase):
 
         self.assertIsNone(result)
 
+    def create_record(self, amount_cents: int) -> TransactionRecord:
+        return TransactionRecord(
+            transaction_date=date(2023, 1, 1).toordinal(),
+            registration_date=date(2023, 1, 2).toordinal(),
+            description="Transaction",
+            amount_cents=amount_cents,
+        )
+
     def create_mock_cembra_bill(self):
         principal_card = self.create_mock_principal_card()
         additional_card = self.create_mock_additional_card()
         return CembraBill(
-            principal_card=principal_card, additional_card=additional_card
+            principal_card=principal_card, additional_cards=[additional_card]
         )
 
     def create_mock_principal_card(self):
@@ -0,0 +1,128 @@
+from datetime import date
+import time
+import unittest
+from cembrabillreader.domain.entities import (
+    BillTotalByCardResult,
+    CalculateTotalByCardResult,
+    Card,
+    CardTotal,
+    CembraBill,
+    Transaction,
+)
+from cembrabillreader.domain.repository import CembraBillRepository
+from cembrabillreader.domain.usecases import (
+    CalculateTotalByCard,
+    CalculateTotalByCardBatch,
+)
+
+
+class StubCembraBillRepository(CembraBillRepository):
+    """Picklable repository returning a bill whose amounts depend on the path."""
+
+    def load_cembra_bill(
+        self, path_to_bill: str, expected_holders: list[str], profile: bool = False
+    ):
+        if path_to_bill == "broken.pdf":
+            raise RuntimeError("broken pdf")
+        if path_to_bill.startswith("slow-"):
+            time.sleep(0.2)
+            path_to_bill = path_to_bill[len("slow-") :]
+        amount = float(path_to_bill.split(".")[0])
+        return CembraBill(
+            principal_card=create_card(expected_holders[0], True, amount),
+            additional_cards=[create_card(expected_holders[1], False, amount / 2)],
+        )
+
+
+def create_card(holder: str, is_principal_holder: bool, amount: float) -> Card:
+    return Card(
+        holder=holder,
+        is_principal_holder=is_principal_holder,
+        transactions=[
+            Transaction(
+                transaction_date=date(2023, 1, 1),
+                registration_date=date(2023, 1, 2),
+                description="Transaction",
+                amount=amount,
+            )
+        ],
+    )
+
+
+class TestCalculateTotalByCardBatch(unittest.TestCase):
+    def setUp(self):
+        self.batch = CalculateTotalByCardBatch(
+            CalculateTotalByCard(StubCembraBillRepository())
+        )
+
+    def test_calculate_bills_total_by_card_in_process_pool(self):
+        results = list(
+            self.batch.calculate_bills_total_by_card(
+                ["100.pdf", "20.pdf", "broken.pdf"], ["John", "Jane"], max_workers=2
+            )
+        )
+
+        results_by_path = {r.bill_path: r for r in results}
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results_by_path["100.pdf"].result.principal_card.total, 100.0)
+        self.assertEqual(results_by_path["20.pdf"].result.additional_card.total, 10.0)
+        self.assertIsNone(results_by_path["broken.pdf"].result)
+        self.assertIsNotNone(results_by_path["broken.pdf"].error)
+        self.assertEqual(results_by_path["broken.pdf"].error_type, "BillParsingError")
+
+    def test_closing_the_results_cancels_the_pending_bills(self):
+        results = self.batch.calculate_bills_total_by_card(
+            [f"slow-{i}.pdf" for i in range(1, 21)], ["John", "Jane"], max_workers=2
+        )
+        self.assertIsNone(next(results).error)
+
+        started = time.perf_counter()
+        results.close()
+
+        # parsing the 19 remaining bills would take about two seconds
+        self.assertLess(time.perf_counter() - started, 1.5)
+
+    def test_calculate_bills_total_by_card_serially(self):
+        results = list(
+            self.batch.calculate_bills_total_by_card(
+                ["100.pdf", "20.pdf", "broken.pdf"], ["John", "Jane"], max_workers=1
+            )
+        )
+
+        self.assertEqual(
+            [r.bill_path for r in results], ["100.pdf", "20.pdf", "broken.pdf"]
+        )
+        self.assertEqual(results[2].error_type, "BillParsingError")
+
+    def test_aggregate_total_by_holder(self):
+        bill_results = [
+            BillTotalByCardResult(
+                bill_path="1.pdf",
+                result=CalculateTotalByCardResult(
+                    principal_card=CardTotal(card_holder="John", total=10.1),
+                    additional_cards=[CardTotal(card_holder="Jane", total=5.0)],
+                ),
+                error=None,
+            ),
+            BillTotalByCardResult(
+                bill_path="2.pdf",
+                result=CalculateTotalByCardResult(
+                    principal_card=CardTotal(card_holder="John", total=0.2),
+                ),
+                error=None,
+            ),
+            BillTotalByCardResult(bill_path="3.pdf", result=None, error="broken"),
+        ]
+
+        total = CalculateTotalByCardBatch.aggregate_total_by_holder(bill_results)
+
+        self.assertEqual(total.bills_processed, 2)
+        self.assertEqual(total.bills_failed, 1)
+        self.assertEqual(
+            [(t.card_holder, t.total) for t in total.totals],
+            [("John", 10.3), ("Jane", 5.0)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
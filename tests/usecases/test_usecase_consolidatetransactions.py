@@ -0,0 +1,92 @@
+from datetime import date
+import unittest
+from unittest.mock import MagicMock
+
+from cembrabillreader.domain.transactionstore import (
+    HolderTransaction,
+    TransactionRecord,
+)
+from cembrabillreader.domain.usecases import ConsolidateTransactions
+
+
+def holder_transaction(holder, day, description, amount_cents):
+    return HolderTransaction(
+        holder,
+        holder == "John",
+        TransactionRecord(day.toordinal(), day.toordinal(), description, amount_cents),
+    )
+
+
+class TestConsolidateTransactions(unittest.TestCase):
+    def setUp(self):
+        pending = holder_transaction("John", date(2023, 5, 30), "Migros", 1000)
+        self.transactions_by_bill = {
+            "may.pdf": [
+                holder_transaction("John", date(2023, 5, 2), "SBB", 500),
+                holder_transaction("Jane", date(2023, 5, 3), "Coop", 250),
+                pending,
+            ],
+            "june.pdf": [
+                pending,
+                holder_transaction("John", date(2023, 6, 1), "Coop", 200),
+            ],
+        }
+        self.bill_repository_mock = MagicMock()
+        self.bill_repository_mock.iter_transactions.side_effect = (
+            lambda bill_path, holders: iter(self.transactions_by_bill[bill_path])
+        )
+        self.writer_mock = MagicMock()
+
+    def test_consolidate_transactions(self):
+        consolidate_transactions = ConsolidateTransactions(
+            self.bill_repository_mock, chunk_size=3
+        )
+
+        result = consolidate_transactions.consolidate_transactions(
+            ["may.pdf", "june.pdf"], ["John", "Jane"], self.writer_mock
+        )
+
+        self.assertEqual(
+            [(t.card_holder, t.total_cents) for t in result.totals],
+            [("John", 1700), ("Jane", 250)],
+        )
+        self.assertEqual(
+            (
+                result.transactions_consolidated,
+                result.duplicates_removed,
+                result.bills_processed,
+                result.bills_failed,
+            ),
+            (4, 1, 2, 0),
+        )
+        chunks = [call.args[0] for call in self.writer_mock.write.call_args_list]
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 1])
+        self.assertEqual(
+            [(t.holder, t.transaction.description) for chunk in chunks for t in chunk],
+            [("John", "SBB"), ("John", "Migros"), ("John", "Coop"), ("Jane", "Coop")],
+        )
+
+    def test_failed_bill_is_skipped(self):
+        def iter_transactions(bill_path, holders):
+            yield from self.transactions_by_bill[bill_path]
+            if bill_path == "may.pdf":
+                raise ValueError("cannot parse")
+
+        self.bill_repository_mock.iter_transactions.side_effect = iter_transactions
+
+        result = ConsolidateTransactions(
+            self.bill_repository_mock
+        ).consolidate_transactions(["may.pdf", "june.pdf"], ["John", "Jane"])
+
+        self.assertEqual(
+            [(t.card_holder, t.total_cents) for t in result.totals],
+            [("John", 1200)],
+        )
+        self.assertEqual((result.bills_processed, result.bills_failed), (1, 1))
+        self.assertEqual(result.duplicates_removed, 0)
+
+    def test_no_holders(self):
+        with self.assertRaises(ValueError):
+            ConsolidateTransactions(self.bill_repository_mock).consolidate_transactions(
+                ["may.pdf"], []
+            )
@@ -0,0 +1,87 @@
+from datetime import date
+import unittest
+from unittest.mock import MagicMock
+
+from cembrabillreader.domain.transactionstore import (
+    BillTransaction,
+    HolderTransaction,
+    TransactionRecord,
+)
+from cembrabillreader.domain.usecases import ExportTransactions
+
+
+def holder_transactions(holder, is_principal_holder, count):
+    day = date(2023, 6, 4).toordinal()
+    return [
+        HolderTransaction(
+            holder,
+            is_principal_holder,
+            TransactionRecord(day, day + 1, f"Merchant {i}", 100 * i),
+        )
+        for i in range(count)
+    ]
+
+
+class TestExportTransactions(unittest.TestCase):
+    def setUp(self):
+        self.transactions_by_bill = {
+            "a.pdf": holder_transactions("John", True, 3)
+            + holder_transactions("Jane", False, 2),
+            "b.pdf": holder_transactions("John", True, 4),
+        }
+        self.bill_repository_mock = MagicMock()
+        self.bill_repository_mock.iter_transactions.side_effect = (
+            lambda bill_path, holders: iter(self.transactions_by_bill[bill_path])
+        )
+        self.writer_mock = MagicMock()
+
+    def test_export_transactions_in_chunks(self):
+        export_transactions = ExportTransactions(
+            self.bill_repository_mock, chunk_size=4
+        )
+
+        result = export_transactions.export_transactions(
+            ["a.pdf", "b.pdf"], ["John", "Jane"], self.writer_mock
+        )
+
+        chunks = [call.args[0] for call in self.writer_mock.write.call_args_list]
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 1])
+        exported = [t for chunk in chunks for t in chunk]
+        self.assertEqual(
+            [(t.bill_path, t.holder) for t in exported],
+            [("a.pdf", "John")] * 3 + [("a.pdf", "Jane")] * 2 + [("b.pdf", "John")] * 4,
+        )
+        self.assertIsInstance(exported[0], BillTransaction)
+        self.assertEqual(
+            (
+                result.transactions_exported,
+                result.bills_processed,
+                result.bills_failed,
+            ),
+            (9, 2, 0),
+        )
+
+    def test_export_transactions_skips_failing_bills(self):
+        def failing_bill():
+            yield from holder_transactions("John", True, 2)
+            raise ValueError("broken bill")
+
+        self.transactions_by_bill["broken.pdf"] = failing_bill()
+        export_transactions = ExportTransactions(self.bill_repository_mock)
+
+        result = export_transactions.export_transactions(
+            ["broken.pdf", "b.pdf"], ["John"], self.writer_mock
+        )
+
+        self.writer_mock.write.assert_called_once()
+        self.assertEqual(
+            {t.bill_path for t in self.writer_mock.write.call_args.args[0]},
+            {"b.pdf"},
+        )
+        self.assertEqual((result.bills_processed, result.bills_failed), (1, 1))
+
+    def test_export_transactions_with_invalid_holders(self):
+        export_transactions = ExportTransactions(self.bill_repository_mock)
+
+        with self.assertRaises(ValueError):
+            export_transactions.export_transactions(["a.pdf"], [], self.writer_mock)
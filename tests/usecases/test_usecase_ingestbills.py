@@ -0,0 +1,82 @@
+import os
+import unittest
+from unittest.mock import MagicMock
+
+from cembrabillreader.domain.entities import (
+    BillTotalByCardResult,
+    CalculateTotalByCardResult,
+    CardTotal,
+)
+from cembrabillreader.domain.errors import BillParsingError
+from cembrabillreader.domain.usecases import IngestBills
+
+
+def total(bill_path):
+    return CalculateTotalByCardResult(
+        principal_card=CardTotal(card_holder="John", total_cents=len(bill_path))
+    )
+
+
+class FakeCalculateTotalByCard:
+    # runs in the worker processes, where a mock would not record the calls
+    def calculate_bill_total_by_card(self, bill_path, expected_holders):
+        if bill_path.startswith("bad"):
+            raise BillParsingError(f"cannot calculate total of {bill_path}")
+        return total(bill_path)
+
+
+class TestIngestBills(unittest.TestCase):
+    def setUp(self):
+        self.ingest_bills = IngestBills(FakeCalculateTotalByCard(), max_workers=2)
+        self.checkpoint_mock = MagicMock()
+        self.checkpoint_mock.results.return_value = {}
+
+    def ingest(self, bill_paths, **kwargs):
+        return {
+            result.bill_path: result
+            for result in self.ingest_bills.ingest_bills(
+                bill_paths, ["John"], self.checkpoint_mock, **kwargs
+            )
+        }
+
+    def test_ingest_bills(self):
+        results = self.ingest(["a.pdf", "bad.pdf", "ccc.pdf"])
+
+        self.assertEqual(results["a.pdf"].result, total("a.pdf"))
+        self.assertEqual(results["ccc.pdf"].result, total("ccc.pdf"))
+        self.assertIsNone(results["bad.pdf"].result)
+        self.assertEqual(results["bad.pdf"].error, "cannot calculate total of bad.pdf")
+        self.assertEqual(results["bad.pdf"].error_type, "BillParsingError")
+        self.assertEqual(
+            sorted(
+                call.args[0].bill_path
+                for call in self.checkpoint_mock.record.call_args_list
+            ),
+            ["a.pdf", "bad.pdf", "ccc.pdf"],
+        )
+
+    def test_resume_skips_the_recorded_bills(self):
+        self.checkpoint_mock.results.return_value = {
+            os.path.abspath("a.pdf"): BillTotalByCardResult(
+                bill_path="a.pdf", result=total("a.pdf"), error=None
+            ),
+            os.path.abspath("bad.pdf"): BillTotalByCardResult(
+                bill_path="bad.pdf", result=None, error="cannot calculate total"
+            ),
+        }
+
+        self.assertEqual(
+            list(self.ingest(["a.pdf", "bad.pdf", "ccc.pdf"])), ["ccc.pdf"]
+        )
+        self.assertEqual(
+            list(self.ingest([os.path.abspath("a.pdf"), "./bad.pdf", "ccc.pdf"])),
+            ["ccc.pdf"],
+        )
+        self.assertEqual(
+            sorted(self.ingest(["a.pdf", "bad.pdf", "ccc.pdf"], retry_failed=True)),
+            ["bad.pdf", "ccc.pdf"],
+        )
+
+    def test_no_holders(self):
+        with self.assertRaises(ValueError):
+            list(self.ingest_bills.ingest_bills(["a.pdf"], [], self.checkpoint_mock))
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+from cembrabillreader.domain.transactionstore import (
+    HolderTransaction,
+    TransactionRecord,
+)
+from cembrabillreader.domain.usecases import SyncBillIndex
+from cembrabillreader.repository.sqlitebillindex import SqliteBillIndex
+
+DAY = date(2023, 6, 4).toordinal()
+
+
+class TestSyncBillIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.bill_index = SqliteBillIndex(":memory:")
+        self.addCleanup(self.bill_index.close)
+        self.bill_repository_mock = MagicMock()
+        self.bill_repository_mock.parser_version = "3"
+        self.bill_repository_mock.iter_transactions.side_effect = (
+            lambda bill_path, holders: iter(
+                [
+                    HolderTransaction(
+                        "John",
+                        True,
+                        TransactionRecord(DAY, DAY, bill_path, 100),
+                    )
+                ]
+            )
+        )
+        self.sync_bill_index = SyncBillIndex(self.bill_repository_mock, self.bill_index)
+
+    def write_bill(self, name, content):
+        bill_path = os.path.join(self.tmp_dir.name, name)
+        with open(bill_path, "wb") as file:
+            file.write(content)
+        return bill_path
+
+    def sync(self, bill_paths, holders=("John",)):
+        result = self.sync_bill_index.sync(bill_paths, list(holders))
+        return (
+            result.bills_indexed,
+            result.bills_unchanged,
+            result.bills_removed,
+            result.bills_failed,
+        )
+
+    def parsed_paths(self):
+        paths = [
+            call.args[0]
+            for call in self.bill_repository_mock.iter_transactions.call_args_list
+        ]
+        self.bill_repository_mock.iter_transactions.reset_mock()
+        return paths
+
+    def test_sync_only_parses_new_and_modified_bills(self):
+        june = self.write_bill("june.pdf", b"june")
+        july = self.write_bill("july.pdf", b"july")
+
+        self.assertEqual(self.sync([june, july]), (2, 0, 0, 0))
+        self.assertEqual(self.parsed_paths(), [june, july])
+
+        self.assertEqual(self.sync([june, july]), (0, 2, 0, 0))
+        self.assertEqual(self.parsed_paths(), [])
+
+        # touched without changing the content
+        os.utime(june, ns=(1, 1))
+        self.assertEqual(self.sync([june, july]), (0, 2, 0, 0))
+        self.assertEqual(self.parsed_paths(), [])
+
+        self.write_bill("july.pdf", b"july, fixed")
+        self.assertEqual(self.sync([june, july]), (1, 1, 0, 0))
+        self.assertEqual(self.parsed_paths(), [july])
+
+    def test_sync_reindexes_when_the_holders_change(self):
+        june = self.write_bill("june.pdf", b"june")
+        self.sync([june])
+        self.parsed_paths()
+
+        self.assertEqual(self.sync([june], holders=["John", "Jane"]), (1, 0, 0, 0))
+        self.assertEqual(self.parsed_paths(), [june])
+
+    def test_sync_removes_deleted_bills(self):
+        june = self.write_bill("june.pdf", b"june")
+        self.sync([june])
+
+        os.remove(june)
+
+        self.assertEqual(self.sync([]), (0, 0, 1, 0))
+        self.assertEqual(self.bill_index.indexed_paths(), [])
+
+    def test_sync_records_failing_bills(self):
+        june = self.write_bill("june.pdf", b"june")
+        missing = os.path.join(self.tmp_dir.name, "missing.pdf")
+
+        self.assertEqual(self.sync([missing, june]), (1, 0, 0, 1))
+
+    def test_total_by_holder(self):
+        self.sync([self.write_bill("june.pdf", b"june")])
+
+        result = self.sync_bill_index.total_by_holder(date(2023, 6, 1), None)
+
+        self.assertEqual(result.totals[0].total_cents, 100)
+        with self.assertRaises(ValueError):
+            self.sync_bill_index.total_by_holder(date(2023, 7, 1), date(2023, 6, 1))